@@ -0,0 +1,16 @@
+"""
+ASGI config for the project.
+It exposes the ASGI callable as a module-level variable named ``application``.
+For more information on this file, see
+https://docs.djangoproject.com/en/4.0/howto/deployment/asgi/
+"""
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_v3.config')
+os.environ.setdefault('DJANGO_CONFIGURATION', 'Production')
+
+from configurations import importer  # noqa
+importer.install()
+
+from api_v3.misc.asgi import get_asgi_application  # noqa
+application = get_asgi_application()
@@ -1,5 +1,7 @@
 import uuid
 
+from configurations import values
+
 from .common import Common
 
 
@@ -26,3 +28,6 @@ class Local(Common):
 
     DEFAULT_FROM_EMAIL = Common.DEFAULT_FROM_EMAIL
     DEFAULT_FROM_EMAIL.environ_required = False
+
+    # Send the emails right away
+    NOTIFICATIONS_QUIET_WINDOW = values.IntegerValue(0, environ_prefix='ID')
@@ -1,3 +1,7 @@
+import multiprocessing
+import os.path
+import tempfile
+
 from configurations import values
 import sentry_sdk
 from sentry_sdk.integrations.django import DjangoIntegration
@@ -16,9 +20,45 @@ class Production(Common):
     # This router will disable the browsing of the API.
     ROUTER_CLASS = 'rest_framework.routers.SimpleRouter'
 
+    # Share the cache between the workers
+    CACHE_BACKEND = values.Value(
+        'django.core.cache.backends.filebased.FileBasedCache',
+        environ_prefix='ID')
+    CACHE_LOCATION = values.Value(
+        os.path.join(tempfile.gettempdir(), 'id-api-cache'),
+        environ_prefix='ID')
+
+    # Pooled database connections, see the `api_v3/misc/pool.py`
+    DATABASE_POOL = values.BooleanValue(True, environ_prefix='ID')
+    # Otherwise, persistent connections (seconds), checked before requests
+    CONN_MAX_AGE = values.IntegerValue(60, environ_prefix='ID')
+    CONN_HEALTH_CHECKS = values.BooleanValue(True, environ_prefix='ID')
+
+    # Gunicorn, see the `gunicorn.conf.py`
+    WEB_CONCURRENCY = values.IntegerValue(
+        multiprocessing.cpu_count() * 2 + 1,
+        environ_name='WEB_CONCURRENCY', environ_prefix='')
+    WEB_WORKER_CLASS = values.Value('gthread', environ_prefix='ID')
+    WEB_THREADS = values.IntegerValue(4, environ_prefix='ID')
+    WEB_PRELOAD = values.BooleanValue(True, environ_prefix='ID')
+    WEB_MAX_REQUESTS = values.IntegerValue(10000, environ_prefix='ID')
+
     # Sentry
     SENTRY_DSN = values.Value('', environ_name='SENTRY_DSN', environ_prefix='')
 
+    @classmethod
+    def setup(cls):
+        super(Production, cls).setup()
+
+        for database in cls.DATABASES.values():
+            database['CONN_MAX_AGE'] = cls.CONN_MAX_AGE
+            database.setdefault('CONN_HEALTH_CHECKS', cls.CONN_HEALTH_CHECKS)
+
+            # Connections go back to the pool after every request
+            if cls.DATABASE_POOL:
+                database['ENGINE'] = 'api_v3.misc.postgres'
+                database['CONN_MAX_AGE'] = 0
+
     @classmethod
     def post_setup(cls):
         sentry_sdk.init(dsn=cls.SENTRY_DSN, integrations=[DjangoIntegration()])
@@ -0,0 +1,377 @@
+import io
+import json
+import random
+import time
+import uuid
+from itertools import islice
+
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.db import (
+    DEFAULT_DB_ALIAS, connection, connections, transaction)
+from django.db.models.expressions import RawSQL
+from django.core.management.base import BaseCommand
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.template.loader import render_to_string
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api_v3.factories import (
+    CommentFactory,
+    ExpenseFactory,
+    ProfileFactory,
+    ResponderFactory,
+    ReviewFactory,
+    TicketFactory
+)
+from api_v3.management.commands import email_ticket_digest
+from api_v3.misc.cache import bump_version
+from api_v3.misc.mail import render_mail, skeletons as mail_skeletons
+from api_v3.models import (
+    Action, Comment, Expense, Profile, Responder, Review, Ticket)
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs the endpoints benchmarks, optionally generates a dataset first. '
+        'Do not run it against a production database!'
+    )
+
+    BATCH_SIZE = 1000
+    BENCH_EMAIL = 'bench@localhost'
+    MAIL_RECIPIENTS = 100
+
+    VERBS = (
+        'comment:create',
+        'attachment:create',
+        'responder:create',
+        'ticket:update:status_in-progress',
+        'ticket:update:pending',
+    )
+
+    # Name, URL name and params
+    SCENARIOS = (
+        ('tickets', 'ticket-list', {}),
+        (
+            'tickets-include',
+            'ticket-list',
+            {'include': 'requester,responders.user'}
+        ),
+        ('tickets-search', 'ticket-list', {'filter[search]': 'company'}),
+        ('ticket-stats', 'ticket_stats-list', {}),
+        ('ticket-stats-responder', 'ticket_stats-list', {'by': 'responder'}),
+        ('ticket-stats-country', 'ticket_stats-list', {'by': 'country'}),
+        ('review-stats', 'review_stats-list', {}),
+        ('ticket-exports', 'ticket_exports-list', {}),
+        ('expense-exports', 'expense_exports-list', {}),
+        ('review-exports', 'review_exports-list', {}),
+        ('activities', 'action-list', {}),
+        (
+            'activities-include',
+            'action-list',
+            {'include': 'comment,responder-user,user'}
+        ),
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed', action='store_true',
+            help='Generates the dataset before running the benchmarks.')
+        parser.add_argument('--profiles', type=int, default=100)
+        parser.add_argument('--tickets', type=int, default=1000)
+        parser.add_argument('--comments', type=int, default=5000)
+        parser.add_argument('--actions', type=int, default=10000)
+        parser.add_argument('--expenses', type=int, default=500)
+        parser.add_argument('--reviews', type=int, default=500)
+        parser.add_argument(
+            '--runs', type=int, default=20,
+            help='Runs per scenario, use 0 to only generate the dataset.')
+        parser.add_argument(
+            '--keep-cache', action='store_true',
+            help='Do not clear the responses cache between the runs.')
+        parser.add_argument(
+            '--output', help='Writes the JSON report to a file.')
+
+    def handle(self, *args, **options):
+        """Runs the benchmarks and writes the JSON report."""
+        if options['seed']:
+            self.seed(options)
+
+        if not options['runs']:
+            self.stderr.write(self.style.SUCCESS('Dataset generated.'))
+            return
+
+        user, _ = Profile.objects.get_or_create(
+            email=self.BENCH_EMAIL,
+            defaults=dict(is_superuser=True, is_staff=True)
+        )
+        client = APIClient()
+        client.force_authenticate(user)
+
+        scenarios = [
+            self.run(
+                name,
+                lambda: self.request(client, url_name, params),
+                options
+            ) for name, url_name, params in self.SCENARIOS
+        ]
+        scenarios.append(self.run('digest', self.digest, options))
+        scenarios += self.run_mail(options)
+        scenarios += self.run_connections(options)
+
+        report = json.dumps(
+            dict(dataset=self.dataset(), scenarios=scenarios), indent=2)
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(report)
+        else:
+            self.stdout.write(report)
+
+        # The report is written to stdout, keep it valid JSON
+        self.stderr.write(self.style.SUCCESS(
+            'Ran {} scenarios.'.format(len(scenarios))))
+
+    def run(self, name, scenario, options):
+        """Runs a scenario, returns the latencies and the queries counts."""
+        durations = []
+        queries = []
+
+        for _ in range(options['runs']):
+            if not options['keep_cache']:
+                cache.clear()
+
+            with CaptureQueriesContext(connection) as captured:
+                started_at = time.perf_counter()
+                scenario()
+                durations.append((time.perf_counter() - started_at) * 1000)
+
+            queries.append(len(captured))
+
+        return dict(
+            name=name,
+            runs=options['runs'],
+            latency_ms=self.percentiles(durations),
+            queries=self.percentiles(queries)
+        )
+
+    def run_mail(self, options):
+        """Compares the mail rendering, a new skeleton is rendered each run."""
+        comment = Comment.objects.select_related(
+            'ticket__requester').order_by('-id').first()
+
+        if not comment:
+            return []
+
+        context = {
+            'ticket': comment.ticket,
+            'comment': comment,
+            'request_host': 'localhost',
+            'site_name': settings.SITE_NAME
+        }
+        names = [
+            'Recipient {}'.format(num)
+            for num in range(self.MAIL_RECIPIENTS)
+        ]
+
+        def render():
+            for name in names:
+                render_to_string(
+                    'mail/ticket_comment.txt', dict(context, name=name))
+
+        def render_skeleton():
+            mail_skeletons.clear()
+
+            for name in names:
+                render_mail('mail/ticket_comment.txt', context, name=name)
+
+        return [
+            dict(self.run(name, scenario, options),
+                 recipients=self.MAIL_RECIPIENTS)
+            for name, scenario in (
+                ('mail-render', render),
+                ('mail-skeleton', render_skeleton)
+            )
+        ]
+
+    def run_connections(self, options):
+        """Compares a query on a new and on a persistent connection.
+
+        The persistent connection is checked first, same as the production
+        `CONN_HEALTH_CHECKS`.
+        """
+        persistent = connections.create_connection(DEFAULT_DB_ALIAS)
+        persistent.ensure_connection()
+
+        def query(conn):
+            with conn.cursor() as cursor:
+                cursor.execute('SELECT 1')
+
+        def connect():
+            conn = connections.create_connection(DEFAULT_DB_ALIAS)
+
+            try:
+                query(conn)
+            finally:
+                conn.close()
+
+        def reuse():
+            if persistent.is_usable():
+                query(persistent)
+
+        try:
+            return [
+                self.run(name, scenario, options)
+                for name, scenario in (
+                    ('db-new-connection', connect),
+                    ('db-persistent-connection', reuse)
+                )
+            ]
+        finally:
+            persistent.close()
+
+    def request(self, client, url_name, params):
+        """Requests the endpoint and reads the (streamed) content."""
+        response = client.get(reverse(url_name), params)
+
+        if response.status_code != 200:
+            raise RuntimeError('{} returned {}'.format(
+                url_name, response.status_code))
+
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+
+    @override_settings(
+        EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+    def digest(self):
+        """Runs the digest, the emails and the tickets changes are dropped."""
+        with transaction.atomic():
+            email_ticket_digest.Command(stdout=io.StringIO()).handle(
+                request_host='localhost')
+            transaction.set_rollback(True)
+
+        mail.outbox = []
+
+    def percentiles(self, values):
+        values = sorted(values)
+        last = len(values) - 1
+
+        return dict(
+            (
+                'p{}'.format(percent),
+                round(values[int(round(last * percent / 100.0))], 2)
+            ) for percent in (50, 95, 99)
+        )
+
+    def dataset(self):
+        return dict(
+            (model._meta.model_name, model.objects.count())
+            for model in (
+                Profile, Ticket, Responder, Comment, Action, Expense, Review)
+        )
+
+    def bulk_create(self, model, objects):
+        """Inserts the objects in batches, returns the new objects IDs."""
+        ids = []
+        objects = iter(objects)
+
+        for batch in iter(lambda: list(islice(objects, self.BATCH_SIZE)), []):
+            with transaction.atomic():
+                ids += [obj.pk for obj in model.objects.bulk_create(batch)]
+
+        return ids
+
+    def seed(self, options):
+        """Generates the dataset with the factories."""
+        prefix = uuid.uuid4().hex[:8]
+
+        profile_ids = self.bulk_create(Profile, (
+            ProfileFactory.build(
+                email='{}-{}@bench.localhost'.format(prefix, num))
+            for num in range(options['profiles'])
+        ))
+        self.stderr.write('Generated {} profiles.'.format(len(profile_ids)))
+
+        ticket_ids = self.bulk_create(Ticket, (
+            TicketFactory.build(
+                requester=Profile(pk=random.choice(profile_ids)))
+            for _ in range(options['tickets'])
+        ))
+
+        # Spread the dates, the digest skips most of the tickets.
+        for num in range(0, len(ticket_ids), self.BATCH_SIZE):
+            Ticket.objects.filter(
+                id__in=ticket_ids[num:num + self.BATCH_SIZE]
+            ).update(
+                created_at=RawSQL(
+                    "now() - random() * interval '365 days'", []),
+                sent_notifications_at=RawSQL(
+                    "CASE WHEN random() < 0.99 THEN now() - interval '1 day' "
+                    "END", [])
+            )
+
+        self.stderr.write('Generated {} tickets.'.format(len(ticket_ids)))
+
+        responder_ids = self.bulk_create(Responder, (
+            ResponderFactory.build(
+                ticket=Ticket(pk=ticket_id),
+                user=Profile(pk=random.choice(profile_ids))
+            ) for ticket_id in ticket_ids
+        ))
+        self.stderr.write(
+            'Generated {} responders.'.format(len(responder_ids)))
+
+        comment_ids = self.bulk_create(Comment, (
+            CommentFactory.build(
+                ticket=Ticket(pk=random.choice(ticket_ids)),
+                user=Profile(pk=random.choice(profile_ids))
+            ) for _ in range(options['comments'])
+        ))
+        self.stderr.write('Generated {} comments.'.format(len(comment_ids)))
+
+        action_ids = self.bulk_create(Action, (
+            self.build_action(profile_ids, ticket_ids)
+            for _ in range(options['actions'])
+        ))
+        self.stderr.write('Generated {} actions.'.format(len(action_ids)))
+
+        expense_ids = self.bulk_create(Expense, (
+            ExpenseFactory.build(
+                ticket=Ticket(pk=random.choice(ticket_ids)),
+                user=Profile(pk=random.choice(profile_ids))
+            ) for _ in range(options['expenses'])
+        ))
+        self.stderr.write('Generated {} expenses.'.format(len(expense_ids)))
+
+        review_ids = self.bulk_create(Review, (
+            ReviewFactory.build(ticket=Ticket(pk=random.choice(ticket_ids)))
+            for _ in range(options['reviews'])
+        ))
+        self.stderr.write('Generated {} reviews.'.format(len(review_ids)))
+
+        # Bulk inserts do not update the tickets counters.
+        for num in range(0, len(ticket_ids), self.BATCH_SIZE):
+            Ticket.repair_counters(
+                ticket_ids[num:num + self.BATCH_SIZE], touch=False)
+
+        self.stderr.write('Computed the tickets counters.')
+
+        # Bulk inserts do not send the model signals.
+        for model in (Profile, Ticket, Responder, Review):
+            bump_version(model)
+
+    def build_action(self, profile_ids, ticket_ids):
+        verb = random.choice(self.VERBS)
+        action = None
+
+        if verb == 'responder:create':
+            action = Profile(pk=random.choice(profile_ids))
+
+        return Action(
+            actor=Profile(pk=random.choice(profile_ids)),
+            target=Ticket(pk=random.choice(ticket_ids)),
+            action=action,
+            verb=verb
+        )
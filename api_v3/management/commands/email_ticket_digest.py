@@ -25,7 +25,7 @@ class Command(BaseCommand):
     )
 
     @staticmethod
-    @queue.task(schedule_at='1d')
+    @queue.task(schedule_at='1d', key='digest:{0}', replace=False)
     def schedule(_job_id, request_host):
         """Task job handler.
 
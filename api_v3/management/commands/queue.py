@@ -1,4 +1,6 @@
+import json
 import logging
+from datetime import datetime, timedelta
 from distutils.util import strtobool
 
 from django.core.management.base import BaseCommand
@@ -9,6 +11,18 @@ from api_v3.models.queue_job import QueueJob, queue
 class Command(BaseCommand):
     help = 'Starts the jobs queue'
 
+    @staticmethod
+    @queue.task(schedule_at='1d', key='queue:clean', replace=False)
+    def schedule_clean(_job_id, days):
+        """Task job handler.
+
+        Run it manually once and it will reschedule itself on a daily basis.
+        """
+        Command().clean(days)
+
+        # Reschedule...
+        Command.schedule_clean(days)
+
     def add_arguments(self, parser):
         parser.add_argument(
             '--inspect',
@@ -18,15 +32,41 @@ class Command(BaseCommand):
             '--clean',
             help='Removes processed jobs.'
         )
+        parser.add_argument(
+            '--days', type=int, default=settings.QUEUE_RETENTION_DAYS,
+            help='Keeps the jobs processed in the last given days.'
+        )
+        parser.add_argument(
+            '--failed-days', type=int,
+            default=settings.QUEUE_FAILED_RETENTION_DAYS,
+            help='Keeps the jobs failed in the last given days.'
+        )
+        parser.add_argument(
+            '--schedule-clean', action='store_true',
+            help='Schedules the daily removal of the processed jobs.'
+        )
+        parser.add_argument(
+            '--metrics', type=int,
+            help='Shows the queue metrics for the last given hours.'
+        )
 
     def handle(self, *args, **options):
         """Runs the queue."""
+        if options['schedule_clean']:
+            Command.schedule_clean(options['days'])
+            self.stdout.write('Cleanup scheduled...')
+
+            return None
+
         if options['clean']:
-            deleted = QueueJob.objects.filter(
-                dequeued_at__isnull=False
-            ).delete()
+            self.clean(options['days'], options['failed_days'])
+
+            return None
 
-            self.stdout.write('Removed {0} jobs.'.format(deleted[0]))
+        if options['metrics']:
+            since = datetime.utcnow() - timedelta(hours=options['metrics'])
+            self.stdout.write(json.dumps(
+                QueueJob.metrics(since), indent=2, default=str))
 
             return None
 
@@ -52,3 +92,20 @@ class Command(BaseCommand):
             logger.setLevel(logging.WARNING)
 
         queue.work()
+
+    def clean(self, days, failed_days=None):
+        """Removes the jobs processed or failed before the last given days.
+        """
+        if failed_days is None:
+            failed_days = settings.QUEUE_FAILED_RETENTION_DAYS
+
+        now = datetime.utcnow()
+        removed = QueueJob.delete_processed(
+            now - timedelta(days=days), settings.QUEUE_CLEAN_BATCH_SIZE)
+        failed = QueueJob.delete_failed(
+            now - timedelta(days=failed_days),
+            settings.QUEUE_CLEAN_BATCH_SIZE
+        )
+
+        self.stdout.write('Removed {0} jobs.'.format(removed))
+        self.stdout.write('Removed {0} failed jobs.'.format(failed))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from api_v3.models import Ticket
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the tickets comments, attachments and expenses counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Tickets repaired per transaction.'
+        )
+
+    def handle(self, *args, **options):
+        """Repairs the tickets in batches, in the ID order."""
+        batch_size = max(options['batch_size'], 1)
+        last_id = 0
+        total = fixed = 0
+
+        while True:
+            ticket_ids = list(
+                Ticket.objects.filter(id__gt=last_id).order_by('id')
+                .values_list('id', flat=True)[:batch_size]
+            )
+
+            if not ticket_ids:
+                break
+
+            fixed += Ticket.repair_counters(ticket_ids)
+            total += len(ticket_ids)
+            last_id = ticket_ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(
+            'Fixed {} of {} tickets.'.format(fixed, total)))
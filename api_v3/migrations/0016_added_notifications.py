@@ -0,0 +1,45 @@
+# Generated by Django 4.0.7 on 2026-10-19 12:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_v3', '0015_added_reviews'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.AutoField(
+                    auto_created=True,
+                    primary_key=True,
+                    serialize=False,
+                    verbose_name='ID')),
+                ('email', models.CharField(max_length=512)),
+                ('name', models.CharField(
+                    blank=True, max_length=512, null=True)),
+                ('template', models.CharField(max_length=255)),
+                ('subject', models.CharField(max_length=255)),
+                ('request_host', models.CharField(max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('comment', models.ForeignKey(
+                    null=True,
+                    on_delete=django.db.models.deletion.DO_NOTHING,
+                    to='api_v3.comment')),
+                ('ticket', models.ForeignKey(
+                    on_delete=django.db.models.deletion.DO_NOTHING,
+                    related_name='notifications',
+                    to='api_v3.ticket')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(
+                fields=['email', 'ticket', 'created_at'],
+                name='api_v3_noti_email_fcd0f4_idx'),
+        ),
+    ]
@@ -0,0 +1,148 @@
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+OPEN_STATUSES = ('new', 'in-progress', 'pending')
+# The single column indexes of these are dropped
+DROPPED_INDEXES_COLUMNS = ('countries', 'tags', 'status', 'requester_id')
+
+
+def drop_columns_indexes(apps, schema_editor):
+    """Drops the columns indexes, without blocking the tickets writes."""
+    connection = schema_editor.connection
+
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(
+            cursor, 'api_v3_ticket')
+
+    for name, constraint in sorted(constraints.items()):
+        # The new GIN indexes are kept
+        if not constraint['index'] or constraint['primary_key'] or (
+                constraint['unique'] or len(constraint['columns']) != 1 or (
+                    constraint['type'] != models.Index.suffix)):
+            continue
+
+        if constraint['columns'][0] in DROPPED_INDEXES_COLUMNS:
+            schema_editor.execute(
+                'DROP INDEX CONCURRENTLY IF EXISTS {}'.format(
+                    schema_editor.quote_name(name)))
+
+
+def create_columns_indexes(apps, schema_editor):
+    """Restores the columns indexes, without blocking the tickets writes."""
+    indexes = [(column, '', '') for column in DROPPED_INDEXES_COLUMNS] + [
+        ('status', '_like', ' varchar_pattern_ops')]
+
+    for column, suffix, opclass in indexes:
+        schema_editor.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS {} '
+            'ON api_v3_ticket ({}{})'.format(
+                schema_editor.quote_name(
+                    schema_editor._create_index_name(
+                        'api_v3_ticket', [column], suffix=suffix)),
+                schema_editor.quote_name(column),
+                opclass
+            )
+        )
+
+
+class Migration(migrations.Migration):
+
+    # The indexes are built concurrently, outside of a transaction
+    atomic = False
+
+    dependencies = [
+        ('api_v3', '0016_added_notifications'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='ticket',
+            index=models.Index(
+                fields=['status', 'created_at'],
+                name='api_v3_tick_status_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='ticket',
+            index=models.Index(
+                fields=['requester', 'created_at'],
+                name='api_v3_tick_requester_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='ticket',
+            index=models.Index(
+                condition=models.Q(status__in=OPEN_STATUSES),
+                fields=['created_at'],
+                name='api_v3_tick_open_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='ticket',
+            index=models.Index(
+                condition=models.Q(status__in=OPEN_STATUSES),
+                fields=['deadline_at'],
+                name='api_v3_tick_open_deadline_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='ticket',
+            index=models.Index(
+                fields=['sent_notifications_at'],
+                name='api_v3_tick_sent_notif_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='ticket',
+            index=GinIndex(
+                fields=['countries'], name='api_v3_tick_countries_gin'),
+        ),
+        AddIndexConcurrently(
+            model_name='ticket',
+            index=GinIndex(fields=['tags'], name='api_v3_tick_tags_gin'),
+        ),
+        # The B-tree array indexes are replaced by the GIN ones, the others
+        # are covered by the composite indexes above
+        migrations.SeparateDatabaseAndState(state_operations=[
+            migrations.AlterField(
+                model_name='ticket',
+                name='countries',
+                field=ArrayField(
+                    base_field=models.CharField(max_length=255, null=True),
+                    default=list,
+                    size=None),
+            ),
+            migrations.AlterField(
+                model_name='ticket',
+                name='tags',
+                field=ArrayField(
+                    base_field=models.CharField(max_length=255, null=True),
+                    default=list,
+                    size=None),
+            ),
+            migrations.AlterField(
+                model_name='ticket',
+                name='status',
+                field=models.CharField(
+                    choices=[
+                        ('new', 'New'),
+                        ('in-progress', 'In Progress'),
+                        ('pending', 'Pending'),
+                        ('closed', 'Closed'),
+                        ('cancelled', 'Cancelled')
+                    ],
+                    default='new',
+                    max_length=70),
+            ),
+            migrations.AlterField(
+                model_name='ticket',
+                name='requester',
+                field=models.ForeignKey(
+                    db_index=False,
+                    on_delete=django.db.models.deletion.DO_NOTHING,
+                    related_name='requested_tickets',
+                    to=settings.AUTH_USER_MODEL),
+            ),
+        ]),
+        migrations.RunPython(drop_columns_indexes, create_columns_indexes),
+    ]
@@ -0,0 +1,59 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+TRIGRAM_FIELDS = ('first_name', 'last_name', 'company_name')
+
+
+def add_trigram_indexes(apps, schema_editor):
+    """Adds the trigram indexes, if the `pg_trgm` extension is available.
+
+    Without it, the fuzzy search does only prefix matching. The extension is
+    trusted since Postgres 13, on older versions create it as a superuser
+    before migrating.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+
+        if cursor.fetchone() is None:
+            return
+
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    for field in TRIGRAM_FIELDS:
+        schema_editor.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS api_v3_tick_{0}_trgm '
+            'ON api_v3_ticket USING gin ({0} gin_trgm_ops)'.format(field)
+        )
+
+
+def remove_trigram_indexes(apps, schema_editor):
+    for field in TRIGRAM_FIELDS:
+        schema_editor.execute(
+            'DROP INDEX CONCURRENTLY IF EXISTS api_v3_tick_{}_trgm'.format(
+                field))
+
+
+class Migration(migrations.Migration):
+
+    # The tickets are not locked while building the indexes
+    atomic = False
+
+    dependencies = [
+        ('api_v3', '0017_added_ticket_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='ticket',
+            index=GinIndex(
+                SearchVector(
+                    'first_name', 'last_name', 'company_name', 'background',
+                    config='simple'),
+                name='api_v3_tick_search_gin'),
+        ),
+        migrations.RunPython(add_trigram_indexes, remove_trigram_indexes),
+    ]
@@ -0,0 +1,106 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.contrib.postgres.search import SearchVectorField
+from django.db import migrations
+
+
+BACKFILL_BATCH_SIZE = 1000
+
+# Keeps the comment vector up to date, including the bulk inserts, and
+# refreshes the author comments vectors when the author names change
+CREATE_TRIGGERS = '''
+CREATE FUNCTION api_v3_comment_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := setweight(
+        to_tsvector('english', coalesce(NEW.body, '')) ||
+        to_tsvector('english', coalesce((
+            SELECT concat_ws(' ', email, first_name, last_name)
+            FROM accounts_profile WHERE id = NEW.user_id
+        ), '')),
+        'A'
+    );
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER api_v3_comment_search_vector
+BEFORE INSERT OR UPDATE ON api_v3_comment
+FOR EACH ROW EXECUTE FUNCTION api_v3_comment_search_vector();
+
+CREATE FUNCTION api_v3_profile_comments_search_vector() RETURNS trigger AS $$
+BEGIN
+    UPDATE api_v3_comment SET search_vector = NULL WHERE user_id = NEW.id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER api_v3_profile_comments_search_vector
+AFTER UPDATE OF email, first_name, last_name ON accounts_profile
+FOR EACH ROW WHEN (
+    (OLD.email, OLD.first_name, OLD.last_name) IS DISTINCT FROM
+    (NEW.email, NEW.first_name, NEW.last_name)
+)
+EXECUTE FUNCTION api_v3_profile_comments_search_vector();
+'''
+
+DROP_TRIGGERS = '''
+DROP TRIGGER IF EXISTS api_v3_profile_comments_search_vector
+    ON accounts_profile;
+DROP FUNCTION IF EXISTS api_v3_profile_comments_search_vector();
+DROP TRIGGER IF EXISTS api_v3_comment_search_vector ON api_v3_comment;
+DROP FUNCTION IF EXISTS api_v3_comment_search_vector();
+'''
+
+# The trigger computes the vectors of the updated comments
+BACKFILL_SQL = '''
+UPDATE api_v3_comment SET search_vector = NULL
+WHERE id IN (
+    SELECT id FROM api_v3_comment WHERE id > %s ORDER BY id LIMIT %s
+)
+RETURNING id
+'''
+
+
+def backfill_search_vectors(apps, schema_editor):
+    """Computes the existing comments vectors in batches.
+
+    Every batch is committed on its own, the comments are not locked for
+    the whole backfill.
+    """
+    last_id = 0
+
+    while True:
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(BACKFILL_SQL, [last_id, BACKFILL_BATCH_SIZE])
+            ids = [row[0] for row in cursor.fetchall()]
+
+        if not ids:
+            break
+
+        last_id = max(ids)
+
+
+class Migration(migrations.Migration):
+
+    # The comments are not locked while adding the vectors and the index
+    atomic = False
+
+    dependencies = [
+        ('api_v3', '0018_added_ticket_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='search_vector',
+            field=SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunSQL(CREATE_TRIGGERS, DROP_TRIGGERS),
+        migrations.RunPython(
+            backfill_search_vectors, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name='comment',
+            index=GinIndex(
+                fields=['search_vector'], name='api_v3_comm_search_gin'),
+        ),
+    ]
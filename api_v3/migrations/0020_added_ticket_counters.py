@@ -0,0 +1,121 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+BACKFILL_BATCH_SIZE = 1000
+
+# A copy of the `Ticket.COUNTERS_SQL` at the time of this migration
+BACKFILL_SQL = '''
+    WITH counters AS (
+        SELECT
+            api_v3_ticket.id,
+            (
+                SELECT COUNT(*) FROM api_v3_comment
+                WHERE api_v3_comment.ticket_id = api_v3_ticket.id
+            ) AS comments_count,
+            (
+                SELECT COUNT(*) FROM api_v3_attachment
+                WHERE api_v3_attachment.ticket_id = api_v3_ticket.id
+            ) AS attachments_count,
+            COALESCE((
+                SELECT JSONB_OBJECT_AGG(currency, total) FROM (
+                    SELECT
+                        amount_currency AS currency,
+                        SUM(amount)::NUMERIC(19, 4)::TEXT AS total
+                    FROM api_v3_expense
+                    WHERE api_v3_expense.ticket_id = api_v3_ticket.id
+                        AND amount IS NOT NULL
+                    GROUP BY amount_currency
+                ) AS totals
+            ), '{}'::JSONB) AS expenses_total,
+            GREATEST(
+                (
+                    SELECT MAX(created_at) FROM api_v3_comment
+                    WHERE api_v3_comment.ticket_id = api_v3_ticket.id
+                ),
+                (
+                    SELECT MAX(created_at) FROM api_v3_attachment
+                    WHERE api_v3_attachment.ticket_id = api_v3_ticket.id
+                ),
+                (
+                    SELECT MAX(created_at) FROM api_v3_expense
+                    WHERE api_v3_expense.ticket_id = api_v3_ticket.id
+                )
+            ) AS last_activity_at
+        FROM api_v3_ticket
+        WHERE api_v3_ticket.id = ANY(%s)
+    )
+    UPDATE api_v3_ticket SET
+        comments_count = counters.comments_count,
+        attachments_count = counters.attachments_count,
+        expenses_total = counters.expenses_total,
+        last_activity_at = counters.last_activity_at
+    FROM counters
+    WHERE api_v3_ticket.id = counters.id
+'''
+
+
+def backfill_counters(apps, schema_editor):
+    """Computes the counters in batches, every batch is committed on its own.
+
+    The tickets did not change, their `updated_at` is kept. The counters
+    changed while the batches run are fixed with the
+    `repair_ticket_counters` command.
+    """
+    Ticket = apps.get_model('api_v3', 'Ticket')
+    using = schema_editor.connection.alias
+    last_id = 0
+
+    while True:
+        ticket_ids = list(
+            Ticket.objects.using(using).filter(id__gt=last_id)
+            .order_by('id').values_list('id', flat=True)[:BACKFILL_BATCH_SIZE]
+        )
+
+        if not ticket_ids:
+            break
+
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(BACKFILL_SQL, [ticket_ids])
+
+        last_id = ticket_ids[-1]
+
+
+class Migration(migrations.Migration):
+
+    # The tickets are not locked while adding the index and the counters
+    atomic = False
+
+    dependencies = [
+        ('api_v3', '0019_added_comment_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='comments_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='attachments_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='expenses_total',
+            field=models.JSONField(default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='last_activity_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        AddIndexConcurrently(
+            model_name='ticket',
+            index=models.Index(
+                fields=['last_activity_at'],
+                name='api_v3_tick_activity_idx'),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations
+
+from api_v3.misc.cache import VERSION_SEQUENCE
+
+
+# The tables of the models in `api_v3.misc.cache.VERSIONED_MODELS`
+VERSIONED_TABLES = (
+    'accounts_profile',
+    'api_v3_responder',
+    'api_v3_review',
+    'api_v3_subscriber',
+    'api_v3_ticket',
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_v3', '0020_added_ticket_counters'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE SEQUENCE IF NOT EXISTS "{}"'.format(
+                VERSION_SEQUENCE.format(table)),
+            'DROP SEQUENCE IF EXISTS "{}"'.format(
+                VERSION_SEQUENCE.format(table)),
+        )
+        for table in VERSIONED_TABLES
+    ]
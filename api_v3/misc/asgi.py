@@ -0,0 +1,81 @@
+import django
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIHandler
+
+
+class StreamingASGIHandler(ASGIHandler):
+    """ASGI handler which does not block the event loop on streaming.
+
+    Django consumes the streaming responses (exports, downloads) inside the
+    event loop. Here, the response parts are read in the request thread, in
+    batches of up to `chunk_size` bytes, and sent to the client in between.
+    A slow client only holds a pending coroutine, not a worker.
+    """
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super(StreamingASGIHandler, self).send_response(
+                response, send)
+
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': self.get_headers(response),
+        })
+
+        parts = iter(response)
+        read = sync_to_async(self.read_chunk, thread_sensitive=True)
+
+        while True:
+            chunk = await read(parts)
+
+            if not chunk:
+                break
+
+            await send({
+                'type': 'http.response.body',
+                'body': chunk,
+                'more_body': True
+            })
+
+        await send({'type': 'http.response.body'})
+        await sync_to_async(response.close, thread_sensitive=True)()
+
+    def get_headers(self, response):
+        headers = []
+
+        for header, value in response.items():
+            if isinstance(header, str):
+                header = header.encode('ascii')
+            if isinstance(value, str):
+                value = value.encode('latin1')
+
+            headers.append((bytes(header), bytes(value)))
+
+        for cookie in response.cookies.values():
+            headers.append((
+                b'Set-Cookie',
+                cookie.output(header='').encode('ascii').strip()
+            ))
+
+        return headers
+
+    def read_chunk(self, parts):
+        """Reads the next response parts, up to the chunk size."""
+        chunk = []
+        size = 0
+
+        for part in parts:
+            chunk.append(part)
+            size += len(part)
+
+            if size >= self.chunk_size:
+                break
+
+        return b''.join(chunk)
+
+
+def get_asgi_application():
+    """Same as the Django one, with the streaming handler."""
+    django.setup(set_prefix=False)
+    return StreamingASGIHandler()
@@ -0,0 +1,59 @@
+from django.db import connection, transaction
+
+
+# The models with a version counter, see the `0021_added_models_versions`
+VERSIONED_MODELS = (
+    'api_v3.profile',
+    'api_v3.responder',
+    'api_v3.review',
+    'api_v3.subscriber',
+    'api_v3.ticket',
+)
+
+VERSION_SEQUENCE = '{}_version'
+
+
+def version_sequence(model):
+    """Returns the Postgres sequence holding the model version counter.
+
+    The sequences are shared by every worker, are incremented atomically,
+    and are not rolled back with the transaction.
+    """
+    if model._meta.label_lower not in VERSIONED_MODELS:
+        raise ValueError(
+            'The {} model has no version counter.'.format(
+                model._meta.label))
+
+    return VERSION_SEQUENCE.format(model._meta.db_table)
+
+
+def get_versions(models):
+    """Returns the version counters of the models, in the same order."""
+    qn = connection.ops.quote_name
+    # A new sequence returns its start value on the first `nextval`
+    columns = ', '.join(
+        '(SELECT last_value + is_called::int FROM {})'.format(
+            qn(version_sequence(model)))
+        for model in models
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT ' + columns)
+        return list(cursor.fetchone())
+
+
+def _increment(sequence):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT nextval(%s)', [sequence])
+
+
+def bump_version(model):
+    """Invalidates any cached entries depending on the model.
+
+    The counter is bumped again once the transaction is committed, otherwise
+    a concurrent read could cache the old rows under the new version.
+    """
+    sequence = version_sequence(model)
+
+    _increment(sequence)
+    transaction.on_commit(lambda: _increment(sequence))
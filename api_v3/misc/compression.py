@@ -0,0 +1,185 @@
+import gzip
+import io
+import zlib
+
+from django.conf import settings
+from django.http import FileResponse
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+class GzipCompressor(object):
+    """Incremental gzip, the same output format as `gzip.compress()`."""
+
+    def __init__(self, level):
+        self.buffer = io.BytesIO()
+        self.file = gzip.GzipFile(
+            mode='wb', fileobj=self.buffer, compresslevel=level, mtime=0)
+
+    def read(self):
+        data = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+
+    def process(self, data):
+        self.file.write(data)
+        return self.read()
+
+    def flush(self):
+        self.file.flush(zlib.Z_SYNC_FLUSH)
+        return self.read()
+
+    def finish(self):
+        self.file.close()
+        return self.read()
+
+
+class CompressionMiddleware(object):
+    """Compresses the responses with brotli, if installed, or gzip.
+
+    The encoding is picked from the `Accept-Encoding` header. Responses
+    smaller than `COMPRESSION_MIN_SIZE` bytes are sent as is. Streaming
+    responses (the exports) are compressed part by part, and flushed every
+    `FLUSH_SIZE` bytes so the client gets the rows as they are generated.
+
+    File downloads (the attachments) and already compressed content types
+    are skipped.
+    """
+
+    GZIP_LEVEL = 6
+    # Brotli is much slower on the higher qualities, for a small gain
+    BROTLI_QUALITY = 5
+    FLUSH_SIZE = 64 * 1024
+
+    INCOMPRESSIBLE_TYPES = (
+        'application/gzip',
+        'application/octet-stream',
+        'application/pdf',
+        'application/x-gzip',
+        'application/zip',
+        'audio/',
+        'image/',
+        'video/',
+    )
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.encodings = ('br', 'gzip') if brotli else ('gzip',)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if not self.is_compressible(response):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        encoding = self.get_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', ''))
+
+        if not encoding:
+            return response
+
+        if response.streaming:
+            response.streaming_content = self.compress_sequence(
+                encoding, response.streaming_content)
+            del response['Content-Length']
+        else:
+            content = self.compress(encoding, response.content)
+
+            # Leaves alone the content which does not get any smaller
+            if len(content) >= len(response.content):
+                return response
+
+            response.content = content
+            response['Content-Length'] = str(len(content))
+
+        # The compressed content is not byte for byte the same
+        etag = response.get('ETag')
+
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+
+        response['Content-Encoding'] = encoding
+
+        return response
+
+    def is_compressible(self, response):
+        if response.has_header('Content-Encoding'):
+            return False
+
+        if isinstance(response, FileResponse):
+            return False
+
+        content_type = response.get('Content-Type', '').lower()
+
+        if content_type.startswith(self.INCOMPRESSIBLE_TYPES):
+            return False
+
+        if response.streaming:
+            return True
+
+        return len(response.content) >= settings.COMPRESSION_MIN_SIZE
+
+    def get_encoding(self, accept_encoding):
+        """Returns the preferred encoding, the server order breaks ties."""
+        accepted = {}
+
+        for coding in accept_encoding.lower().split(','):
+            coding, _, params = coding.partition(';')
+            quality = 1.0
+
+            for param in params.split(';'):
+                name, _, value = param.strip().partition('=')
+
+                if name == 'q':
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0
+
+            if coding.strip():
+                accepted[coding.strip()] = quality
+
+        qualities = [
+            (accepted.get(encoding, accepted.get('*', 0)), encoding)
+            for encoding in self.encodings
+        ]
+        quality, encoding = max(
+            qualities, key=lambda quality_encoding: quality_encoding[0])
+
+        return encoding if quality > 0 else None
+
+    def get_compressor(self, encoding):
+        if encoding == 'br':
+            return brotli.Compressor(quality=self.BROTLI_QUALITY)
+
+        return GzipCompressor(self.GZIP_LEVEL)
+
+    def compress(self, encoding, content):
+        if encoding == 'br':
+            return brotli.compress(content, quality=self.BROTLI_QUALITY)
+
+        return gzip.compress(content, compresslevel=self.GZIP_LEVEL, mtime=0)
+
+    def compress_sequence(self, encoding, sequence):
+        compressor = self.get_compressor(encoding)
+        pending = 0
+
+        for part in sequence:
+            data = compressor.process(part)
+            pending += len(part)
+
+            if pending >= self.FLUSH_SIZE:
+                data += compressor.flush()
+                pending = 0
+
+            if data:
+                yield data
+
+        yield compressor.finish()
@@ -0,0 +1,26 @@
+import functools
+
+from django.db import connections
+
+
+def close_unusable_connections():
+    """Closes the persistent connections which are no longer usable.
+
+    Backport of the Django 4.1 `CONN_HEALTH_CHECKS` database setting. A
+    reused connection is checked before the request, a database restart
+    does not fail the first requests of every worker.
+    """
+    for conn in connections.all():
+        if not conn.settings_dict.get('CONN_HEALTH_CHECKS'):
+            continue
+
+        if conn.connection is not None and not conn.is_usable():
+            conn.close()
+
+
+@functools.lru_cache(maxsize=None)
+def has_extension(name, using='default'):
+    """Checks if the database extension is installed, once per process."""
+    with connections[using].cursor() as cursor:
+        cursor.execute('SELECT 1 FROM pg_extension WHERE extname = %s', [name])
+        return cursor.fetchone() is not None
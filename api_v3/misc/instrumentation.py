@@ -0,0 +1,205 @@
+import bisect
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+
+class Histogram(object):
+    """Fixed buckets histogram, cheap enough to update on every request."""
+
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.max = 0
+
+    def add(self, value):
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def percentile(self, percent):
+        """Returns the upper bound of the bucket holding the percentile."""
+        if not self.count:
+            return None
+
+        rank = self.count * percent / 100.0
+        seen = 0
+
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+
+            if seen >= rank and bucket:
+                break
+
+        if index < len(self.bounds):
+            return min(self.bounds[index], self.max)
+
+        return self.max
+
+    def summary(self):
+        return {
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'max': self.max
+        }
+
+
+class RouteMetrics(object):
+    """Aggregated metrics for a route."""
+
+    # Milliseconds
+    TIME_BOUNDS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+    QUERIES_BOUNDS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+    def __init__(self, route):
+        self.route = route
+        self.queries = Histogram(self.QUERIES_BOUNDS)
+        self.sql = Histogram(self.TIME_BOUNDS)
+        self.serialize = Histogram(self.TIME_BOUNDS)
+        self.render = Histogram(self.TIME_BOUNDS)
+        self.duration = Histogram(self.TIME_BOUNDS)
+
+    @property
+    def count(self):
+        return self.duration.count
+
+    def add(self, metrics):
+        self.queries.add(metrics.queries)
+        self.sql.add(metrics.sql)
+        self.serialize.add(metrics.serialize)
+        self.render.add(metrics.render)
+        self.duration.add(metrics.duration)
+
+
+class MetricsRegistry(object):
+    """In process, per route metrics."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes = {}
+
+    def record(self, route, metrics):
+        with self.lock:
+            if route not in self.routes:
+                self.routes[route] = RouteMetrics(route)
+
+            self.routes[route].add(metrics)
+
+    def snapshot(self):
+        with self.lock:
+            return [
+                dict(
+                    route=route.route,
+                    count=route.count,
+                    queries=route.queries.summary(),
+                    sql=route.sql.summary(),
+                    serialize=route.serialize.summary(),
+                    render=route.render.summary(),
+                    duration=route.duration.summary()
+                ) for route in sorted(
+                    self.routes.values(), key=lambda r: r.route)
+            ]
+
+    def reset(self):
+        with self.lock:
+            self.routes = {}
+
+
+registry = MetricsRegistry()
+
+
+class RequestMetrics(object):
+    """Request SQL queries and timings. All durations are in milliseconds.
+
+    The ``serialize`` and ``render`` durations do not include the SQL time.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.sql = 0.0
+        self.serialize = 0.0
+        self.render = 0.0
+        self.duration = 0.0
+        self.started_at = time.perf_counter()
+        self.rendering_at = None
+        self.rendering_sql = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        """Database execute wrapper, counts and times the queries."""
+        started_at = time.perf_counter()
+
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql += (time.perf_counter() - started_at) * 1000
+
+    def start_rendering(self):
+        self.rendering_at = time.perf_counter()
+        self.rendering_sql = self.sql
+
+    def finish(self):
+        finished_at = time.perf_counter()
+        rendering_at = self.rendering_at or finished_at
+        rendering_sql = self.sql if self.rendering_at is None else (
+            self.rendering_sql)
+
+        self.duration = (finished_at - self.started_at) * 1000
+        self.serialize = max(
+            (rendering_at - self.started_at) * 1000 - rendering_sql, 0)
+        self.render = max(
+            (finished_at - rendering_at) * 1000 - (self.sql - rendering_sql),
+            0
+        )
+
+    def server_timing(self):
+        """Returns the `Server-Timing` header value."""
+        return ', '.join([
+            'sql;desc="{} queries";dur={:.2f}'.format(self.queries, self.sql),
+            'serialize;dur={:.2f}'.format(self.serialize),
+            'render;dur={:.2f}'.format(self.render),
+            'total;dur={:.2f}'.format(self.duration)
+        ])
+
+
+class RequestMetricsMiddleware(object):
+    """Records the SQL queries count and timings of every request.
+
+    Streamed responses content is generated after the middleware returns,
+    the queries run while streaming are not recorded.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.metrics = RequestMetrics()
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(request.metrics))
+
+            response = self.get_response(request)
+
+        request.metrics.finish()
+
+        match = getattr(request, 'resolver_match', None)
+        registry.record(
+            match.view_name if match else 'unknown', request.metrics)
+
+        if settings.DEBUG:
+            response['Server-Timing'] = request.metrics.server_timing()
+
+        return response
+
+    def process_template_response(self, request, response):
+        """Called after the view, right before the response is rendered."""
+        request.metrics.start_rendering()
+
+        return response
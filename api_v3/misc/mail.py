@@ -0,0 +1,107 @@
+import threading
+from collections import OrderedDict
+
+from django.apps import apps
+from django.db import models
+from django.template.loader import get_template
+from django.utils.html import conditional_escape
+from django.utils.safestring import mark_safe
+
+from api_v3.misc.cache import get_versions
+
+
+class MailSkeleton(object):
+    """A mail template rendered once, with markers for the recipient fields.
+
+    Only plain variables (like ``{{ name }}``) can be recipient fields, the
+    values are escaped the same way the template would.
+    """
+
+    MARKER = '\x00{}\x00'
+
+    def __init__(self, template_name, context, fields):
+        self.fields = tuple(fields)
+        self.body = get_template(template_name).render(dict(
+            context,
+            **dict(
+                (field, mark_safe(self.MARKER.format(field)))
+                for field in self.fields
+            )
+        ))
+
+    def render(self, **values):
+        body = self.body
+
+        for field in self.fields:
+            body = body.replace(
+                self.MARKER.format(field), conditional_escape(values[field]))
+
+        return body
+
+
+class MailSkeletons(object):
+    """Bounded, per process, cache of the mail skeletons.
+
+    Entries are keyed by the context objects primary keys and the version
+    counters of the rendered models, any change to these renders the
+    skeletons again.
+    """
+
+    # The templates render the tickets and the users
+    VERSIONED_MODELS = ('api_v3.Ticket', 'api_v3.Profile')
+
+    def __init__(self, size=256):
+        self.size = size
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def key(self, template_name, context, fields):
+        values = []
+
+        for name, value in sorted(context.items()):
+            if isinstance(value, models.Model):
+                value = (value._meta.label, value.pk)
+
+            values.append((name, value))
+
+        versions = get_versions(
+            [apps.get_model(label) for label in self.VERSIONED_MODELS])
+
+        return (
+            template_name, tuple(values), tuple(sorted(fields)),
+            tuple(versions)
+        )
+
+    def get(self, template_name, context, fields):
+        key = self.key(template_name, context, fields)
+
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+
+        skeleton = MailSkeleton(template_name, context, fields)
+
+        with self.lock:
+            self.entries[key] = skeleton
+
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+        return skeleton
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+skeletons = MailSkeletons()
+
+
+def render_mail(template_name, context, **recipient):
+    """Renders the mail for a recipient, reusing the cached skeleton.
+
+    The ``recipient`` are the fields which change between the recipients.
+    """
+    return skeletons.get(template_name, context, recipient).render(
+        **recipient)
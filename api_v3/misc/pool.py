@@ -0,0 +1,230 @@
+import os
+import threading
+import time
+
+import psycopg2
+from django.conf import settings
+from psycopg2 import extensions
+from psycopg2.pool import PoolError
+
+
+class PoolTimeout(PoolError):
+    pass
+
+
+class ConnectionPool(object):
+    """Thread safe Postgres connections pool, opened lazily, per process.
+
+    Checkouts wait up to ``timeout`` seconds for a connection, once there
+    are ``size`` connections in use. Idle connections for more than
+    ``check_after`` seconds are checked before the checkout.
+
+    The ``reserve`` connections on top are for the reserved checkouts only.
+    The queue uses these, a request holding an ORM connection enqueues the
+    jobs even if the ORM connections are all in use.
+
+    With the app preloading, the pool is created before the server forks
+    the workers. A worker must not reuse the connections of the parent.
+    """
+
+    STATS = (
+        'checkouts', 'waits', 'timeouts', 'connects', 'discards', 'wait_ms')
+
+    def __init__(self, size, timeout=30, check_after=5, reserve=0,
+                 **params):
+        self.size = size
+        self.reserve = reserve
+        self.timeout = timeout
+        self.check_after = check_after
+        self.params = params
+        self.lock = threading.Condition()
+        self.pid = None
+
+    def setup(self):
+        """Resets the pool in a new process.
+
+        Inherited connections are dropped, not closed, the parent uses these.
+        """
+        if self.pid == os.getpid():
+            return
+
+        self.pid = os.getpid()
+        self.idle = []
+        self.used = 0
+        self.stats = dict((name, 0) for name in self.STATS)
+
+    def connect(self):
+        with self.lock:
+            self.stats['connects'] += 1
+
+        return psycopg2.connect(**self.params)
+
+    def is_usable(self, conn, idle_since):
+        if conn.closed:
+            return False
+
+        if time.monotonic() - idle_since < self.check_after:
+            return True
+
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute('SELECT 1')
+
+            if not conn.autocommit:
+                conn.rollback()
+        except psycopg2.Error:
+            return False
+
+        return True
+
+    def getconn(self, reserved=False):
+        started_at = time.monotonic()
+        size = self.size + (self.reserve if reserved else 0)
+
+        with self.lock:
+            self.setup()
+            self.stats['checkouts'] += 1
+
+            if self.used >= size:
+                self.stats['waits'] += 1
+
+            while self.used >= size:
+                left = self.timeout - (time.monotonic() - started_at)
+
+                if left <= 0 or not self.lock.wait(left):
+                    self.stats['timeouts'] += 1
+                    raise PoolTimeout(
+                        'No connection available in {}s.'.format(
+                            self.timeout))
+
+            self.stats['wait_ms'] += (time.monotonic() - started_at) * 1000
+            # Take the slot, then connect or check outside of the lock
+            self.used += 1
+            conn, idle_since = self.idle.pop() if self.idle else (None, None)
+
+        try:
+            if conn is not None and not self.is_usable(conn, idle_since):
+                self.discard(conn)
+                conn = None
+
+            return conn or self.connect()
+        except Exception:
+            with self.lock:
+                self.used -= 1
+                self.lock.notify_all()
+            raise
+
+    def putconn(self, conn, close=False):
+        """Returns the connection, rolls back any pending transaction."""
+        if not close and not conn.closed:
+            status = conn.info.transaction_status
+
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                close = True
+            elif status != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    close = True
+
+        # Queue notifications are never read from the pooled connections
+        del conn.notifies[:]
+
+        with self.lock:
+            self.setup()
+            self.used = max(self.used - 1, 0)
+
+            if close or conn.closed:
+                self.discard(conn)
+            else:
+                self.idle.append((conn, time.monotonic()))
+
+            # The waiters for a reserved and a regular slot are woken up
+            self.lock.notify_all()
+
+    def discard(self, conn):
+        with self.lock:
+            self.stats['discards'] += 1
+
+        if not conn.closed:
+            conn.close()
+
+    def closeall(self):
+        with self.lock:
+            self.setup()
+
+            while self.idle:
+                self.discard(self.idle.pop()[0])
+
+    def get_stats(self):
+        with self.lock:
+            self.setup()
+
+            return dict(
+                self.stats,
+                wait_ms=round(self.stats['wait_ms'], 2),
+                used=self.used,
+                idle=len(self.idle),
+                size=self.size,
+                reserve=self.reserve
+            )
+
+
+class Pools(object):
+    """Per process registry of the pools, one for every database.
+
+    The ORM and the queue connections to the same database share a pool.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pools = {}
+
+    def key(self, params):
+        aliases = {'dbname': 'database'}
+
+        return tuple(sorted(
+            (aliases.get(name, name), str(value))
+            for name, value in params.items() if value not in (None, '')
+        ))
+
+    def get(self, params):
+        key = self.key(params)
+
+        with self.lock:
+            if key not in self.pools:
+                self.pools[key] = ConnectionPool(
+                    settings.DATABASE_POOL_SIZE,
+                    timeout=settings.DATABASE_POOL_TIMEOUT,
+                    reserve=settings.DATABASE_POOL_QUEUE_RESERVE,
+                    **params
+                )
+
+            return self.pools[key]
+
+    def get_dsn(self, dsn):
+        return self.get(extensions.parse_dsn(dsn))
+
+    def snapshot(self):
+        with self.lock:
+            pools = list(self.pools.values())
+
+        return [
+            dict(
+                pool.get_stats(),
+                database='{}@{}'.format(
+                    pool.params.get('database') or pool.params.get('dbname'),
+                    pool.params.get('host', 'localhost')
+                )
+            ) for pool in pools
+        ]
+
+    def closeall(self):
+        with self.lock:
+            pools = list(self.pools.values())
+
+        for pool in pools:
+            pool.closeall()
+
+
+pools = Pools()
@@ -0,0 +1,36 @@
+import psycopg2.extras
+from django.db.backends.postgresql import base
+from django.utils.asyncio import async_unsafe
+
+from api_v3.misc.pool import pools
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL backend, the connections are checked out from the pool.
+
+    Closing the connection returns it to the pool, use it with the
+    `CONN_MAX_AGE` set to `0`.
+    """
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        self.pool = pools.get(conn_params)
+        connection = self.pool.getconn()
+
+        options = self.settings_dict['OPTIONS']
+        self.isolation_level = options.get(
+            'isolation_level', connection.isolation_level)
+
+        if self.isolation_level != connection.isolation_level:
+            connection.set_session(isolation_level=self.isolation_level)
+
+        # Same as Django, the queue registers the default loads() back
+        psycopg2.extras.register_default_jsonb(
+            conn_or_curs=connection, loads=lambda x: x)
+
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                return self.pool.putconn(self.connection)
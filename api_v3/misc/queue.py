@@ -1,16 +1,228 @@
+import threading
+from functools import wraps
+
+import psycopg2.extras
 from django.conf import settings
-from pq.tasks import PQ
+from pq.tasks import PQ, Queue as BaseQueue
+from pq.utils import convert_time_spec, utc_format
 from psycopg2.errors import UndefinedTable
-from psycopg2.pool import ThreadedConnectionPool
 
+from api_v3.misc.pool import pools
+
+
+# Jobs failed after all the retries are kept in this queue, never processed
+FAILED_QUEUE_NAME = '{}-failed'
+
+
+class Queue(BaseQueue):
+
+    def task(self, schedule_at=None, expected_at=None, max_retries=0,
+             retry_in='30s', key=None, replace=True):
+        """Task decorator, same as the `pq` one, with deduplication keys.
+
+        The ``key`` is formatted with the task arguments (ex.: `review:{0}`).
+        A pending job with the same key is replaced by the new one, or on
+        ``replace=False``, the new job is skipped.
+        """
+        def decorator(f):
+            f._path = '%s.%s' % (f.__module__, f.__qualname__)
+            f._max_retries = max_retries
+            f._retry_in = retry_in
+
+            self.handler_registry[f._path] = f
+
+            @wraps(f)
+            def wrapper(*args, **kwargs):
+                put_kwargs = dict(
+                    schedule_at=kwargs.pop('_schedule_at', None) or schedule_at,
+                    expected_at=kwargs.pop('_expected_at', None) or expected_at
+                )
+                data = dict(
+                    function=f._path,
+                    args=args,
+                    kwargs=kwargs,
+                    retried=0,
+                    retry_in=f._retry_in,
+                    max_retries=f._max_retries,
+                )
+
+                if key is None:
+                    return self.put(data, **put_kwargs)
+
+                return self.put_unique(
+                    key.format(*args, **kwargs), data, replace, **put_kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def put_unique(self, key, data, replace=True, schedule_at=None,
+                   expected_at=None):
+        """Puts the item into queue, unless there is a pending one with the key.
+
+        On ``replace``, the pending items with the key are removed first.
+        Returns the new or the pending item ID.
+        """
+        schedule_at = convert_time_spec(schedule_at)
+        expected_at = convert_time_spec(expected_at)
+
+        with self._transaction() as cursor:
+            # Serialize the concurrent puts with the same key
+            cursor.execute(
+                'SELECT pg_advisory_xact_lock(hashtext(%s))', (key, ))
+
+            if replace:
+                cursor.execute(
+                    'DELETE FROM %s WHERE q_name = %s '
+                    'AND dequeued_at IS NULL AND data->>\'key\' = %s',
+                    (self.table, self.name, key)
+                )
+            else:
+                cursor.execute(
+                    'SELECT id FROM %s WHERE q_name = %s '
+                    'AND dequeued_at IS NULL AND data->>\'key\' = %s',
+                    (self.table, self.name, key)
+                )
+                pending = cursor.fetchone()
+
+                if pending:
+                    return pending[0]
+
+            return self._put_item(
+                cursor, self.encode(self.dumps(dict(data, key=key))),
+                utc_format(schedule_at) if schedule_at is not None else None,
+                utc_format(expected_at) if expected_at is not None else None,
+            )
+
+    def work(self, burst=False):
+        """Processes the jobs, stops listening once done."""
+        try:
+            return super(Queue, self).work(burst=burst)
+        finally:
+            if self.pool is not None:
+                self.pool.release_listener()
+
+    def _listen(self, cursor):
+        """Listens on the connection, kept out of the shared pool."""
+        super(Queue, self)._listen(cursor)
+
+        if self.pool is not None:
+            self.pool.listen(cursor.connection)
+
+    def fail(self, job, data, e=None):
+        """Moves the job to the failed jobs queue, once out of retries."""
+        if data.get('max_retries', 0) <= data['retried']:
+            pq[FAILED_QUEUE_NAME.format(self.name)].put(
+                dict(data, job_id=job.id, error=repr(e)))
+
+        return super(Queue, self).fail(job, data, e)
+
+
+class QueuePool(object):
+    """The queue connections, from the shared pool.
+
+    A connection could be used by the ORM in between, the queue needs the
+    transactions and the decoded JSON back. The queue checkouts can use the
+    pool reserved connections.
+
+    A connection listening for the new jobs is kept out of the shared pool,
+    the thread which waits for the jobs gets it back on every checkout. The
+    queue table is created on the first checkout, if missing.
+    """
 
-pool = ThreadedConnectionPool(1, 5, settings.QUEUE_DATABASE_URL)
-pq = PQ(pool=pool)
+    def __init__(self, dsn):
+        self.dsn = dsn
+        self.pool = None
+        self.table_ready = False
+        self.listeners = threading.local()
+
+    def get_pool(self):
+        if self.pool is None:
+            self.pool = pools.get_dsn(self.dsn)
+
+        return self.pool
+
+    def get_listener(self):
+        conn = getattr(self.listeners, 'conn', None)
+
+        if conn is not None and conn.closed:
+            self.release_listener(close=True)
+            return None
+
+        return conn
+
+    def listen(self, conn):
+        """Keeps the listening connection for the current thread."""
+        self.listeners.conn = conn
+
+    def release_listener(self, close=False):
+        """Stops listening, returns the connection to the shared pool."""
+        conn = getattr(self.listeners, 'conn', None)
+        self.listeners.conn = None
+
+        if conn is None:
+            return
+
+        close = close or conn.closed
+
+        if not close:
+            try:
+                conn.rollback()
+
+                with conn.cursor() as cursor:
+                    cursor.execute('UNLISTEN *')
+
+                conn.commit()
+            except psycopg2.Error:
+                close = True
+
+        self.get_pool().putconn(conn, close=close)
+
+    def create_table(self):
+        self.table_ready = True
+
+        try:
+            len(queue)
+        except UndefinedTable:
+            pq.create()
+        except Exception:
+            self.table_ready = False
+            raise
+
+    def getconn(self):
+        if not self.table_ready:
+            self.create_table()
+
+        conn = self.get_listener()
+
+        if conn is not None:
+            return conn
+
+        conn = self.get_pool().getconn(reserved=True)
+        conn.autocommit = False
+        psycopg2.extras.register_default_jsonb(conn_or_curs=conn)
+
+        return conn
+
+    def putconn(self, conn, close=False):
+        if conn is getattr(self.listeners, 'conn', None):
+            if close or conn.closed:
+                return self.release_listener(close=True)
+
+            # The notifications only wake up the waiting thread
+            del conn.notifies[:]
+            return
+
+        return self.get_pool().putconn(conn, close=close)
+
+    def closeall(self):
+        self.release_listener()
+
+        return self.get_pool().closeall()
+
+
+pool = QueuePool(settings.QUEUE_DATABASE_URL)
+pq = PQ(pool=pool, queue_class=Queue)
 queue = pq[settings.QUEUE_NAME]
 # TODO: Look into this weird side-effect...
 queue.timeout = float(queue.timeout)
-
-try:
-    len(queue)
-except UndefinedTable:
-    pq.create()
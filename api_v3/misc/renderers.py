@@ -0,0 +1,324 @@
+import itertools
+import threading
+from collections import namedtuple
+from collections.abc import Iterable
+
+import inflection
+import rest_framework.fields
+import rest_framework.renderers
+import rest_framework.serializers
+import rest_framework_json_api.renderers
+from rest_framework.relations import ManyRelatedField
+from rest_framework.settings import api_settings
+from rest_framework_json_api import relations, utils
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+Plan = namedtuple('Plan', ['attributes', 'relationships', 'related'])
+
+
+class FastJSONRenderer(rest_framework.renderers.JSONRenderer):
+    """JSON renderer which encodes with `orjson`, if it is installed.
+
+    The output is the same as the stdlib one, the types `orjson` does not
+    encode the same way (dates and times, decimals) go through the REST
+    framework encoder. Indented output, the values `orjson` can not encode,
+    the floats the stdlib writes with an exponent (`orjson` does not format
+    these the same way) and the out of range floats (`orjson` encodes these
+    as `null`, the stdlib rejects them) fall back to the stdlib.
+    """
+
+    OPTIONS = (
+        orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if orjson else 0
+    )
+
+    # The stdlib writes the floats outside this range with an exponent
+    FLOATS_RANGE = (1e-4, 1e16)
+
+    def __init__(self, *args, **kwargs):
+        super(FastJSONRenderer, self).__init__(*args, **kwargs)
+        self.encoder = self.encoder_class()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+
+        if orjson is None or indent or not self.compact or (
+                self.ensure_ascii or not self.strict) or (
+                    self.has_invalid_floats(data)):
+            return super(FastJSONRenderer, self).render(
+                data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data, default=self.encoder.default, option=self.OPTIONS)
+        except orjson.JSONEncodeError:
+            return super(FastJSONRenderer, self).render(
+                data, accepted_media_type, renderer_context)
+
+        # Same as the stdlib renderer, these are not valid in JavaScript
+        return ret.replace(
+            b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+    @classmethod
+    def has_invalid_floats(cls, data):
+        """Checks the nested values for the floats `orjson` can not encode.
+
+        These are the floats written with an exponent and the out of range
+        ones.
+        """
+        low, high = cls.FLOATS_RANGE
+        stack = [data]
+
+        while stack:
+            value = stack.pop()
+
+            if isinstance(value, float):
+                value = abs(value)
+
+                # NaN fails every comparison
+                if (value and value < low) or not value < high:
+                    return True
+            elif isinstance(value, dict):
+                stack.extend(value.values())
+            elif isinstance(value, (list, tuple)):
+                stack.extend(value)
+
+        return False
+
+
+class JSONRenderer(
+        rest_framework_json_api.renderers.JSONRenderer, FastJSONRenderer):
+    """JSON API renderer, with the fast encoding.
+
+    The attribute and relationship names are formatted once per serializer
+    class and fields, not for every rendered object. The common relations
+    (resource and many resource related fields) are rendered from the
+    plan, the others by the stock renderer.
+
+    Only the attributes declared with a float, decimal or untyped field are
+    checked for the floats `orjson` can not encode. The other fields, the
+    method fields included, and the relationships are expected to never hold
+    floats.
+    """
+
+    MAX_PLANS = 1024
+
+    # Relationships kinds
+    RESOURCE = 'resource'
+    MANY_RESOURCE = 'many-resource'
+
+    # These never hold a float, as values or as containers children
+    NON_FLOAT_FIELDS = (
+        rest_framework.fields.BooleanField,
+        rest_framework.fields.CharField,
+        rest_framework.fields.ChoiceField,
+        rest_framework.fields.DateField,
+        rest_framework.fields.DateTimeField,
+        rest_framework.fields.DurationField,
+        rest_framework.fields.FileField,
+        rest_framework.fields.IntegerField,
+        rest_framework.fields.TimeField,
+        rest_framework.fields.UUIDField,
+        rest_framework.fields.SerializerMethodField,
+    )
+
+    plans = {}
+    plans_lock = threading.Lock()
+
+    # The formatted names of the attributes which may hold floats, these are
+    # checked in every resource
+    float_attributes = frozenset()
+
+    @classmethod
+    def has_floats(cls, field):
+        if isinstance(field, (
+                rest_framework.fields.ListField,
+                rest_framework.fields.DictField,
+                rest_framework.serializers.ListSerializer)):
+            return cls.has_floats(field.child)
+
+        if isinstance(field, rest_framework.serializers.Serializer):
+            return any(map(cls.has_floats, field.fields.values()))
+
+        return not isinstance(field, cls.NON_FLOAT_FIELDS)
+
+    @classmethod
+    def get_relationship_kind(cls, field):
+        if isinstance(field, relations.ResourceRelatedField):
+            return cls.RESOURCE
+
+        if isinstance(field, ManyRelatedField) and isinstance(
+                field.child_relation, relations.ResourceRelatedField):
+            return cls.MANY_RESOURCE
+
+    @classmethod
+    def has_links(cls, field):
+        field = getattr(field, 'child_relation', field)
+
+        return bool(
+            field.self_link_view_name or field.related_link_view_name)
+
+    @classmethod
+    def get_plan(cls, fields):
+        """Returns the attribute and relationship fields, formatted."""
+        serializer = getattr(fields, 'serializer', None)
+        key = (type(serializer), tuple(fields.keys()))
+        plan = cls.plans.get(key)
+
+        if plan is not None:
+            return plan
+
+        attributes, relationships, related = [], [], set()
+        float_attributes = set()
+
+        for name, field in fields.items():
+            is_relationship = utils.is_relationship_field(field)
+
+            if is_relationship and name != api_settings.URL_FIELD_NAME:
+                related.add(name)
+
+            if name == 'id' or field.write_only:
+                continue
+
+            if not is_relationship:
+                formatted = utils.format_field_name(name)
+                attributes.append((name, formatted, field.read_only))
+
+                if cls.has_floats(field):
+                    float_attributes.add(formatted)
+            elif name != api_settings.URL_FIELD_NAME:
+                kind = cls.get_relationship_kind(field)
+                relationships.append((
+                    name,
+                    utils.format_field_name(name),
+                    kind,
+                    kind is not None and cls.has_links(field),
+                    isinstance(field, relations.SkipDataMixin)
+                ))
+
+        plan = Plan(
+            tuple(attributes), tuple(relationships), frozenset(related))
+
+        with cls.plans_lock:
+            if len(cls.plans) >= cls.MAX_PLANS:
+                cls.plans.clear()
+
+            cls.plans[key] = plan
+            cls.float_attributes = cls.float_attributes | float_attributes
+
+        return plan
+
+    @classmethod
+    def has_invalid_floats(cls, data):
+        """Checks only the resources attributes which may hold floats."""
+        if not isinstance(data, dict) or not data.get('data'):
+            return super(JSONRenderer, cls).has_invalid_floats(data)
+
+        resources = data['data']
+
+        if isinstance(resources, dict):
+            resources = [resources]
+
+        values = [
+            value for name, value in data.items()
+            if name not in ('data', 'included')
+        ]
+
+        names = cls.float_attributes
+
+        for resource in itertools.chain(resources, data.get('included', ())):
+            attributes = resource.get('attributes') or {}
+
+            values.extend(attributes.get(name) for name in names)
+            values.append(resource.get('meta'))
+
+        return super(JSONRenderer, cls).has_invalid_floats(values)
+
+    @classmethod
+    def extract_attributes(cls, fields, resource):
+        data = {}
+
+        for name, formatted, read_only in cls.get_plan(fields).attributes:
+            # Skips the missing read only values, like the stock renderer
+            if read_only and name not in resource:
+                continue
+
+            data[formatted] = resource.get(name)
+
+        return data
+
+    @classmethod
+    def extract_relationships(cls, fields, resource, resource_instance):
+        if resource_instance is None:
+            return
+
+        data = {}
+        extract = super(JSONRenderer, cls).extract_relationships
+
+        for name, formatted, kind, links, skip_data in (
+                cls.get_plan(fields).relationships):
+            field = fields[name]
+
+            if kind is None:
+                data.update(
+                    extract({name: field}, resource, resource_instance))
+                continue
+
+            relation = {}
+            value = resource.get(name)
+
+            if kind == cls.MANY_RESOURCE:
+                resolved, _ = utils.get_relation_instance(
+                    resource_instance, field.source, field.parent)
+
+                if not resolved:
+                    continue
+
+                if isinstance(value, Iterable):
+                    relation['meta'] = {'count': len(value)}
+
+                relation['data'] = value
+                field = field.child_relation
+
+            if links:
+                field_links = field.get_links(
+                    resource_instance, field.related_link_lookup_field)
+
+                if field_links:
+                    relation['links'] = field_links
+
+            if kind == cls.RESOURCE and not skip_data:
+                relation['data'] = value
+
+            data[formatted] = relation
+
+        return data
+
+    @classmethod
+    def extract_included(
+            cls, fields, resource, resource_instance, included_resources,
+            included_cache):
+        """Skips the objects without any relationship to include."""
+        if not resource_instance or not included_resources:
+            return
+
+        names = set(
+            inflection.underscore(path).split('.')[0]
+            for path in included_resources
+        )
+
+        if names.isdisjoint(cls.get_plan(fields).related):
+            return
+
+        return super(JSONRenderer, cls).extract_included(
+            fields, resource, resource_instance, included_resources,
+            included_cache
+        )
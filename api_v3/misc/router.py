@@ -0,0 +1,66 @@
+import contextvars
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_DB_ALIAS = 'replica'
+PIN_COOKIE_NAME = 'id_primary'
+
+_replica_reads = contextvars.ContextVar('replica_reads', default=False)
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """Sends the reads to the replica database, if there is one."""
+    token = _replica_reads.set(enabled)
+
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def has_replica():
+    return REPLICA_DB_ALIAS in settings.DATABASES
+
+
+def is_pinned(request):
+    """Requests following a write read from the primary for a while."""
+    return PIN_COOKIE_NAME in request.COOKIES
+
+
+def pin(response):
+    response.set_cookie(
+        PIN_COOKIE_NAME, '1',
+        max_age=settings.REPLICA_PIN_SECONDS,
+        secure=settings.SESSION_COOKIE_SECURE,
+        httponly=True,
+        samesite=settings.SESSION_COOKIE_SAMESITE
+    )
+
+
+class ReplicaRouter(object):
+    """Routes the reads of the read-only views to the replica database.
+
+    Writes, and the reads inside a transaction (which could depend on an
+    uncommitted write), always go to the primary database.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get() or not has_replica():
+            return DEFAULT_DB_ALIAS
+
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+
+        return REPLICA_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db == DEFAULT_DB_ALIAS
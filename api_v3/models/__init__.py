@@ -1,10 +1,14 @@
 from activity.models import Action
-from django.db.models.signals import post_save
+from django.core.signals import request_started
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from api_v3.misc.cache import bump_version
+from api_v3.misc.db import close_unusable_connections
 from .attachment import Attachment  # noqa
 from .comment import Comment  # noqa
 from .expense import Expense  # noqa
+from .notification import Notification  # noqa
 from .profile import Profile  # noqa
 from .responder import Responder  # noqa
 from .review import Review  # noqa
@@ -17,3 +21,17 @@ def touch_ticket_updated(instance, **kwargs):
     if isinstance(instance.target, Ticket):
         instance.target.updated_at = instance.timestamp
         instance.target.save(update_fields=['updated_at'])
+
+
+@receiver((post_save, post_delete), sender=Profile)
+@receiver((post_save, post_delete), sender=Responder)
+@receiver((post_save, post_delete), sender=Review)
+@receiver((post_save, post_delete), sender=Subscriber)
+@receiver((post_save, post_delete), sender=Ticket)
+def bump_cache_version(sender, **kwargs):
+    bump_version(sender)
+
+
+@receiver(request_started)
+def check_connections(**kwargs):
+    close_unusable_connections()
@@ -1,3 +1,6 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVectorField)
 from django.db import models
 from django.conf import settings
 from django_bleach.models import BleachField
@@ -17,6 +20,15 @@ class Comment(models.Model):
 
     body = BleachField(blank=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # The body and the author names, updated by the database triggers
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    SEARCH_CONFIG = 'english'
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='api_v3_comm_search_gin')
+        ]
 
     @classmethod
     def filter_by_user(cls, user, queryset=None):
@@ -28,3 +40,20 @@ class Comment(models.Model):
             queryset = cls.objects
 
         return queryset.filter(ticket__in=Ticket.filter_by_user(user))
+
+    @classmethod
+    def search_for(cls, keywords, queryset=None):
+        """Full text comment search, best matches first.
+
+        Returns an annotated query set.
+        """
+        query = SearchQuery(keywords, config=cls.SEARCH_CONFIG)
+
+        if queryset is None:
+            queryset = cls.objects
+
+        return queryset.annotate(
+            rank=SearchRank(models.F('search_vector'), query)
+        ).filter(
+            search_vector=query
+        ).order_by('-rank', '-id')
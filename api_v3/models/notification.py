@@ -0,0 +1,147 @@
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import models, transaction
+from django.template.loader import render_to_string
+
+from api_v3.misc.mail import render_mail
+from api_v3.misc.queue import queue
+
+
+class Notification(models.Model):
+    """Notifications outbox.
+
+    Ticket events append the emails to send here. These are sent once the
+    ticket goes quiet, one email per recipient and ticket.
+    """
+
+    EMAIL_SUBJECT = 'There are {} updates for the ticket ID: {}'
+
+    # One line summaries for the combined emails
+    SUMMARIES = {
+        'mail/ticket_created.txt': 'The ticket was requested.',
+        'mail/ticket_reopened.txt': 'The ticket was reopened.',
+        'mail/ticket_updated.txt': 'The ticket was updated.',
+        'mail/ticket_comment.txt': 'There is a new comment.',
+        'mail/responder_created.txt': 'You were added to the ticket.',
+        'mail/subscriber_added.txt': 'You were subscribed to the ticket.',
+    }
+
+    email = models.CharField(max_length=512)
+    name = models.CharField(max_length=512, blank=True, null=True)
+    ticket = models.ForeignKey(
+        'Ticket', related_name='notifications', on_delete=models.DO_NOTHING)
+    comment = models.ForeignKey(
+        'Comment', null=True, on_delete=models.DO_NOTHING)
+    template = models.CharField(max_length=255)
+    subject = models.CharField(max_length=255)
+    request_host = models.CharField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['email', 'ticket', 'created_at'])
+        ]
+
+    @property
+    def summary(self):
+        return self.SUMMARIES.get(self.template, self.subject)
+
+    @classmethod
+    def notify(cls, recipients, ticket, template, subject, request_host,
+               comment=None):
+        """Appends the emails to the outbox, schedules the flushes.
+
+        The ``recipients`` is a list of emails and names pairs.
+        """
+        recipients = dict(
+            (email, name) for email, name in reversed(recipients) if email)
+
+        cls.objects.bulk_create([
+            cls(
+                email=email,
+                name=name,
+                ticket=ticket,
+                comment=comment,
+                template=template,
+                subject=subject,
+                request_host=request_host
+            ) for email, name in recipients.items()
+        ])
+
+        # Every notification schedules a flush, unless one is pending. A
+        # running flush could miss the new notifications.
+        for email in recipients:
+            cls.schedule_flush(email, ticket.id)
+
+    @classmethod
+    def schedule_flush(cls, email, ticket_id, schedule_at=None):
+        window = settings.NOTIFICATIONS_QUIET_WINDOW
+
+        if schedule_at is None and window:
+            schedule_at = datetime.utcnow() + timedelta(seconds=window)
+
+        cls.flush(email, ticket_id, _schedule_at=schedule_at)
+
+    @staticmethod
+    @queue.task(key='notification:{0}:{1}', replace=False)
+    def flush(_job_id, email, ticket_id):
+        """Sends the pending notifications, if the ticket went quiet.
+
+        Otherwise, the flush is postponed to the end of the quiet window, but
+        not later than the maximum delay since the first notification.
+        There is one pending flush per recipient and ticket, the running one
+        does not count.
+        """
+        window = timedelta(seconds=settings.NOTIFICATIONS_QUIET_WINDOW)
+        max_delay = timedelta(seconds=settings.NOTIFICATIONS_MAX_DELAY)
+
+        with transaction.atomic():
+            notifications = list(
+                Notification.objects.filter(email=email, ticket_id=ticket_id)
+                .select_related('ticket', 'comment__ticket__requester')
+                .select_for_update(of=('self',))
+                .order_by('created_at', 'id')
+            )
+
+            if not notifications:
+                return
+
+            send_at = min(
+                notifications[-1].created_at + window,
+                notifications[0].created_at + max_delay
+            )
+
+            if send_at > datetime.utcnow():
+                return Notification.schedule_flush(
+                    email, ticket_id, schedule_at=send_at)
+
+            Notification.send(notifications)
+            Notification.objects.filter(
+                id__in=[n.id for n in notifications]).delete()
+
+    @staticmethod
+    def send(notifications):
+        """Sends one email, the combined one if there are many updates."""
+        last = notifications[-1]
+        context = {
+            'ticket': last.ticket,
+            'comment': last.comment,
+            'request_host': last.request_host,
+            'site_name': settings.SITE_NAME
+        }
+
+        if len(notifications) == 1:
+            subject = last.subject
+            body = render_mail(last.template, context, name=last.name)
+        else:
+            subject = Notification.EMAIL_SUBJECT.format(
+                len(notifications), last.ticket.id)
+            body = render_to_string(
+                'mail/ticket_notifications.txt',
+                dict(context, name=last.name, notifications=notifications)
+            )
+
+        return send_mail(
+            subject, body, settings.DEFAULT_FROM_EMAIL, [last.email])
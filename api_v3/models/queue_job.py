@@ -1,6 +1,11 @@
+from datetime import datetime
+
+from django.contrib.postgres.fields import ArrayField
 from django.db import models
+from django.db.models import functions
+from django.db.models.fields.json import KeyTextTransform
 
-from api_v3.misc.queue import queue
+from api_v3.misc.queue import FAILED_QUEUE_NAME, queue
 
 
 class PatchedJSONField(models.JSONField):
@@ -18,16 +23,158 @@ class PatchedJSONField(models.JSONField):
         )
 
 
+class Percentiles(models.Aggregate):
+    """PostgreSQL continuous percentiles, returns an array of values."""
+
+    function = 'percentile_cont'
+    template = (
+        '%(function)s(ARRAY[%(percents)s]) '
+        'WITHIN GROUP (ORDER BY %(expressions)s)'
+    )
+
+    def __init__(self, expression, percents, **extra):
+        super(Percentiles, self).__init__(
+            expression,
+            percents=', '.join(str(percent / 100.0) for percent in percents),
+            output_field=ArrayField(models.FloatField()),
+            **extra
+        )
+
+
 class QueueJob(models.Model):
     """Queue job model."""
 
+    PERCENTS = (50, 95, 99)
+    FAILED_JOBS_LIMIT = 50
+
+    id = models.BigAutoField(primary_key=True)
     enqueued_at = models.DateTimeField()
-    dequeued_at = models.DateTimeField()
-    expected_at = models.DateTimeField()
-    schedule_at = models.DateTimeField()
+    dequeued_at = models.DateTimeField(null=True)
+    expected_at = models.DateTimeField(null=True)
+    schedule_at = models.DateTimeField(null=True)
     q_name = models.TextField(blank=False)
     data = PatchedJSONField()
 
     class Meta:
         managed = False
         db_table = str(queue.table)
+
+    @classmethod
+    def metrics(cls, since):
+        """Returns the per queue metrics, of the jobs processed since.
+
+        The latency is the time (in seconds) between the moment a job was
+        ready (enqueued or scheduled) and the moment it was dequeued.
+        """
+        now = functions.Now()
+        hours = max((datetime.utcnow() - since).total_seconds() / 3600, 1)
+        processed = models.Q(dequeued_at__gte=since)
+        ready_at = functions.Coalesce('schedule_at', 'enqueued_at')
+        latency = functions.Extract(
+            models.ExpressionWrapper(
+                models.F('dequeued_at') - ready_at,
+                output_field=models.DurationField()
+            ),
+            'epoch',
+            output_field=models.FloatField()
+        )
+        queues = {}
+
+        depths = cls.objects.values('q_name').annotate(
+            pending=models.Count('id', filter=models.Q(
+                models.Q(dequeued_at__isnull=True),
+                models.Q(schedule_at__isnull=True) |
+                models.Q(schedule_at__lte=now)
+            )),
+            scheduled=models.Count('id', filter=models.Q(
+                dequeued_at__isnull=True, schedule_at__gt=now)),
+            processed=models.Count('id', filter=processed),
+            latency=Percentiles(latency, cls.PERCENTS, filter=processed),
+            max_latency=models.Max(latency, filter=processed)
+        ).order_by('q_name')
+
+        for depth in depths:
+            name = depth.pop('q_name')
+            latencies = depth.pop('latency') or [None] * len(cls.PERCENTS)
+            queues[name] = dict(
+                id=name,
+                depth=depth,
+                latency=dict(
+                    [
+                        ('p{}'.format(percent), value)
+                        for percent, value in zip(cls.PERCENTS, latencies)
+                    ] + [('max', depth.pop('max_latency'))]
+                ),
+                functions=[],
+                failed=[]
+            )
+
+        function = KeyTextTransform('function', 'data')
+        throughputs = cls.objects.annotate(function=function).values(
+            'q_name', 'function'
+        ).annotate(
+            pending=models.Count('id', filter=models.Q(
+                dequeued_at__isnull=True)),
+            processed=models.Count('id', filter=processed),
+            last_processed_at=models.Max('dequeued_at', filter=processed)
+        ).order_by('q_name', 'function')
+
+        for throughput in throughputs:
+            throughput['per_hour'] = round(throughput['processed'] / hours, 2)
+            queues[throughput.pop('q_name')]['functions'].append(throughput)
+
+        failed = cls.objects.annotate(
+            function=function,
+            retried=functions.Cast(
+                KeyTextTransform('retried', 'data'), models.IntegerField()),
+            error=KeyTextTransform('error', 'data')
+        ).filter(
+            models.Q(retried__gt=0) |
+            models.Q(q_name__endswith=FAILED_QUEUE_NAME.format(''))
+        ).values(
+            'id', 'q_name', 'function', 'retried', 'error', 'enqueued_at',
+            'dequeued_at'
+        ).order_by('-id')[:cls.FAILED_JOBS_LIMIT]
+
+        for job in failed:
+            queues[job['q_name']]['failed'].append(job)
+
+        return list(queues.values())
+
+    @classmethod
+    def delete_processed(cls, before, batch_size):
+        """Removes the jobs processed before the given date.
+
+        Jobs are removed in batches of IDs, every batch is committed on its
+        own, to avoid the long locks on a large table. Returns the removed
+        count.
+        """
+        return cls.delete_in_batches(
+            cls.objects.filter(dequeued_at__lt=before), batch_size)
+
+    @classmethod
+    def delete_failed(cls, before, batch_size):
+        """Removes the failed jobs queued before the given date.
+
+        These are never processed, see `delete_processed()` for the batches.
+        """
+        return cls.delete_in_batches(
+            cls.objects.filter(
+                q_name__endswith=FAILED_QUEUE_NAME.format(''),
+                enqueued_at__lt=before
+            ),
+            batch_size
+        )
+
+    @classmethod
+    def delete_in_batches(cls, jobs, batch_size):
+        bounds = jobs.aggregate(low=models.Min('id'), high=models.Max('id'))
+        low, removed = bounds['low'], 0
+
+        while low is not None and low <= bounds['high']:
+            removed += jobs.filter(
+                id__gte=low, id__lt=low + batch_size).delete()[0]
+
+            low += batch_size
+
+        return removed
@@ -1,13 +1,24 @@
 from django.conf import settings
-from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+import re
+
+from django.contrib.postgres.search import (
+    SearchHeadline, SearchQuery, SearchRank, SearchVector,
+    TrigramWordSimilarity)
 from django.contrib.postgres.fields import ArrayField
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.db import connections, models, transaction
+from django.db.models.functions import Coalesce, Concat, Greatest
+from django.utils import timezone
 from django_bleach.models import BleachField
 
+from api_v3.misc.db import has_extension
 from .countries import COUNTRIES
 from .responder import Responder
 from .subscriber import Subscriber
 
+# Most of the list filters, the partial indexes cover only these
+OPEN_STATUSES = ('new', 'in-progress', 'pending')
+
 
 class Ticket(models.Model):
     """Ticket model."""
@@ -28,6 +39,7 @@ class Ticket(models.Model):
         ('closed', 'Closed'),
         ('cancelled', 'Cancelled')
     )
+    OPEN_STATUSES = OPEN_STATUSES
 
     PRIORITIES = (
         ('low', 'Low'),
@@ -45,14 +57,103 @@ class Ticket(models.Model):
 
     MIN_SEARCH_RANK = 0.3
 
+    # The fuzzy search full text index, names are not stemmed
+    FUZZY_SEARCH_FIELDS = (
+        'first_name', 'last_name', 'company_name', 'background')
+    FUZZY_SEARCH_CONFIG = 'simple'
+    # Misspelled names, if the `pg_trgm` extension is available
+    TRIGRAM_FIELDS = ('first_name', 'last_name', 'company_name')
+
+    FACETS = ('tags', 'countries', 'kind', 'status')
+
+    # Every ticket adds one row per facet value, counted in one pass
+    FACETS_SQL = '''
+        SELECT facet.name, facet.value, COUNT(*)
+        FROM {table}
+        CROSS JOIN LATERAL (
+            SELECT 'tags', UNNEST({table}.tags)
+            UNION ALL SELECT 'countries', UNNEST({table}.countries)
+            UNION ALL SELECT 'kind', {table}.kind
+            UNION ALL SELECT 'status', {table}.status
+        ) AS facet (name, value)
+        WHERE {table}.id IN ({ids})
+        GROUP BY facet.name, facet.value
+        ORDER BY COUNT(*) DESC, facet.value
+    '''
+
+    # Recomputes the counters from the comments, attachments and expenses,
+    # the expenses totals are per currency, decimal strings
+    COUNTERS_SQL = '''
+        WITH counters AS (
+            SELECT
+                {table}.id,
+                (
+                    SELECT COUNT(*) FROM {comments}
+                    WHERE {comments}.ticket_id = {table}.id
+                ) AS comments_count,
+                (
+                    SELECT COUNT(*) FROM {attachments}
+                    WHERE {attachments}.ticket_id = {table}.id
+                ) AS attachments_count,
+                COALESCE((
+                    SELECT JSONB_OBJECT_AGG(currency, total) FROM (
+                        SELECT
+                            amount_currency AS currency,
+                            SUM(amount)::NUMERIC(19, 4)::TEXT AS total
+                        FROM {expenses}
+                        WHERE {expenses}.ticket_id = {table}.id
+                            AND amount IS NOT NULL
+                        GROUP BY amount_currency
+                    ) AS totals
+                ), '{{}}'::JSONB) AS expenses_total,
+                GREATEST(
+                    (
+                        SELECT MAX(created_at) FROM {comments}
+                        WHERE {comments}.ticket_id = {table}.id
+                    ),
+                    (
+                        SELECT MAX(created_at) FROM {attachments}
+                        WHERE {attachments}.ticket_id = {table}.id
+                    ),
+                    (
+                        SELECT MAX(created_at) FROM {expenses}
+                        WHERE {expenses}.ticket_id = {table}.id
+                    )
+                ) AS last_activity_at
+            FROM {table}
+            WHERE {table}.id = ANY(%s)
+        )
+        UPDATE {table} SET
+            comments_count = counters.comments_count,
+            attachments_count = counters.attachments_count,
+            expenses_total = counters.expenses_total,
+            last_activity_at = counters.last_activity_at,
+            updated_at = COALESCE(%s, {table}.updated_at)
+        FROM counters
+        WHERE {table}.id = counters.id AND (
+            {table}.comments_count,
+            {table}.attachments_count,
+            {table}.expenses_total,
+            {table}.last_activity_at
+        ) IS DISTINCT FROM (
+            counters.comments_count,
+            counters.attachments_count,
+            counters.expenses_total,
+            counters.last_activity_at
+        )
+    '''
+
+    # Adds the amount to the decimal string of the currency total
+    EXPENSES_TOTAL_SQL = (
+        'JSONB_SET(expenses_total, %s, TO_JSONB(('
+        'COALESCE((expenses_total ->> %s)::NUMERIC, 0) + %s'
+        ')::NUMERIC(19, 4)::TEXT))'
+    )
+
     SEARCH_WEIGHT_MAP = {
         'first_name': 'A',
         'last_name': 'A',
         'company_name': 'A',
-        'comments__body': 'A',
-        'comments__user__email': 'A',
-        'comments__user__first_name': 'A',
-        'comments__user__last_name': 'A',
         'background': 'B',
         'connections': 'C',
         'sources': 'C',
@@ -69,7 +170,7 @@ class Ticket(models.Model):
         related_name='subscriber_tickets')
     requester = models.ForeignKey(
         settings.AUTH_USER_MODEL, related_name='requested_tickets',
-        db_index=True, on_delete=models.DO_NOTHING)
+        db_index=False, on_delete=models.DO_NOTHING)
 
     kind = models.CharField(
         blank=False, max_length=70, choices=KINDS,
@@ -78,8 +179,7 @@ class Ticket(models.Model):
         blank=False, max_length=70, choices=TYPES,
         default=TYPES[0][0], db_index=True)
     status = models.CharField(
-        max_length=70, choices=STATUSES,
-        default=STATUSES[0][0], db_index=True)
+        max_length=70, choices=STATUSES, default=STATUSES[0][0])
     priority = models.CharField(
         max_length=70, choices=PRIORITIES,
         default=PRIORITIES[1][0], db_index=True)
@@ -94,12 +194,10 @@ class Ticket(models.Model):
     identifier = BleachField(max_length=512, null=True, blank=True)
     countries = ArrayField(
         models.CharField(max_length=255, null=True, blank=False),
-        default=list,
-        db_index=True)
+        default=list)
     tags = ArrayField(
         models.CharField(max_length=255, null=True, blank=False),
-        default=list,
-        db_index=True)
+        default=list)
 
     # Other ticket type fields, also common to all other types
     background = BleachField(blank=False)
@@ -118,6 +216,45 @@ class Ticket(models.Model):
     country = models.CharField(
         max_length=100, choices=COUNTRIES, null=True, db_index=True, blank=True)
 
+    # Counters, see `add_activity()` and `repair_counters()`
+    comments_count = models.IntegerField(default=0, editable=False)
+    attachments_count = models.IntegerField(default=0, editable=False)
+    expenses_total = models.JSONField(default=dict, editable=False)
+    last_activity_at = models.DateTimeField(null=True, editable=False)
+
+    class Meta:
+        # The composite indexes also cover the status and requester lookups
+        indexes = [
+            models.Index(
+                fields=['status', 'created_at'],
+                name='api_v3_tick_status_created_idx'),
+            models.Index(
+                fields=['requester', 'created_at'],
+                name='api_v3_tick_requester_idx'),
+            models.Index(
+                fields=['created_at'],
+                condition=models.Q(status__in=OPEN_STATUSES),
+                name='api_v3_tick_open_created_idx'),
+            models.Index(
+                fields=['deadline_at'],
+                condition=models.Q(status__in=OPEN_STATUSES),
+                name='api_v3_tick_open_deadline_idx'),
+            models.Index(
+                fields=['sent_notifications_at'],
+                name='api_v3_tick_sent_notif_idx'),
+            models.Index(
+                fields=['last_activity_at'],
+                name='api_v3_tick_activity_idx'),
+            GinIndex(
+                SearchVector(
+                    'first_name', 'last_name', 'company_name', 'background',
+                    config='simple'),
+                name='api_v3_tick_search_gin'),
+            # Array containment and overlap lookups, B-tree can not help
+            GinIndex(fields=['countries'], name='api_v3_tick_countries_gin'),
+            GinIndex(fields=['tags'], name='api_v3_tick_tags_gin'),
+        ]
+
     @property
     def users(self):
         return (
@@ -143,13 +280,102 @@ class Ticket(models.Model):
             models.Q(subscriber_users=user)
         ).distinct()
 
+    @classmethod
+    def add_activity(
+            cls, ticket_id, at, comments=0, attachments=0, expense=None):
+        """Counts the new comments, attachments or expense of the ticket.
+
+        The counters are updated relative to their current values, so the
+        concurrent updates add up. The `expense` is a currency and amount
+        pair. Call it in the transaction creating the objects. The ticket
+        `updated_at` changes too, the conditional requests see the change.
+        """
+        changes = dict(
+            comments_count=models.F('comments_count') + comments,
+            attachments_count=models.F('attachments_count') + attachments,
+            last_activity_at=Greatest(
+                'last_activity_at',
+                models.Value(at, output_field=models.DateTimeField())
+            ),
+            updated_at=timezone.now()
+        )
+
+        if expense is not None and expense[1] is not None:
+            currency, amount = expense
+            changes['expenses_total'] = models.expressions.RawSQL(
+                cls.EXPENSES_TOTAL_SQL,
+                ([currency], currency, amount),
+                output_field=models.JSONField()
+            )
+
+        return cls.objects.filter(id=ticket_id).update(**changes)
+
+    @classmethod
+    def repair_counters(cls, ticket_ids, using='default', touch=True):
+        """Recomputes the counters of the tickets.
+
+        The tickets rows are locked first. The counters are computed in a
+        new statement, which sees the changes committed while waiting. The
+        fixed tickets `updated_at` changes, unless not to ``touch`` these.
+        Returns the number of fixed tickets.
+        """
+        connection = connections[using]
+        quote = connection.ops.quote_name
+        ticket_ids = sorted(ticket_ids)
+        tables = dict(
+            (name, quote(
+                cls._meta.get_field(name).related_model._meta.db_table))
+            for name in ('comments', 'attachments', 'expenses')
+        )
+
+        with transaction.atomic(using=using):
+            list(
+                cls.objects.using(using).filter(id__in=ticket_ids)
+                .order_by('id').select_for_update().values_list('id')
+            )
+
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    cls.COUNTERS_SQL.format(
+                        table=quote(cls._meta.db_table), **tables),
+                    [ticket_ids, timezone.now() if touch else None]
+                )
+
+                return cursor.rowcount
+
+    @classmethod
+    def facets(cls, queryset):
+        """Returns the tickets count per tag, country, kind and status.
+
+        Counts are ordered by the most frequent values first.
+        """
+        facets = dict((name, {}) for name in cls.FACETS)
+        ids, params = queryset.order_by().values('pk').query.sql_with_params()
+        connection = connections[queryset.db]
+        sql = cls.FACETS_SQL.format(
+            table=connection.ops.quote_name(cls._meta.db_table), ids=ids)
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+            for name, value, count in cursor.fetchall():
+                if value is not None:
+                    facets[name][value] = count
+
+        return facets
+
     @classmethod
     def search_for(cls, keywords, queryset=None):
         """Full text ticket search.
 
+        Tickets with matching comments are found through the comments index,
+        the best of the ticket and comments ranks is used.
+
         Returns an annotated query set.
         """
         query = SearchQuery(keywords)
+        comments = cls._meta.get_field('comments').related_model.search_for(
+            keywords)
         vector = None
 
         if queryset is None:
@@ -162,7 +388,100 @@ class Ticket(models.Model):
                 vector += SearchVector(field, weight=weight)
 
         return queryset.annotate(
-            rank=SearchRank(vector, query)
+            ticket_rank=SearchRank(vector, query)
         ).filter(
-            rank__gte=cls.MIN_SEARCH_RANK
-        ).distinct().order_by('rank')
+            models.Q(ticket_rank__gte=cls.MIN_SEARCH_RANK) |
+            models.Q(id__in=comments.values('ticket_id'))
+        ).annotate(
+            # Evaluated only for the matching tickets
+            rank=Greatest(
+                'ticket_rank',
+                Coalesce(
+                    models.Subquery(
+                        comments.filter(
+                            ticket=models.OuterRef('pk')).values('rank')[:1]
+                    ),
+                    0.0
+                )
+            )
+        ).distinct().order_by('-rank')
+
+    @classmethod
+    def fuzzy_search_for(cls, keywords, queryset=None):
+        """Prefix and trigram ticket search, the partial names match.
+
+        Returns a query set annotated with the rank, best matches first.
+        """
+        words = re.findall(r'\w+', keywords or '')
+
+        if queryset is None:
+            queryset = cls.objects
+
+        if not words:
+            return queryset.none()
+
+        query = cls.fuzzy_search_query(words)
+        vector = SearchVector(
+            *cls.FUZZY_SEARCH_FIELDS, config=cls.FUZZY_SEARCH_CONFIG)
+        matches = models.Q(search_vector=query)
+        rank = SearchRank(vector, query)
+
+        if has_extension('pg_trgm', queryset.db):
+            keywords = ' '.join(words)
+
+            for field in cls.TRIGRAM_FIELDS:
+                matches |= models.Q(
+                    **{field + '__trigram_word_similar': keywords})
+
+            rank += Coalesce(
+                Greatest(*[
+                    TrigramWordSimilarity(keywords, field)
+                    for field in cls.TRIGRAM_FIELDS
+                ]),
+                0.0
+            )
+
+        return queryset.alias(
+            search_vector=vector
+        ).annotate(
+            rank=rank
+        ).filter(matches).order_by('-rank', '-id')
+
+    @classmethod
+    def fuzzy_search_headlines(cls, keywords, ticket_ids):
+        """Returns the highlighted fuzzy search snippets, by ticket ID.
+
+        The snippets are expensive, only these of the listed tickets are
+        computed, not of every ticket the search matches.
+        """
+        words = re.findall(r'\w+', keywords or '')
+
+        if not words or not ticket_ids:
+            return {}
+
+        text = []
+
+        for field in cls.FUZZY_SEARCH_FIELDS:
+            text.extend([models.F(field), models.Value(' ')])
+
+        return dict(
+            cls.objects.filter(id__in=ticket_ids).annotate(
+                search_headline=SearchHeadline(
+                    Concat(*text[:-1], output_field=models.TextField()),
+                    cls.fuzzy_search_query(words),
+                    config=cls.FUZZY_SEARCH_CONFIG,
+                    start_sel='<mark>',
+                    stop_sel='</mark>',
+                    max_fragments=2
+                )
+            ).values_list('id', 'search_headline')
+        )
+
+    @classmethod
+    def fuzzy_search_query(cls, words):
+        """Returns the prefix search query of the words."""
+        return SearchQuery(
+            ' & '.join(word + ':*' for word in words),
+            config=cls.FUZZY_SEARCH_CONFIG,
+            search_type='raw'
+        )
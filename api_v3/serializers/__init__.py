@@ -5,9 +5,13 @@ from .attachment import AttachmentSerializer  # noqa
 from .comment import CommentSerializer  # noqa
 from .expense import ExpenseSerializer  # noqa
 from .profile import ProfileSerializer  # noqa
+from .pool_metric import PoolMetricSerializer  # noqa
+from .queue_metric import QueueMetricSerializer  # noqa
+from .request_metric import RequestMetricSerializer  # noqa
 from .responder import ResponderSerializer  # noqa
 from .review import ReviewSerializer  # noqa
 from .review_stat import ReviewStatSerializer  # noqa
 from .subscriber import SubscriberSerializer  # noqa
 from .ticket import TicketSerializer  # noqa
+from .ticket_bulk_update import TicketBulkUpdateSerializer  # noqa
 from .ticket_stat import TicketStatSerializer  # noqa
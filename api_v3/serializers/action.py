@@ -75,12 +75,17 @@ class ActionSerializer(serializers.ModelSerializer):
     def get_root_meta(self, obj, many):
         """Adds extra root meta details."""
         view = self.context.get('view') if self.context else None
-        queryset = view.filter_queryset(view.get_queryset()) if view else None
 
-        if not many or not queryset or not queryset.exists():
+        if not many or not view:
+            return {}
+
+        queryset = view.get_filtered_queryset()
+        first = queryset.first()
+
+        if not first:
             return {}
 
         return {
             'last_id': str(queryset.last().id),
-            'first_id': str(queryset.first().id)
+            'first_id': str(first.id)
         }
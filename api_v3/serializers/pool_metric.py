@@ -0,0 +1,18 @@
+from rest_framework_json_api import serializers
+
+
+class PoolMetricSerializer(serializers.Serializer):
+
+    class Meta:
+        resource_name = 'pool-metrics'
+
+    database = serializers.CharField()
+    size = serializers.IntegerField()
+    used = serializers.IntegerField()
+    idle = serializers.IntegerField()
+    checkouts = serializers.IntegerField()
+    waits = serializers.IntegerField()
+    timeouts = serializers.IntegerField()
+    connects = serializers.IntegerField()
+    discards = serializers.IntegerField()
+    wait_ms = serializers.FloatField()
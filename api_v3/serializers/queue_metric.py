@@ -0,0 +1,13 @@
+from rest_framework import fields
+from rest_framework_json_api import serializers
+
+
+class QueueMetricSerializer(serializers.Serializer):
+
+    class Meta:
+        resource_name = 'queue-metrics'
+
+    depth = fields.DictField()
+    latency = fields.DictField()
+    functions = fields.ListField(child=fields.DictField())
+    failed = fields.ListField(child=fields.DictField())
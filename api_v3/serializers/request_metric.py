@@ -0,0 +1,16 @@
+from rest_framework import fields
+from rest_framework_json_api import serializers
+
+
+class RequestMetricSerializer(serializers.Serializer):
+
+    class Meta:
+        resource_name = 'request-metrics'
+
+    route = serializers.CharField()
+    count = serializers.IntegerField()
+    queries = fields.DictField()
+    sql = fields.DictField()
+    serialize = fields.DictField()
+    render = fields.DictField()
+    duration = fields.DictField()
@@ -1,7 +1,10 @@
 from datetime import datetime
 
+from django.db.models import Count, Q
 from rest_framework_json_api import serializers
-from rest_framework_json_api.utils import format_field_names
+from rest_framework_json_api.utils import (
+    format_field_names, get_resource_type_from_serializer,
+    undo_format_field_name)
 
 from api_v3.models import Profile, Ticket, countries
 from .profile import ProfileSerializer
@@ -18,6 +21,15 @@ class ListChoiceField(serializers.MultipleChoiceField):
 
 class TicketSerializer(serializers.ModelSerializer):
 
+    # Long texts, left out of the lists unless requested with `fields[...]`.
+    # The lists show the background.
+    LEAN_EXCLUDED_FIELDS = (
+        'connections',
+        'sources',
+        'business_activities',
+        'initial_information'
+    )
+
     included_serializers = {
         'users': 'api_v3.serializers.ProfileSerializer',
         'responder_users': 'api_v3.serializers.ProfileSerializer',
@@ -44,7 +56,11 @@ class TicketSerializer(serializers.ModelSerializer):
             'users',
             'responder_users',
             'subscriber_users',
-            'reopen_reason'
+            'reopen_reason',
+            'comments_count',
+            'attachments_count',
+            'expenses_total',
+            'last_activity_at'
         )
         fields = (
             'id',
@@ -79,10 +95,64 @@ class TicketSerializer(serializers.ModelSerializer):
             'company_name',
             'country',
 
+            'comments_count',
+            'attachments_count',
+            'expenses_total',
+            'last_activity_at',
+
             'reopen_reason',
             'pending_reason'
         )
 
+    def __init__(self, *args, **kwargs):
+        super(TicketSerializer, self).__init__(*args, **kwargs)
+
+        fieldset = self.get_fieldset(self.context)
+        request = self.context.get('request')
+        user = getattr(request, 'user', None)
+
+        if fieldset is not None:
+            self.select_fields(fieldset)
+
+        # Same as the expenses, the totals are for the staff only
+        if not (user and (user.is_staff or user.is_superuser)):
+            self.fields.pop('expenses_total', None)
+
+    def select_fields(self, fieldset):
+        """Keeps the fieldset fields, adds the ones left out by default."""
+        # The sparse fieldsets names are formatted, like the attributes
+        fields = None
+
+        for name in list(self.fields.fields):
+            if name not in fieldset:
+                self.fields.pop(name)
+
+        for name in fieldset:
+            if name not in self.fields.fields and name in self.Meta.fields:
+                fields = fields or self.get_fields()
+                self.fields[name] = fields[name]
+
+    @classmethod
+    def get_fieldset(cls, context):
+        """Returns the rendered field names, none if all are rendered.
+
+        Lists are lean by default, the views opt in with `lean_list`.
+        """
+        request = context.get('request')
+        view = context.get('view')
+        param = 'fields[{}]'.format(get_resource_type_from_serializer(cls))
+
+        if request is not None and param in request.query_params:
+            return set(['id']) | set(
+                undo_format_field_name(name.strip())
+                for name in request.query_params[param].split(',')
+            )
+
+        if getattr(view, 'lean_list', False) and view.action == 'list':
+            return set(cls.Meta.fields) - set(cls.LEAN_EXCLUDED_FIELDS)
+
+        return None
+
     def validate_deadline_at(self, value):
         """Deadline validation."""
         error = serializers.ValidationError(
@@ -159,7 +229,7 @@ class TicketSerializer(serializers.ModelSerializer):
         if not view:
             return total
 
-        queryset = view.filter_queryset(view.get_queryset())
+        queryset = view.get_filtered_queryset().all()
 
         # Reset status filters to gather proper counts.
         for clause in queryset.query.where.children:
@@ -169,20 +239,61 @@ class TicketSerializer(serializers.ModelSerializer):
             except Exception:
                 pass
 
-        for status in Ticket.STATUSES:
-            status = status[0]
-            total[status] = queryset.filter(status=status).count()
+        counts = dict(
+            (status, Count('pk', filter=Q(status=status)))
+            for status, _ in Ticket.STATUSES
+        )
 
-        total['all'] = queryset.count()
+        return queryset.order_by().aggregate(all=Count('pk'), **counts)
 
-        return total
+    def get_ticket_facets(self):
+        """Returns the facet counts, if requested, for the current filter."""
+        view = self.context.get('view') if self.context else None
+        request = self.context.get('request') if self.context else None
+
+        if not view or not request or not request.GET.get('facets'):
+            return None
+
+        return Ticket.facets(view.get_filtered_queryset())
+
+    def get_search_highlights(self):
+        """Returns the fuzzy search snippets of the listed tickets."""
+        view = self.context.get('view') if self.context else None
+        request = self.context.get('request') if self.context else None
+
+        if not view or not request or not self.instance:
+            return {}
+
+        filters = view.extract_filter_params(request)
+
+        if not filters.get('search') or filters.get('search_mode') != 'fuzzy':
+            return {}
+
+        headlines = Ticket.fuzzy_search_headlines(
+            filters['search'], [ticket.id for ticket in self.instance])
+
+        return dict(
+            (str(ticket_id), headline)
+            for ticket_id, headline in headlines.items()
+            if headline is not None
+        )
 
     def get_root_meta(self, obj, many):
         """Adds extra root meta details."""
         if many:
-            return {
+            meta = {
                 'total': self.get_ticket_totals(),
                 'filters': self.get_request_filters()
             }
+            facets = self.get_ticket_facets()
+            highlights = self.get_search_highlights()
+
+            if facets is not None:
+                meta['facets'] = facets
+
+            if highlights:
+                meta['highlights'] = highlights
+
+            return meta
         else:
             return {'total': self.get_ticket_totals()}
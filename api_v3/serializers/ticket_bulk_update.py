@@ -0,0 +1,61 @@
+from rest_framework import fields
+from rest_framework_json_api import serializers
+
+from api_v3.models import Profile, Ticket
+
+
+class TicketBulkUpdateSerializer(serializers.Serializer):
+
+    MAX_TICKETS = 500
+
+    class Meta:
+        resource_name = 'ticket-bulk-updates'
+
+    id = fields.SerializerMethodField()
+    tickets = fields.ListField(
+        child=fields.IntegerField(), min_length=1, max_length=MAX_TICKETS)
+    status = fields.ChoiceField(choices=Ticket.STATUSES, required=False)
+    priority = fields.ChoiceField(choices=Ticket.PRIORITIES, required=False)
+    add_tags = fields.ListField(
+        child=fields.CharField(max_length=255), required=False)
+    remove_tags = fields.ListField(
+        child=fields.CharField(max_length=255), required=False)
+    add_responders = fields.ListField(
+        child=fields.IntegerField(), required=False)
+    remove_responders = fields.ListField(
+        child=fields.IntegerField(), required=False)
+    updated_tickets = fields.ListField(
+        child=fields.IntegerField(), read_only=True)
+
+    def get_id(self, data):
+        return data.get('pk')
+
+    def validate_missing(self, queryset, ids, detail):
+        ids = set(ids)
+        found = set(queryset.filter(pk__in=ids).values_list('pk', flat=True))
+
+        if ids - found:
+            raise serializers.ValidationError(detail.format(
+                ', '.join(map(str, sorted(ids - found)))))
+
+        return sorted(ids)
+
+    def validate_tickets(self, value):
+        return self.validate_missing(
+            Ticket.objects, value, 'Tickets not found: {}.')
+
+    def validate_add_responders(self, value):
+        return self.validate_missing(
+            Profile.objects, value, 'Users not found: {}.')
+
+    def validate_remove_responders(self, value):
+        return self.validate_missing(
+            Profile.objects, value, 'Users not found: {}.')
+
+    def validate(self, data):
+        changes = set(data) - set(['tickets'])
+
+        if not any(data[name] for name in changes):
+            raise serializers.ValidationError('No changes requested.')
+
+        return data
@@ -0,0 +1,59 @@
+import json
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from api_v3.management.commands import bench
+from api_v3.models import Action, Comment, Profile, Ticket
+
+
+class BenchTestCase(TestCase):
+
+    def test_seed(self):
+        call_command(
+            'bench', seed=True, runs=0, profiles=3, tickets=5, comments=7,
+            actions=9, expenses=2, reviews=2, stdout=StringIO(),
+            stderr=StringIO()
+        )
+
+        self.assertEqual(Profile.objects.count(), 3)
+        self.assertEqual(Ticket.objects.count(), 5)
+        self.assertEqual(Comment.objects.count(), 7)
+        self.assertEqual(Action.objects.count(), 9)
+
+        for ticket in Ticket.objects.all():
+            self.assertEqual(ticket.comments_count, ticket.comments.count())
+
+    def test_report(self):
+        with tempfile.NamedTemporaryFile(mode='r') as output:
+            call_command(
+                'bench', seed=True, runs=2, profiles=2, tickets=3,
+                comments=3, actions=3, expenses=1, reviews=1,
+                output=output.name, stdout=StringIO(), stderr=StringIO()
+            )
+
+            report = json.load(output)
+
+        self.assertEqual(report['dataset']['ticket'], 3)
+        self.assertEqual(
+            [scenario['name'] for scenario in report['scenarios']],
+            [name for name, _, _ in bench.Command.SCENARIOS] +
+            ['digest', 'mail-render', 'mail-skeleton', 'db-new-connection',
+             'db-persistent-connection']
+        )
+        self.assertEqual(report['scenarios'][0]['runs'], 2)
+        self.assertGreater(report['scenarios'][0]['queries']['p50'], 0)
+
+    def test_report_stdout(self):
+        stdout = StringIO()
+
+        call_command(
+            'bench', seed=True, runs=1, profiles=2, tickets=3, comments=3,
+            actions=3, expenses=1, reviews=1, stdout=stdout, stderr=StringIO()
+        )
+
+        report = json.loads(stdout.getvalue())
+
+        self.assertEqual(report['dataset']['ticket'], 3)
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+import mock
+
+from api_v3.management.commands import queue
+from api_v3.models.queue_job import QueueJob
+
+
+class QueueTestCase(TestCase):
+
+    def setUp(self):
+        # The jobs table lives in the queue database, not the tests one
+        with connection.schema_editor() as editor:
+            editor.create_model(QueueJob)
+
+        now = datetime.utcnow()
+        days = [10, 9, 8, 1, None]
+
+        QueueJob.objects.bulk_create([
+            QueueJob(
+                q_name='default',
+                enqueued_at=now,
+                dequeued_at=(now - timedelta(days=day)) if day else None,
+                data={}
+            ) for day in days
+        ])
+
+    def test_clean(self):
+        out = StringIO()
+
+        with self.settings(QUEUE_CLEAN_BATCH_SIZE=2):
+            with self.assertNumQueries(4):
+                call_command('queue', clean=True, days=7, stdout=out)
+
+        self.assertIn('Removed 3 jobs.', out.getvalue())
+        self.assertIn('Removed 0 failed jobs.', out.getvalue())
+        self.assertEqual(QueueJob.objects.count(), 2)
+        self.assertEqual(
+            QueueJob.objects.filter(dequeued_at__isnull=True).count(), 1)
+
+    def test_clean_failed(self):
+        now = datetime.utcnow()
+
+        QueueJob.objects.bulk_create([
+            QueueJob(
+                q_name='default-failed',
+                enqueued_at=now - timedelta(days=day),
+                data={}
+            ) for day in (40, 31, 2)
+        ])
+
+        out = StringIO()
+        call_command(
+            'queue', clean=True, days=30, failed_days=30, stdout=out)
+
+        self.assertIn('Removed 0 jobs.', out.getvalue())
+        self.assertIn('Removed 2 failed jobs.', out.getvalue())
+        self.assertEqual(
+            QueueJob.objects.filter(q_name='default-failed').count(), 1)
+
+    def test_clean_nothing(self):
+        out = StringIO()
+
+        call_command('queue', clean=True, days=30, stdout=out)
+
+        self.assertIn('Removed 0 jobs.', out.getvalue())
+        self.assertEqual(QueueJob.objects.count(), 5)
+
+    def test_schedule_clean(self):
+        task = queue.Command.schedule_clean.__wrapped__
+
+        with mock.patch.object(queue.Command, 'schedule_clean') as schedule:
+            call_command(
+                'queue', schedule_clean=True, days=3, stdout=StringIO())
+
+            schedule.assert_called_once_with(3)
+
+            with mock.patch('sys.stdout', new_callable=StringIO):
+                task(None, 7)
+
+        schedule.assert_called_with(7)
+        self.assertEqual(QueueJob.objects.count(), 2)
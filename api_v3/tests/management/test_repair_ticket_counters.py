@@ -0,0 +1,46 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from api_v3.factories import (
+    AttachmentFactory, CommentFactory, ProfileFactory, TicketFactory)
+from api_v3.models import Ticket
+
+
+class RepairTicketCountersTestCase(TestCase):
+
+    def setUp(self):
+        self.user = ProfileFactory.create()
+        self.tickets = [
+            TicketFactory.create(requester=self.user) for _ in range(5)
+        ]
+
+        # The factories do not maintain the counters
+        for index, ticket in enumerate(self.tickets[:3]):
+            for _ in range(index + 1):
+                CommentFactory.create(ticket=ticket, user=self.user)
+
+        AttachmentFactory.create(ticket=self.tickets[4], user=self.user)
+
+    def test_repair(self):
+        out = StringIO()
+
+        # Three batches of IDs, locks and updates, in savepoints, then the
+        # empty IDs batch
+        with self.assertNumQueries(3 * 5 + 1):
+            call_command('repair_ticket_counters', batch_size=2, stdout=out)
+
+        self.assertIn('Fixed 4 of 5 tickets.', out.getvalue())
+        self.assertEqual(
+            list(
+                Ticket.objects.order_by('id')
+                .values_list('comments_count', 'attachments_count')
+            ),
+            [(1, 0), (2, 0), (3, 0), (0, 0), (0, 1)]
+        )
+
+        out = StringIO()
+        call_command('repair_ticket_counters', stdout=out)
+
+        self.assertIn('Fixed 0 of 5 tickets.', out.getvalue())
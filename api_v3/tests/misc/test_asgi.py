@@ -0,0 +1,69 @@
+import io
+import threading
+
+from asgiref.sync import async_to_sync
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.test import TestCase
+
+from api_v3.misc.asgi import StreamingASGIHandler
+
+
+class StreamingASGIHandlerTestCase(TestCase):
+
+    def setUp(self):
+        self.handler = StreamingASGIHandler()
+        self.handler.chunk_size = 4
+        self.messages = []
+        self.threads = set()
+
+    async def send(self, message):
+        self.threads.add(('send', threading.get_ident()))
+        self.messages.append(message)
+
+    def parts(self):
+        for part in [b'a,b\r\n', b'1', b'2', b'3', b'4', b'5']:
+            self.threads.add(('read', threading.get_ident()))
+            yield part
+
+    def test_send_streaming_response(self):
+        response = StreamingHttpResponse(
+            self.parts(), content_type='text/csv')
+        response.set_cookie('name', 'value')
+
+        async_to_sync(self.handler.send_response)(response, self.send)
+
+        self.assertEqual(self.messages[0]['status'], 200)
+        self.assertIn(
+            (b'Content-Type', b'text/csv'), self.messages[0]['headers'])
+        self.assertIn(b'Set-Cookie', dict(self.messages[0]['headers']))
+        self.assertEqual(
+            [message.get('body') for message in self.messages[1:]],
+            [b'a,b\r\n', b'1234', b'5', None]
+        )
+        self.assertEqual(
+            [message.get('more_body') for message in self.messages[1:]],
+            [True, True, True, None]
+        )
+
+        # The parts are not read in the event loop thread
+        threads = dict(self.threads)
+        self.assertEqual(len(self.threads), 2)
+        self.assertNotEqual(threads['read'], threads['send'])
+
+    def test_send_file_response(self):
+        response = FileResponse(io.BytesIO(b'0123456789'))
+        response.block_size = 3
+
+        async_to_sync(self.handler.send_response)(response, self.send)
+
+        self.assertEqual(
+            b''.join(message.get('body', b'') for message in self.messages),
+            b'0123456789'
+        )
+
+    def test_send_response(self):
+        async_to_sync(self.handler.send_response)(
+            HttpResponse(b'body'), self.send)
+
+        self.assertEqual(self.messages[1]['body'], b'body')
+        self.assertEqual(self.messages[1]['more_body'], False)
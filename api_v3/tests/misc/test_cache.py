@@ -0,0 +1,70 @@
+import multiprocessing
+
+from django.db import connections
+from django.test import TestCase, TransactionTestCase
+
+from api_v3.factories import ProfileFactory
+from api_v3.misc.cache import bump_version, get_versions
+from api_v3.models import Comment, Profile, Ticket
+
+
+def update_profile(profile_id, bio):
+    # The forked process must not reuse the parent connections
+    for connection in connections.all():
+        connection.connection = None
+
+    Profile.objects.filter(id=profile_id).update(bio=bio)
+    bump_version(Profile)
+
+    for connection in connections.all():
+        connection.close()
+
+
+class CacheTestCase(TestCase):
+
+    def test_bump_version(self):
+        versions = get_versions([Profile, Ticket])
+
+        bump_version(Ticket)
+
+        new_versions = get_versions([Profile, Ticket])
+        self.assertEqual(new_versions[0], versions[0])
+        self.assertGreater(new_versions[1], versions[1])
+
+    def test_bump_version_on_commit(self):
+        version, = get_versions([Ticket])
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            bump_version(Ticket)
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(get_versions([Ticket]), [version + 2])
+
+    def test_bump_version_not_versioned(self):
+        with self.assertRaises(ValueError):
+            bump_version(Comment)
+
+
+class CacheProcessesTestCase(TransactionTestCase):
+
+    def test_bump_version_other_process(self):
+        profile = ProfileFactory.create(is_superuser=True, bio='Before')
+        self.client.force_login(profile)
+
+        response = self.client.get('/api/v3/profiles')
+        self.assertContains(response, 'Before')
+
+        # Without a version bump, the cached list is served
+        Profile.objects.filter(id=profile.id).update(bio='Stale')
+        response = self.client.get('/api/v3/profiles')
+        self.assertContains(response, 'Before')
+
+        process = multiprocessing.get_context('fork').Process(
+            target=update_profile, args=(profile.id, 'After'))
+        process.start()
+        process.join()
+
+        self.assertEqual(process.exitcode, 0)
+
+        response = self.client.get('/api/v3/profiles')
+        self.assertContains(response, 'After')
@@ -0,0 +1,131 @@
+import gzip
+import io
+
+import brotli
+import mock
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from api_v3.misc import compression
+from api_v3.misc.compression import CompressionMiddleware
+
+
+@override_settings(COMPRESSION_MIN_SIZE=100)
+class CompressionMiddlewareTestCase(TestCase):
+
+    CONTENT = b'{"data": [' + b'{"type": "tickets"}, ' * 100 + b']}'
+
+    def setUp(self):
+        self.response = HttpResponse(
+            self.CONTENT, content_type='application/vnd.api+json')
+        self.middleware = CompressionMiddleware(lambda request: self.response)
+
+    def get(self, accept_encoding='gzip, deflate, br'):
+        request = RequestFactory().get(
+            '/', HTTP_ACCEPT_ENCODING=accept_encoding)
+
+        return self.middleware(request)
+
+    def test_brotli(self):
+        response = self.get()
+
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(
+            response['Content-Length'], str(len(response.content)))
+        self.assertEqual(brotli.decompress(response.content), self.CONTENT)
+
+    def test_gzip(self):
+        response = self.get('gzip;q=1.0, br;q=0.5')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), self.CONTENT)
+
+    def test_gzip_without_brotli(self):
+        with mock.patch.object(compression, 'brotli', None):
+            self.middleware = CompressionMiddleware(
+                lambda request: self.response)
+
+            response = self.get()
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), self.CONTENT)
+
+    def test_get_encoding(self):
+        encodings = (
+            ('', None),
+            ('identity', None),
+            ('gzip;q=0, br;q=0', None),
+            ('*', 'br'),
+            ('*, br;q=0', 'gzip'),
+            ('GZIP', 'gzip'),
+            ('gzip, br', 'br'),
+            ('br;q=0.1, gzip;q=0.2', 'gzip'),
+            ('br;q=oops, gzip', 'gzip'),
+        )
+
+        for accept_encoding, encoding in encodings:
+            with self.subTest(accept_encoding=accept_encoding):
+                self.assertEqual(
+                    self.middleware.get_encoding(accept_encoding), encoding)
+
+    def test_not_accepted(self):
+        response = self.get('identity')
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(response.content, self.CONTENT)
+
+    def test_small_response(self):
+        self.response = HttpResponse(b'{"data": []}')
+
+        response = self.get()
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertFalse(response.has_header('Vary'))
+
+    def test_already_encoded(self):
+        self.response['Content-Encoding'] = 'gzip'
+
+        response = self.get()
+
+        self.assertEqual(response.content, self.CONTENT)
+
+    def test_incompressible(self):
+        self.response['Content-Type'] = 'image/png'
+
+        self.assertEqual(self.get().content, self.CONTENT)
+
+        self.response = FileResponse(
+            io.BytesIO(self.CONTENT), content_type='text/plain')
+        response = self.get()
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(b''.join(response.streaming_content), self.CONTENT)
+
+    def test_etag(self):
+        self.response['ETag'] = '"abc"'
+
+        self.assertEqual(self.get()['ETag'], 'W/"abc"')
+
+    def test_streaming(self):
+        rows = [b'id,name\r\n'] + [
+            '{},name {}\r\n'.format(index, index).encode()
+            for index in range(1000)
+        ]
+        self.middleware.FLUSH_SIZE = 1024
+
+        for encoding, decompress in (
+                ('gzip', gzip.decompress), ('br', brotli.decompress)):
+            self.response = StreamingHttpResponse(
+                iter(rows), content_type='text/csv')
+
+            with self.subTest(encoding=encoding):
+                response = self.get(encoding)
+                parts = list(response.streaming_content)
+
+                self.assertEqual(response['Content-Encoding'], encoding)
+                self.assertFalse(response.has_header('Content-Length'))
+                # Flushed as the rows come, not all at the end
+                self.assertGreater(len(parts), 5)
+                self.assertEqual(decompress(b''.join(parts)), b''.join(rows))
@@ -0,0 +1,32 @@
+from django.db import connection
+from django.test import TestCase
+import mock
+
+from api_v3.misc.db import close_unusable_connections
+
+
+class CloseUnusableConnectionsTestCase(TestCase):
+
+    def test_close_unusable_connections(self):
+        connection.ensure_connection()
+
+        with mock.patch.dict(
+                connection.settings_dict, CONN_HEALTH_CHECKS=True):
+            with mock.patch.object(connection, 'close') as close:
+                close_unusable_connections()
+
+                self.assertFalse(close.called)
+
+                with mock.patch.object(
+                        connection, 'is_usable', return_value=False):
+                    close_unusable_connections()
+
+                close.assert_called_once_with()
+
+    def test_close_unusable_connections_disabled(self):
+        connection.ensure_connection()
+
+        with mock.patch.object(connection, 'is_usable') as is_usable:
+            close_unusable_connections()
+
+        self.assertFalse(is_usable.called)
@@ -0,0 +1,66 @@
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.test import TestCase
+import mock
+
+from api_v3.factories import CommentFactory
+from api_v3.misc import mail
+
+
+class MailTestCase(TestCase):
+
+    def setUp(self):
+        mail.skeletons.clear()
+
+        self.comment = CommentFactory.create()
+        self.context = {
+            'comment': self.comment,
+            'request_host': 'host.tld',
+            'site_name': settings.SITE_NAME
+        }
+
+    def test_render_mail(self):
+        for name in ('John Doe', 'O\'Brien & <Co>', None):
+            self.assertEqual(
+                mail.render_mail(
+                    'mail/ticket_comment.txt', self.context, name=name),
+                render_to_string(
+                    'mail/ticket_comment.txt', dict(self.context, name=name))
+            )
+
+    def test_render_mail_cached(self):
+        with mock.patch.object(
+                mail, 'get_template', wraps=mail.get_template) as get:
+            mail.render_mail(
+                'mail/ticket_comment.txt', self.context, name='John')
+            mail.render_mail(
+                'mail/ticket_comment.txt', self.context, name='Jane')
+            mail.render_mail(
+                'mail/ticket_comment.txt',
+                dict(self.context, request_host='other.tld'),
+                name='Jane'
+            )
+
+        self.assertEqual(get.call_count, 2)
+
+    def test_render_mail_changed(self):
+        mail.render_mail('mail/ticket_comment.txt', self.context, name='John')
+
+        requester = self.comment.ticket.requester
+        requester.first_name = 'Renamed'
+        requester.save()
+
+        self.assertEqual(
+            mail.render_mail(
+                'mail/ticket_comment.txt', self.context, name='John'),
+            render_to_string(
+                'mail/ticket_comment.txt', dict(self.context, name='John'))
+        )
+
+    def test_skeletons_bounded(self):
+        skeletons = mail.MailSkeletons(size=1)
+
+        skeletons.get('mail/ticket_comment.txt', self.context, ['name'])
+        skeletons.get('mail/subscriber_added.txt', self.context, ['name'])
+
+        self.assertEqual(len(skeletons.entries), 1)
@@ -0,0 +1,136 @@
+from django.db import connection
+from django.test import TestCase
+import mock
+import psycopg2
+
+from api_v3.misc.pool import ConnectionPool, PoolTimeout, pools
+from api_v3.misc.postgres.base import DatabaseWrapper
+
+
+class ConnectionPoolTestCase(TestCase):
+
+    def setUp(self):
+        self.pool = ConnectionPool(
+            2, timeout=0.01, **connection.get_connection_params())
+
+    def tearDown(self):
+        self.pool.closeall()
+
+    def test_getconn_reuses(self):
+        conn = self.pool.getconn()
+        self.pool.putconn(conn)
+
+        self.assertIs(self.pool.getconn(), conn)
+        self.assertEqual(self.pool.get_stats()['connects'], 1)
+        self.assertEqual(self.pool.get_stats()['checkouts'], 2)
+        self.assertEqual(self.pool.get_stats()['used'], 1)
+
+    def test_getconn_timeout(self):
+        conns = [self.pool.getconn(), self.pool.getconn()]
+
+        with self.assertRaises(PoolTimeout):
+            self.pool.getconn()
+
+        stats = self.pool.get_stats()
+        self.assertEqual(stats['waits'], 1)
+        self.assertEqual(stats['timeouts'], 1)
+        self.assertEqual(stats['used'], 2)
+
+        self.pool.putconn(conns[0])
+
+        self.assertIs(self.pool.getconn(), conns[0])
+
+    def test_getconn_reserved(self):
+        self.pool.reserve = 1
+        conns = [self.pool.getconn(), self.pool.getconn()]
+
+        with self.assertRaises(PoolTimeout):
+            self.pool.getconn()
+
+        reserved = self.pool.getconn(reserved=True)
+
+        with self.assertRaises(PoolTimeout):
+            self.pool.getconn(reserved=True)
+
+        # The reserved connection is not taken by a regular checkout
+        self.pool.putconn(reserved)
+
+        with self.assertRaises(PoolTimeout):
+            self.pool.getconn()
+
+        self.pool.putconn(conns[0])
+
+        self.assertIn(self.pool.getconn(), (conns[0], reserved))
+        self.assertEqual(self.pool.get_stats()['connects'], 3)
+
+    def test_putconn_rolls_back(self):
+        conn = self.pool.getconn()
+
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+        self.pool.putconn(conn)
+
+        self.assertEqual(
+            conn.info.transaction_status,
+            psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        )
+
+    def test_getconn_discards_unusable(self):
+        self.pool.check_after = 0
+        conn = self.pool.getconn()
+        self.pool.putconn(conn)
+
+        with mock.patch.object(self.pool, 'is_usable', return_value=False):
+            self.assertIsNot(self.pool.getconn(), conn)
+
+        self.assertTrue(conn.closed)
+        self.assertEqual(self.pool.get_stats()['discards'], 1)
+
+    def test_forked(self):
+        conn = self.pool.getconn()
+        self.pool.putconn(conn)
+
+        with mock.patch('os.getpid', return_value=-1):
+            self.assertIsNot(self.pool.getconn(), conn)
+            self.assertEqual(self.pool.get_stats()['connects'], 1)
+
+        # Left for the parent process
+        self.assertFalse(conn.closed)
+        conn.close()
+
+    def test_pools_shared(self):
+        params = dict(
+            database='id', user='postgres', host='127.0.0.1', port=5432)
+
+        self.assertIs(
+            pools.get(params),
+            pools.get_dsn('postgres://postgres@127.0.0.1:5432/id')
+        )
+        self.assertIsNot(pools.get(params), pools.get(dict(params, port=1)))
+
+
+class DatabaseWrapperTestCase(TestCase):
+
+    def test_close_returns_to_pool(self):
+        wrapper = DatabaseWrapper(dict(
+            connection.settings_dict, ENGINE='api_v3.misc.postgres'))
+        pool = pools.get(wrapper.get_connection_params())
+
+        try:
+            with wrapper.cursor() as cursor:
+                cursor.execute('SELECT 1')
+
+            conn = wrapper.connection
+            wrapper.close()
+
+            self.assertEqual(pool.get_stats()['idle'], 1)
+            self.assertFalse(conn.closed)
+
+            with wrapper.cursor() as cursor:
+                cursor.execute('SELECT 1')
+
+            self.assertIs(wrapper.connection, conn)
+            wrapper.close()
+        finally:
+            pool.closeall()
@@ -0,0 +1,151 @@
+from django.test import TestCase
+import mock
+from psycopg2 import extensions
+from psycopg2.errors import UndefinedTable
+
+from api_v3.misc.pool import ConnectionPool
+from api_v3.misc.queue import Queue, pool, pq, queue
+
+
+class QueueTestCase(TestCase):
+
+    def setUp(self):
+        self.job = mock.Mock(id=99)
+        self.data = dict(
+            function='api_v3.tasks.task', args=[], kwargs={}, retried=0,
+            retry_in='30s', max_retries=0
+        )
+
+    def test_fail_moves_to_failed_queue(self):
+        with mock.patch.object(Queue, 'put') as put:
+            queue.fail(self.job, self.data, Exception('Nope'))
+
+        put.assert_called_once_with(
+            dict(self.data, job_id=99, error="Exception('Nope')"))
+
+    def test_table_created_on_checkout(self):
+        with mock.patch.object(pool, 'table_ready', False), \
+                mock.patch.object(pq, 'create') as create, \
+                mock.patch.object(
+                    Queue, '__len__', side_effect=UndefinedTable):
+            pool.putconn(pool.getconn())
+
+            self.assertTrue(pool.table_ready)
+
+        create.assert_called_once_with()
+
+    def test_fail_retried(self):
+        self.data['max_retries'] = 1
+
+        with mock.patch.object(Queue, 'put') as put:
+            queue.fail(self.job, self.data, Exception('Nope'))
+
+        put.assert_called_once_with(
+            dict(self.data, retried=1), schedule_at='30s')
+
+
+unique = pq['test-unique']
+
+
+@unique.task(schedule_at='1d', key='unique:{0}')
+def replaced(_job_id, value, other=None):
+    pass
+
+
+@unique.task(schedule_at='1d', key='unique:{0}', replace=False)
+def skipped(_job_id, value, other=None):
+    pass
+
+
+class QueueUniqueTestCase(TestCase):
+
+    def setUp(self):
+        unique.clear()
+
+    def tearDown(self):
+        unique.clear()
+
+    def pending(self):
+        with unique as cursor:
+            cursor.execute(
+                'SELECT data FROM %s WHERE q_name = %s ORDER BY id',
+                (unique.table, unique.name)
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def test_task_replaces_pending(self):
+        first = replaced(1, other='first')
+        second = replaced(1, other='second')
+        replaced(2)
+
+        self.assertNotEqual(first, second)
+        self.assertEqual(
+            [(job['key'], job['kwargs']) for job in self.pending()],
+            [('unique:1', {'other': 'second'}), ('unique:2', {})]
+        )
+
+    def test_task_skips_pending(self):
+        first = skipped(1, other='first')
+        second = skipped(1, other='second')
+
+        self.assertEqual(first, second)
+        self.assertEqual(
+            [job['kwargs'] for job in self.pending()], [{'other': 'first'}])
+
+    def test_task_after_dequeued(self):
+        first = skipped(1)
+
+        # A running job can reschedule itself
+        with unique as cursor:
+            cursor.execute(
+                'UPDATE %s SET dequeued_at = now() WHERE id = %s',
+                (unique.table, first)
+            )
+
+        self.assertNotEqual(skipped(1), first)
+        self.assertEqual(len(self.pending()), 2)
+
+    def test_task_at_pool_capacity(self):
+        shared = ConnectionPool(
+            1, timeout=0.01, reserve=1, **extensions.parse_dsn(pool.dsn))
+        # The ORM connection of the request
+        conn = shared.getconn()
+
+        try:
+            with mock.patch.object(pool, 'pool', shared):
+                replaced(1)
+
+            self.assertEqual(len(self.pending()), 1)
+            self.assertEqual(shared.get_stats()['timeouts'], 0)
+        finally:
+            shared.putconn(conn)
+            shared.closeall()
+
+    def test_listening_connection_kept(self):
+        shared = ConnectionPool(2, **extensions.parse_dsn(pool.dsn))
+        listening = pq['test-listening']
+
+        try:
+            with mock.patch.object(pool, 'pool', shared):
+                self.assertIsNone(listening.get(block=True, timeout=0.01))
+
+                # Still listening, out of the shared pool
+                conn = pool.getconn()
+                self.assertEqual(shared.get_stats()['used'], 1)
+                pool.putconn(conn)
+                self.assertEqual(shared.get_stats()['used'], 1)
+
+                pool.release_listener()
+                self.assertEqual(shared.get_stats()['used'], 0)
+
+                reused = shared.getconn()
+
+                with reused.cursor() as cursor:
+                    cursor.execute('SELECT * FROM pg_listening_channels()')
+                    self.assertEqual(cursor.fetchall(), [])
+
+                self.assertIs(reused, conn)
+                shared.putconn(reused)
+        finally:
+            pool.release_listener()
+            shared.closeall()
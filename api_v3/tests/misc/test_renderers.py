@@ -0,0 +1,227 @@
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+
+from django.utils.translation import gettext_lazy
+import mock
+import rest_framework.renderers
+import rest_framework_json_api.renderers
+from rest_framework import relations
+from rest_framework_json_api import serializers
+
+from api_v3.models import Ticket
+
+from api_v3.factories import (
+    CommentFactory, ProfileFactory, ResponderFactory, TicketFactory)
+from api_v3.misc import renderers
+from api_v3.tests.views.support import ApiTestCase, APIClient, reverse
+
+
+class RelationsSerializer(serializers.ModelSerializer):
+    """Every kind of relationship, the stock ones included."""
+
+    requester = serializers.ResourceRelatedField(read_only=True)
+    responders = serializers.ResourceRelatedField(many=True, read_only=True)
+    requester_pk = relations.PrimaryKeyRelatedField(
+        read_only=True, source='requester')
+    subscriber_pks = relations.PrimaryKeyRelatedField(
+        many=True, read_only=True, source='subscribers')
+
+    class Meta:
+        model = Ticket
+        fields = (
+            'status',
+            'requester',
+            'responders',
+            'requester_pk',
+            'subscriber_pks'
+        )
+
+
+class RenderersTestCase(ApiTestCase):
+
+    DATA = OrderedDict([
+        ('text', 'Ünïcode <&> "quotes" \\ \n\t \u2028 \u2029 \x00'),
+        ('numbers', [
+            0, -1, 2 ** 62, 0.1, 12.5, 1 / 3, 1e-05, 1e16, 1.5e-07, True,
+            False, None
+        ]),
+        ('decimal', Decimal('10.25')),
+        ('datetime', datetime(2020, 1, 2, 3, 4, 5, 678901)),
+        ('aware', datetime(2020, 1, 2, 3, 4, 5, tzinfo=timezone.utc)),
+        ('date', date(2020, 1, 2)),
+        ('time', time(3, 4, 5, 123456)),
+        ('duration', timedelta(days=1, seconds=2)),
+        ('uuid', uuid.UUID('12345678-1234-5678-1234-567812345678')),
+        ('lazy', gettext_lazy('Translated')),
+        ('keys', {1: 'one', None: 'none', 'nested': {'a': [{'b': ()}]}}),
+        ('bytes', b'bytes'),
+    ])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.users = [ProfileFactory.create(), ProfileFactory.create()]
+        self.tickets = [
+            TicketFactory.create(requester=self.users[0]),
+            TicketFactory.create(requester=self.users[0], tags=['a', 'ß'])
+        ]
+
+        ResponderFactory.create(ticket=self.tickets[0], user=self.users[1])
+        CommentFactory.create(ticket=self.tickets[0], user=self.users[1])
+
+    def assertSameRendering(self, response):
+        """Renders the response again, with the stock JSON API renderer."""
+        stock = rest_framework_json_api.renderers.JSONRenderer().render(
+            response.data,
+            response.accepted_media_type,
+            response.renderer_context
+        )
+
+        self.assertEqual(response.content, stock)
+
+    def test_render(self):
+        stock = rest_framework.renderers.JSONRenderer().render(self.DATA)
+
+        self.assertEqual(renderers.FastJSONRenderer().render(self.DATA), stock)
+
+        # Without the exponent floats, it is encoded with `orjson`
+        data = OrderedDict(self.DATA, numbers=self.DATA['numbers'][:6])
+        stock = rest_framework.renderers.JSONRenderer().render(data)
+
+        with mock.patch.object(
+                renderers.orjson, 'dumps',
+                wraps=renderers.orjson.dumps) as dumps:
+            self.assertEqual(renderers.FastJSONRenderer().render(data), stock)
+
+        self.assertEqual(dumps.call_count, 1)
+
+    def test_render_invalid_floats(self):
+        fast = renderers.FastJSONRenderer
+
+        self.assertFalse(fast.has_invalid_floats(
+            {'a': [0.0, 0.0001, -12.5, 9999999999999998.0]}))
+        self.assertTrue(fast.has_invalid_floats({'a': [{'b': (-1e16, )}]}))
+        self.assertTrue(fast.has_invalid_floats([1.5e-07]))
+        self.assertTrue(fast.has_invalid_floats({'a': float('nan')}))
+        self.assertTrue(fast.has_invalid_floats({'a': [float('-inf')]}))
+
+    def test_render_out_of_range_floats(self):
+        stock = rest_framework.renderers.JSONRenderer()
+
+        for value in (float('nan'), float('inf'), float('-inf')):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError) as stock_error:
+                    stock.render({'a': [value]})
+
+                with self.assertRaises(ValueError) as error:
+                    renderers.FastJSONRenderer().render({'a': [value]})
+
+                self.assertEqual(
+                    str(error.exception), str(stock_error.exception))
+
+    def test_render_invalid_floats_attributes(self):
+        serializer = RelationsSerializer(self.tickets[0])
+        renderers.JSONRenderer.get_plan(serializer.fields)
+        document = {
+            'data': [{
+                'type': 'tickets',
+                'attributes': {'status': 1e-07},
+                'relationships': {'requester': {'meta': {'count': 1e-07}}}
+            }],
+            'meta': {'total': 1}
+        }
+
+        # Only the float attributes and the meta are checked
+        self.assertNotIn('status', renderers.JSONRenderer.float_attributes)
+        self.assertFalse(renderers.JSONRenderer.has_invalid_floats(document))
+
+        document['meta']['total'] = float('nan')
+        self.assertTrue(renderers.JSONRenderer.has_invalid_floats(document))
+
+    def test_render_without_orjson(self):
+        stock = rest_framework.renderers.JSONRenderer().render(self.DATA)
+
+        with mock.patch.object(renderers, 'orjson', None):
+            rendered = renderers.FastJSONRenderer().render(self.DATA)
+
+        self.assertEqual(rendered, stock)
+
+    def test_render_fallback(self):
+        stock = rest_framework.renderers.JSONRenderer()
+        fast = renderers.FastJSONRenderer()
+
+        self.assertEqual(
+            fast.render({'big': 2 ** 70}), stock.render({'big': 2 ** 70}))
+        self.assertEqual(
+            fast.render(self.DATA, 'application/json; indent=4'),
+            stock.render(self.DATA, 'application/json; indent=4')
+        )
+
+    def test_render_endpoints(self):
+        self.users[0].is_superuser = True
+        self.users[0].is_staff = True
+        self.users[0].save()
+        self.client.force_authenticate(self.users[0])
+
+        requests = (
+            ('ticket-list', {}),
+            ('ticket-list', {'include': 'requester,responders.user'}),
+            ('ticket-list', {'fields[tickets]': 'status,tags'}),
+            ('ticket-detail', {}),
+            ('comment-list', {'include': 'user,ticket'}),
+            ('action-list', {}),
+            ('action-list', {'include': 'user,comment'}),
+            ('ticket_stats-list', {'by': 'country'}),
+            ('profile-list', {}),
+        )
+
+        for url_name, params in requests:
+            with self.subTest(url_name=url_name, params=params):
+                args = [self.tickets[0].id] if '-detail' in url_name else []
+                response = self.client.get(reverse(url_name, args=args), params)
+
+                self.assertEqual(response.status_code, 200)
+                self.assertSameRendering(response)
+
+    def test_render_errors(self):
+        self.client.force_authenticate(self.users[1])
+
+        response = self.client.get(
+            reverse('ticket-detail', args=[self.tickets[1].id]))
+
+        self.assertEqual(response.status_code, 404)
+        self.assertSameRendering(response)
+
+    def test_extract_relationships(self):
+        for ticket in self.tickets:
+            serializer = RelationsSerializer(ticket)
+            fields = serializer.fields
+            resource = serializer.data
+
+            with self.subTest(ticket=ticket.id):
+                self.assertEqual(
+                    renderers.JSONRenderer.extract_relationships(
+                        fields, resource, ticket),
+                    rest_framework_json_api.renderers.JSONRenderer
+                    .extract_relationships(fields, resource, ticket)
+                )
+
+    def test_plan(self):
+        fields = RelationsSerializer(self.tickets[0]).fields
+        plan = renderers.JSONRenderer.get_plan(fields)
+
+        self.assertIs(renderers.JSONRenderer.get_plan(fields), plan)
+        self.assertEqual(plan.attributes, (('status', 'status', False),))
+        self.assertEqual(plan.related, frozenset([
+            'requester', 'responders', 'requester_pk', 'subscriber_pks']))
+        self.assertEqual(
+            [(name, formatted, kind)
+             for name, formatted, kind, _, _ in plan.relationships],
+            [
+                ('requester', 'requester', 'resource'),
+                ('responders', 'responders', 'many-resource'),
+                ('requester_pk', 'requester-pk', None),
+                ('subscriber_pks', 'subscriber-pks', None)
+            ]
+        )
@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import SimpleTestCase
+import mock
+
+from api_v3.misc import router
+from api_v3.models import Ticket
+
+
+class ReplicaRouterTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.router = router.ReplicaRouter()
+        self.databases = mock.patch.dict(
+            settings.DATABASES,
+            replica=dict(settings.DATABASES[DEFAULT_DB_ALIAS]))
+        self.databases.start()
+
+    def tearDown(self):
+        self.databases.stop()
+
+    def test_db_for_read(self):
+        self.assertEqual(self.router.db_for_read(Ticket), 'default')
+
+        with router.replica_reads():
+            self.assertEqual(self.router.db_for_read(Ticket), 'replica')
+
+            with router.replica_reads(False):
+                self.assertEqual(self.router.db_for_read(Ticket), 'default')
+
+        self.assertEqual(self.router.db_for_read(Ticket), 'default')
+
+    def test_db_for_read_in_transaction(self):
+        with mock.patch.object(
+                connections[DEFAULT_DB_ALIAS], 'in_atomic_block', True):
+            with router.replica_reads():
+                self.assertEqual(self.router.db_for_read(Ticket), 'default')
+
+    def test_db_for_read_no_replica(self):
+        del settings.DATABASES['replica']
+
+        with router.replica_reads():
+            self.assertEqual(self.router.db_for_read(Ticket), 'default')
+
+    def test_db_for_write(self):
+        ticket = Ticket()
+        ticket._state.db = 'replica'
+
+        with router.replica_reads():
+            self.assertEqual(
+                self.router.db_for_write(Ticket, instance=ticket), 'default')
+
+        self.assertFalse(self.router.allow_migrate('replica', 'api_v3'))
@@ -2,6 +2,7 @@ from datetime import datetime
 
 from django.test import TestCase
 
+from api_v3.misc.db import has_extension
 from api_v3.models import (
     Ticket, Profile, Responder, Attachment, Comment, Subscriber
 )
@@ -135,6 +136,65 @@ class TicketAttachmentCommentFilterByUserRequesterTestCase(
         self.assertEqual(tickets.count(), 1)
         self.assertIn(self.tickets[0], tickets)
 
+    def test_tickets_search_for_comment_authors(self):
+        tickets = Ticket.search_for(self.users[0].email)
+
+        self.assertEqual(set(tickets), set(self.tickets[:2]))
+
+    def test_tickets_search_for_renamed_comment_authors(self):
+        self.users[0].email = 'renamed-author@example.com'
+        self.users[0].save()
+
+        tickets = Ticket.search_for('renamed-author@example.com')
+
+        self.assertEqual(set(tickets), set(self.tickets[:2]))
+
+    def test_comments_search_for(self):
+        comments = Comment.search_for('body2')
+
+        self.assertEqual(list(comments), [self.comments[1]])
+        self.assertGreater(comments[0].rank, 0)
+
+        self.comments[1].body = 'updated'
+        self.comments[1].save()
+
+        self.assertEqual(Comment.search_for('body2').count(), 0)
+        self.assertEqual(Comment.search_for('updated').count(), 1)
+
+    def test_tickets_fuzzy_search_for(self):
+        Ticket.objects.filter(id=self.tickets[1].id).update(
+            first_name='Fnamesake', company_name='Fname Holdings')
+
+        tickets = list(Ticket.fuzzy_search_for('fnam'))
+
+        self.assertEqual(
+            [ticket.id for ticket in tickets],
+            [self.tickets[1].id, self.tickets[0].id]
+        )
+        self.assertGreaterEqual(tickets[0].rank, tickets[1].rank)
+
+        headlines = Ticket.fuzzy_search_headlines(
+            'fnam', [ticket.id for ticket in tickets])
+        self.assertIn('<mark>fname</mark>', headlines[tickets[1].id])
+        self.assertEqual(Ticket.fuzzy_search_headlines(' :* & ', [1]), {})
+
+        tickets = Ticket.fuzzy_search_for('fname holdings')
+        self.assertEqual(list(tickets), [self.tickets[1]])
+
+        tickets = Ticket.fuzzy_search_for('fname', Ticket.objects.none())
+        self.assertEqual(tickets.count(), 0)
+
+        tickets = Ticket.fuzzy_search_for(' :* & ')
+        self.assertEqual(tickets.count(), 0)
+
+    def test_tickets_fuzzy_search_for_misspelled(self):
+        if not has_extension('pg_trgm'):
+            self.skipTest('The pg_trgm extension is missing.')
+
+        tickets = Ticket.fuzzy_search_for('fnmae')
+
+        self.assertIn(self.tickets[0], tickets)
+
     def test_attachment_filter_by_user(self):
         attachments = Attachment.filter_by_user(self.users[0])
 
@@ -175,6 +235,40 @@ class TicketAttachmentCommentFilterByUserResponderTestCase(
         self.assertIn(self.tickets[0], tickets)
         self.assertIn(self.tickets[1], tickets)
 
+    def test_tickets_fuzzy_search_for(self):
+        Ticket.objects.filter(id=self.tickets[1].id).update(
+            first_name='Fnamesake', company_name='Fname Holdings')
+
+        tickets = list(Ticket.fuzzy_search_for('fnam'))
+
+        self.assertEqual(
+            [ticket.id for ticket in tickets],
+            [self.tickets[1].id, self.tickets[0].id]
+        )
+        self.assertGreaterEqual(tickets[0].rank, tickets[1].rank)
+
+        headlines = Ticket.fuzzy_search_headlines(
+            'fnam', [ticket.id for ticket in tickets])
+        self.assertIn('<mark>fname</mark>', headlines[tickets[1].id])
+        self.assertEqual(Ticket.fuzzy_search_headlines(' :* & ', [1]), {})
+
+        tickets = Ticket.fuzzy_search_for('fname holdings')
+        self.assertEqual(list(tickets), [self.tickets[1]])
+
+        tickets = Ticket.fuzzy_search_for('fname', Ticket.objects.none())
+        self.assertEqual(tickets.count(), 0)
+
+        tickets = Ticket.fuzzy_search_for(' :* & ')
+        self.assertEqual(tickets.count(), 0)
+
+    def test_tickets_fuzzy_search_for_misspelled(self):
+        if not has_extension('pg_trgm'):
+            self.skipTest('The pg_trgm extension is missing.')
+
+        tickets = Ticket.fuzzy_search_for('fnmae')
+
+        self.assertIn(self.tickets[0], tickets)
+
     def test_attachment_filter_by_user(self):
         attachments = Attachment.filter_by_user(self.users[0])
 
@@ -208,6 +302,40 @@ class TicketAttachmentCommentFilterByUserSubscriberTestCase(
         self.assertIn(self.tickets[0], tickets)
         self.assertIn(self.tickets[1], tickets)
 
+    def test_tickets_fuzzy_search_for(self):
+        Ticket.objects.filter(id=self.tickets[1].id).update(
+            first_name='Fnamesake', company_name='Fname Holdings')
+
+        tickets = list(Ticket.fuzzy_search_for('fnam'))
+
+        self.assertEqual(
+            [ticket.id for ticket in tickets],
+            [self.tickets[1].id, self.tickets[0].id]
+        )
+        self.assertGreaterEqual(tickets[0].rank, tickets[1].rank)
+
+        headlines = Ticket.fuzzy_search_headlines(
+            'fnam', [ticket.id for ticket in tickets])
+        self.assertIn('<mark>fname</mark>', headlines[tickets[1].id])
+        self.assertEqual(Ticket.fuzzy_search_headlines(' :* & ', [1]), {})
+
+        tickets = Ticket.fuzzy_search_for('fname holdings')
+        self.assertEqual(list(tickets), [self.tickets[1]])
+
+        tickets = Ticket.fuzzy_search_for('fname', Ticket.objects.none())
+        self.assertEqual(tickets.count(), 0)
+
+        tickets = Ticket.fuzzy_search_for(' :* & ')
+        self.assertEqual(tickets.count(), 0)
+
+    def test_tickets_fuzzy_search_for_misspelled(self):
+        if not has_extension('pg_trgm'):
+            self.skipTest('The pg_trgm extension is missing.')
+
+        tickets = Ticket.fuzzy_search_for('fnmae')
+
+        self.assertIn(self.tickets[0], tickets)
+
     def test_attachment_filter_by_user(self):
         attachments = Attachment.filter_by_user(self.users[0])
 
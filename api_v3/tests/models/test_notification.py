@@ -0,0 +1,142 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import mail
+from django.template.loader import render_to_string
+from django.test import TestCase, override_settings
+import mock
+
+from api_v3.factories import CommentFactory, ProfileFactory, TicketFactory
+from api_v3.misc.queue import queue
+from api_v3.models import Notification
+
+
+class NotificationTestCase(TestCase):
+
+    def setUp(self):
+        self.users = [ProfileFactory.create(), ProfileFactory.create()]
+        self.ticket = TicketFactory.create(requester=self.users[0])
+        self.comment = CommentFactory.create(
+            ticket=self.ticket, user=self.users[0])
+        self.recipients = [
+            (user.email, user.display_name) for user in self.users
+        ]
+
+    def notify(self, template='mail/ticket_comment.txt', comment=None):
+        Notification.notify(
+            self.recipients, self.ticket, template, 'Subject', 'host.tld',
+            comment=comment
+        )
+
+    def test_notify_single(self):
+        self.notify(comment=self.comment)
+        queue.work(burst=True)
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(Notification.objects.count(), 0)
+
+        email = [e for e in mail.outbox if e.to[0] == self.users[1].email][0]
+
+        self.assertEqual(email.subject, 'Subject')
+        self.assertEqual(
+            email.body,
+            render_to_string(
+                'mail/ticket_comment.txt',
+                dict(
+                    comment=self.comment,
+                    name=self.users[1].display_name,
+                    request_host='host.tld',
+                    site_name=settings.SITE_NAME
+                )
+            )
+        )
+
+    def test_notify_burst(self):
+        self.notify(comment=self.comment)
+        self.notify(template='mail/ticket_reopened.txt')
+        self.notify(template='mail/responder_created.txt')
+
+        self.assertEqual(Notification.objects.count(), 6)
+
+        queue.work(burst=True)
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(Notification.objects.count(), 0)
+        self.assertEqual(
+            mail.outbox[0].subject,
+            Notification.EMAIL_SUBJECT.format(3, self.ticket.id)
+        )
+        self.assertIn(
+            Notification.SUMMARIES['mail/ticket_comment.txt'],
+            mail.outbox[0].body
+        )
+        self.assertIn(
+            Notification.SUMMARIES['mail/ticket_reopened.txt'],
+            mail.outbox[0].body
+        )
+
+    def test_notify_duplicate_recipients(self):
+        self.recipients.append((self.users[0].email, 'Duplicate'))
+        self.notify()
+
+        self.assertEqual(
+            Notification.objects.get(email=self.users[0].email).name,
+            self.users[0].display_name
+        )
+
+    @override_settings(NOTIFICATIONS_QUIET_WINDOW=300)
+    def test_flush_postponed_while_not_quiet(self):
+        flush = Notification.flush.__wrapped__
+
+        with mock.patch.object(Notification, 'flush') as scheduled:
+            self.notify()
+            self.notify()
+
+            # The queue skips these if pending
+            self.assertEqual(scheduled.call_count, 4)
+
+            flush(None, self.users[0].email, self.ticket.id)
+
+            self.assertEqual(scheduled.call_count, 5)
+            self.assertEqual(
+                scheduled.call_args.kwargs['_schedule_at'],
+                Notification.objects.filter(
+                    email=self.users[0].email
+                ).last().created_at + timedelta(seconds=300)
+            )
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(Notification.objects.count(), 4)
+
+    @override_settings(NOTIFICATIONS_QUIET_WINDOW=300)
+    def test_notify_while_flushing(self):
+        def pending():
+            with queue as cursor:
+                cursor.execute(
+                    'SELECT data->>\'key\' FROM %s WHERE q_name = %s '
+                    'AND dequeued_at IS NULL ORDER BY id',
+                    (queue.table, queue.name)
+                )
+                return [row[0] for row in cursor.fetchall()]
+
+        keys = sorted(
+            'notification:{}:{}'.format(user.email, self.ticket.id)
+            for user in self.users
+        )
+
+        queue.clear()
+        self.notify()
+        self.notify()
+
+        self.assertEqual(sorted(pending()), keys)
+
+        # The flushes are running, the new notifications schedule new ones
+        with queue as cursor:
+            cursor.execute(
+                'UPDATE %s SET dequeued_at = now() WHERE q_name = %s',
+                (queue.table, queue.name)
+            )
+
+        self.notify()
+
+        self.assertEqual(sorted(pending()), keys)
@@ -0,0 +1,144 @@
+import threading
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+
+from api_v3.factories import (
+    AttachmentFactory, CommentFactory, ExpenseFactory, ProfileFactory,
+    TicketFactory)
+from api_v3.models import Comment, Ticket
+
+
+class TicketCountersTestCase(TestCase):
+
+    def setUp(self):
+        self.user = ProfileFactory.create()
+        self.tickets = [
+            TicketFactory.create(requester=self.user),
+            TicketFactory.create(requester=self.user)
+        ]
+
+    def test_add_activity(self):
+        ticket = self.tickets[0]
+        updated_at = ticket.updated_at
+        now = datetime.utcnow()
+
+        Ticket.add_activity(ticket.id, now, comments=1)
+        Ticket.add_activity(
+            ticket.id, now - timedelta(days=1), attachments=1,
+            expense=('EUR', Decimal('1.5')))
+        Ticket.add_activity(
+            ticket.id, now, expense=('EUR', Decimal('0.25')))
+        Ticket.add_activity(ticket.id, now, expense=('USD', None))
+
+        ticket.refresh_from_db()
+
+        self.assertEqual(ticket.comments_count, 1)
+        self.assertEqual(ticket.attachments_count, 1)
+        self.assertEqual(ticket.expenses_total, {'EUR': '1.7500'})
+        self.assertEqual(ticket.last_activity_at, now)
+        self.assertGreater(ticket.updated_at, updated_at)
+
+    def test_repair_counters(self):
+        ticket = self.tickets[0]
+        comment = CommentFactory.create(ticket=ticket, user=self.user)
+        AttachmentFactory.create(ticket=ticket, user=self.user)
+        ExpenseFactory.create(
+            ticket=ticket, user=self.user, amount=Decimal('2'),
+            amount_currency='EUR')
+        ExpenseFactory.create(
+            ticket=ticket, user=self.user, amount=Decimal('3.125'),
+            amount_currency='EUR')
+        ExpenseFactory.create(
+            ticket=ticket, user=self.user, amount=None,
+            amount_currency='USD', created_at=datetime.min)
+
+        ticket_ids = [ticket.id for ticket in self.tickets]
+        updated_at = [ticket.updated_at for ticket in self.tickets]
+
+        self.assertEqual(Ticket.repair_counters(ticket_ids), 1)
+
+        ticket.refresh_from_db()
+        self.tickets[1].refresh_from_db()
+
+        # Only the fixed tickets are touched
+        self.assertGreater(ticket.updated_at, updated_at[0])
+        self.assertEqual(self.tickets[1].updated_at, updated_at[1])
+
+        self.assertEqual(ticket.comments_count, 1)
+        self.assertEqual(ticket.attachments_count, 1)
+        self.assertEqual(ticket.expenses_total, {'EUR': '5.1250'})
+        self.assertEqual(
+            ticket.last_activity_at,
+            max(
+                comment.created_at,
+                ticket.attachments.get().created_at,
+                ticket.expenses.latest('created_at').created_at
+            )
+        )
+
+        # Only the changed tickets are written
+        self.assertEqual(Ticket.repair_counters([ticket.id]), 0)
+
+        comment.delete()
+        updated_at = ticket.updated_at
+        self.assertEqual(
+            Ticket.repair_counters([ticket.id], touch=False), 1)
+
+        ticket.refresh_from_db()
+
+        self.assertEqual(ticket.comments_count, 0)
+        self.assertEqual(ticket.updated_at, updated_at)
+
+
+class TicketCountersConcurrencyTestCase(TransactionTestCase):
+
+    WRITERS = 4
+    COMMENTS = 10
+
+    def test_concurrent_writes(self):
+        user = ProfileFactory.create()
+        ticket = TicketFactory.create(requester=user)
+        errors = []
+
+        def add_comments():
+            try:
+                for _ in range(self.COMMENTS):
+                    with transaction.atomic():
+                        comment = Comment.objects.create(
+                            ticket=ticket, user=user, body='comment')
+                        Ticket.add_activity(
+                            ticket.id, comment.created_at, comments=1)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        def repair():
+            try:
+                for _ in range(self.COMMENTS):
+                    Ticket.repair_counters([ticket.id])
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=add_comments)
+            for _ in range(self.WRITERS)
+        ] + [threading.Thread(target=repair)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        ticket.refresh_from_db()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(
+            ticket.comments_count, self.WRITERS * self.COMMENTS)
+        self.assertEqual(Ticket.repair_counters([ticket.id]), 0)
@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta
+
+from django.db import connection, models
+from django.test import TestCase
+
+from api_v3.factories import ProfileFactory
+from api_v3.models import Comment, Ticket
+
+
+class TicketIndexesTestCase(TestCase):
+    """Query plans of the ticket filters, on a seeded dataset.
+
+    Sequential scans are disabled, a filter which can not use an index
+    falls back to one anyway, the plan tells which.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [ProfileFactory.create() for _ in range(5)]
+        statuses = [status for status, _ in Ticket.STATUSES]
+        now = datetime.utcnow()
+
+        Ticket.objects.bulk_create([
+            Ticket(
+                requester=cls.users[i % len(cls.users)],
+                status=statuses[i % len(statuses)],
+                countries=['MD', 'RO'] if i % 3 else ['UA'],
+                tags=['tag{}'.format(i % 7)],
+                deadline_at=now + timedelta(days=i % 30),
+                sent_notifications_at=(
+                    None if i % 4 else now - timedelta(days=1)),
+                background='Ticket {}'.format(i)
+            ) for i in range(500)
+        ])
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE api_v3_ticket')
+
+    def explain(self, queryset):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+        return queryset.explain()
+
+    def test_status_created_at(self):
+        plan = self.explain(
+            Ticket.objects.filter(
+                status__in=['closed', 'cancelled']).order_by('-created_at')
+        )
+
+        self.assertIn('api_v3_tick_status_created_idx', plan)
+
+    def test_requester_created_at(self):
+        plan = self.explain(
+            Ticket.objects.filter(
+                requester=self.users[0]).order_by('-created_at')
+        )
+
+        self.assertIn('api_v3_tick_requester_idx', plan)
+
+    def test_open_created_at(self):
+        plan = self.explain(
+            Ticket.objects.filter(
+                status__in=Ticket.OPEN_STATUSES).order_by('-created_at')
+        )
+
+        self.assertIn('api_v3_tick_open_created_idx', plan)
+
+    def test_open_deadline_at(self):
+        plan = self.explain(
+            Ticket.objects.filter(
+                status__in=Ticket.OPEN_STATUSES,
+                deadline_at__lte=datetime.utcnow() + timedelta(days=3)
+            )
+        )
+
+        self.assertIn('api_v3_tick_open_deadline_idx', plan)
+
+    def test_countries_contains(self):
+        plan = self.explain(Ticket.objects.filter(countries__contains=['UA']))
+
+        self.assertIn('api_v3_tick_countries_gin', plan)
+
+    def test_tags_overlap(self):
+        plan = self.explain(
+            Ticket.objects.filter(tags__overlap=['tag1', 'tag2']))
+
+        self.assertIn('api_v3_tick_tags_gin', plan)
+
+    def test_fuzzy_search(self):
+        plan = self.explain(Ticket.fuzzy_search_for('Tick'))
+
+        self.assertIn('api_v3_tick_search_gin', plan)
+
+    def test_comments_search(self):
+        plan = self.explain(Comment.search_for('ticket'))
+
+        self.assertIn('api_v3_comm_search_gin', plan)
+
+    def test_digest_sent_notifications_at(self):
+        plan = self.explain(
+            Ticket.objects.filter(
+                models.Q(
+                    sent_notifications_at__gte=models.Func(function='now')
+                ) | models.Q(
+                    sent_notifications_at=None
+                )
+            )
+        )
+
+        self.assertIn('api_v3_tick_sent_notif_idx', plan)
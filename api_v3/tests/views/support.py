@@ -24,3 +24,13 @@ class ApiTestCase(TestCase):
                 type=get_resource_type_from_serializer(serializer_class)
             )
         )
+
+    def assertQueryBudget(self, response, budget):
+        """Fails if the request ran more SQL queries than the budget."""
+        queries = response.wsgi_request.metrics.queries
+
+        self.assertLessEqual(
+            queries, budget,
+            '{} ran {} queries, over the budget of {}.'.format(
+                response.wsgi_request.get_full_path(), queries, budget)
+        )
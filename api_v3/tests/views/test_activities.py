@@ -74,3 +74,27 @@ class ActivitiesEndpointTestCase(TestCase):
         self.assertEqual(
             data['data'][0]['relationships']['comment']['data'], None
         )
+
+    def test_list_authenticated_not_modified(self):
+        self.client.force_authenticate(self.users[1])
+
+        response = self.client.get(reverse('action-list'))
+        etag = response['ETag']
+
+        self.assertEqual(response.status_code, 200)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                reverse('action-list'), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        Action.objects.create(
+            actor=self.users[1], target=self.tickets[0], verb='test-action')
+
+        response = self.client.get(
+            reverse('action-list'), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
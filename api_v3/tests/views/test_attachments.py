@@ -5,7 +5,7 @@ import io
 from django.core.files.uploadedfile import SimpleUploadedFile
 
 from api_v3.factories import ProfileFactory, TicketFactory, AttachmentFactory
-from api_v3.models import Attachment, Action
+from api_v3.models import Attachment, Action, Ticket
 from .support import ApiTestCase, APIClient, reverse
 
 
@@ -110,6 +110,31 @@ class AttachmentsEndpointTestCase(ApiTestCase):
             actions_count + 1
         )
 
+    def test_create_counts_activity(self):
+        self.client.force_authenticate(self.users[0])
+
+        ticket = self.tickets[0]
+        Ticket.repair_counters([ticket.id])
+
+        with io.BytesIO(b'dummy file') as fu:
+            response = self.client.post(
+                reverse('attachment-list'),
+                data={
+                    'ticket': json.dumps({'type': 'tickets', 'id': ticket.id}),
+                    'upload': fu
+                },
+                format='multipart',
+            )
+
+        self.assertEqual(response.status_code, 201)
+
+        attachment = Attachment.objects.get(
+            id=json.loads(response.content)['data']['id'])
+        ticket.refresh_from_db()
+
+        self.assertEqual(ticket.attachments_count, 2)
+        self.assertEqual(ticket.last_activity_at, attachment.created_at)
+
     def test_create_authenticated_without_access(self):
         self.client.force_authenticate(self.users[1])
 
@@ -177,6 +202,27 @@ class AttachmentsEndpointTestCase(ApiTestCase):
             actions_count + 1
         )
 
+    def test_delete_counts_activity(self):
+        ticket = self.tickets[0]
+        attachment = AttachmentFactory.create(
+            user=self.users[0], ticket=ticket)
+        Ticket.repair_counters([ticket.id])
+
+        self.client.force_authenticate(self.users[0])
+
+        response = self.client.delete(
+            reverse('attachment-detail', args=[attachment.id]),
+            content_type=self.JSON_API_CONTENT_TYPE
+        )
+
+        self.assertEqual(response.status_code, 204)
+
+        ticket.refresh_from_db()
+
+        self.assertEqual(ticket.attachments_count, 1)
+        self.assertEqual(
+            ticket.last_activity_at, self.attachments[0].created_at)
+
     def test_delete_attachment_author(self):
         attachments_count = Attachment.objects.count()
         actions_count = Action.objects.filter(
@@ -62,6 +62,26 @@ class CommentsEndpointTestCase(ApiTestCase):
             str(self.comments[0].id)
         )
 
+    def test_list_search(self):
+        comment = CommentFactory.create(
+            user=self.users[1], ticket=self.tickets[0],
+            body='The shell companies were registered abroad.'
+        )
+        other = TicketFactory.create(requester=self.users[1])
+        CommentFactory.create(
+            user=self.users[1], ticket=other, body='Registered companies.')
+
+        self.client.force_authenticate(self.users[0])
+
+        response = self.client.get(
+            reverse('comment-list'), {'filter[search]': 'company registered'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [c['id'] for c in json.loads(response.content)['data']],
+            [str(comment.id)]
+        )
+
     def test_detail_authenticated(self):
         self.client.force_authenticate(self.users[0])
 
@@ -119,6 +139,29 @@ class CommentsEndpointTestCase(ApiTestCase):
         self.assertGreater(ticket.updated_at, old_ticket_updated_at)
         self.assertEqual(ticket.created_at, old_ticket_created_at)
 
+    def test_create_counts_activity(self):
+        self.client.force_authenticate(self.users[0])
+
+        ticket = self.comments[0].ticket
+        Ticket.repair_counters([ticket.id])
+
+        new_data = self.as_jsonapi_payload(
+            CommentSerializer, self.comments[0], {'body': 'new comment'})
+
+        response = self.client.post(
+            reverse('comment-list'),
+            data=json.dumps(new_data),
+            content_type=self.JSON_API_CONTENT_TYPE
+        )
+
+        self.assertEqual(response.status_code, 201)
+
+        comment = Comment.objects.get(id=response.json()['data']['id'])
+        ticket.refresh_from_db()
+
+        self.assertEqual(ticket.comments_count, ticket.comments.count())
+        self.assertEqual(ticket.last_activity_at, comment.created_at)
+
     def test_create_authenticated_without_access(self):
         self.client.force_authenticate(self.users[1])
 
@@ -1,13 +1,14 @@
 import json
 import random
 from datetime import datetime
+from decimal import Decimal
 
 from api_v3.factories import (
     ExpenseFactory,
     ProfileFactory,
     TicketFactory
 )
-from api_v3.models import Action, Expense
+from api_v3.models import Action, Expense, Ticket
 from api_v3.serializers import ExpenseSerializer
 from .support import ApiTestCase, APIClient, reverse
 
@@ -131,6 +132,69 @@ class ExpensesEndpointTestCase(ApiTestCase):
             actions_count + 1
         )
 
+    def test_create_counts_activity(self):
+        self.client.force_authenticate(self.users[1])
+
+        ticket = self.tickets[0]
+        self.expenses[0].amount = Decimal('10.5')
+        self.expenses[0].amount_currency = 'EUR'
+        self.expenses[0].save()
+        Ticket.repair_counters([ticket.id])
+
+        for amount in ('2.25', '0.0001'):
+            new_data = self.as_jsonapi_payload(
+                ExpenseSerializer,
+                ExpenseFactory.build(
+                    ticket=ticket, amount=Decimal(amount),
+                    amount_currency='EUR'),
+                {'notes': 'new notes'}
+            )
+
+            response = self.client.post(
+                reverse('expense-list'),
+                data=json.dumps(new_data),
+                content_type=self.JSON_API_CONTENT_TYPE
+            )
+
+            self.assertEqual(response.status_code, 201)
+
+        ticket.refresh_from_db()
+
+        self.assertEqual(ticket.expenses_total, {'EUR': '12.7501'})
+        self.assertEqual(
+            ticket.last_activity_at,
+            max(expense.created_at for expense in ticket.expenses.all())
+        )
+        self.assertEqual(Ticket.repair_counters([ticket.id]), 0)
+
+    def test_update_counts_activity(self):
+        self.client.force_authenticate(self.users[1])
+        requester = APIClient()
+        requester.force_authenticate(self.users[0])
+        ticket_url = reverse('ticket-detail', args=[self.tickets[0].id])
+        etag = requester.get(ticket_url)['ETag']
+
+        new_data = self.as_jsonapi_payload(
+            ExpenseSerializer,
+            self.expenses[0],
+            {'amount': '7.50', 'amount-currency': 'USD'}
+        )
+
+        response = self.client.put(
+            reverse('expense-detail', args=[self.expenses[0].id]),
+            data=json.dumps(new_data),
+            content_type=self.JSON_API_CONTENT_TYPE
+        )
+
+        self.assertEqual(response.status_code, 200)
+
+        self.tickets[0].refresh_from_db()
+
+        self.assertEqual(self.tickets[0].expenses_total, {'USD': '7.5000'})
+
+        # The ticket changed, the conditional requests see it
+        self.assertNotEqual(requester.get(ticket_url)['ETag'], etag)
+
     def test_update_authenticated(self):
         self.client.force_authenticate(self.users[0])
 
@@ -203,3 +267,8 @@ class ExpensesEndpointTestCase(ApiTestCase):
             ).count(),
             actions_count + 1
         )
+
+        self.tickets[0].refresh_from_db()
+
+        self.assertEqual(self.tickets[0].expenses_total, {})
+        self.assertIsNone(self.tickets[0].last_activity_at)
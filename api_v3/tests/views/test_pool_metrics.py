@@ -0,0 +1,42 @@
+from psycopg2 import extensions
+
+from api_v3.factories import ProfileFactory
+from api_v3.misc.queue import pool, queue
+from .support import ApiTestCase, APIClient, reverse
+
+
+class PoolMetricsEndpointTestCase(ApiTestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.users = [
+            ProfileFactory.create(),
+            ProfileFactory.create(is_superuser=True, is_staff=True),
+        ]
+
+    def test_list_non_staff(self):
+        self.client.force_authenticate(self.users[0])
+
+        response = self.client.get(reverse('pool_metrics-list'))
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_list_staff(self):
+        self.client.force_authenticate(self.users[1])
+        len(queue)
+
+        response = self.client.get(reverse('pool_metrics-list'))
+
+        self.assertEqual(response.status_code, 200)
+
+        # The queue database pool
+        params = extensions.parse_dsn(pool.dsn)
+        database = '{}@{}'.format(
+            params['dbname'], params.get('host', 'localhost'))
+        metrics = [
+            resource['attributes'] for resource in response.json()['data']
+            if resource['attributes']['database'] == database
+        ][0]
+        self.assertGreater(metrics['checkouts'], 0)
+        self.assertEqual(metrics['used'], 0)
+        self.assertIn('wait-ms', metrics)
@@ -174,3 +174,17 @@ class ProfilesEndpointTestCase(ApiTestCase):
         self.assertNotEqual(data['attributes']['email'], email)
         self.assertEqual(data['attributes']['bio'], 'Short Bio')
         self.assertTrue(data['attributes']['is-staff'])
+
+    def test_list_cached_per_user(self):
+        self.client.force_authenticate(self.users[0])
+        response = self.client.get(reverse('profile-list'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, self.users[0].email)
+
+        self.client.force_authenticate(self.users[1])
+        response = self.client.get(reverse('profile-list'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, self.users[1].email)
+        self.assertNotContains(response, self.users[0].email)
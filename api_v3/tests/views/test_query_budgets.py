@@ -0,0 +1,94 @@
+import json
+
+from django.test import override_settings
+
+from api_v3.factories import (
+    AttachmentFactory,
+    CommentFactory,
+    ProfileFactory,
+    ResponderFactory,
+    SubscriberFactory,
+    TicketFactory
+)
+from api_v3.misc.instrumentation import registry
+from api_v3.models import Action
+from .support import ApiTestCase, APIClient, reverse
+
+
+class QueryBudgetsTestCase(ApiTestCase):
+    """Endpoints SQL queries budgets.
+
+    The budgets match the queries count for the seeded data, lower them
+    when an endpoint gets optimized.
+    """
+
+    BUDGETS = (
+        ('ticket-list', {}, 42),
+        ('ticket-list', {'include': 'users'}, 41),
+        ('ticket-list', {'include': 'requester,responders.user'}, 59),
+        ('ticket-list', {'filter[search]': 'budget'}, 42),
+        ('comment-list', {'include': 'user'}, 13),
+        ('action-list', {'include': 'comment,responder-user,user'}, 56),
+        ('attachment-list', {}, 2),
+        ('profile-list', {}, 8),
+        ('ticket_stats-list', {'by': 'responder'}, 4),
+    )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = ProfileFactory.create(is_superuser=True, is_staff=True)
+        self.users = [ProfileFactory.create() for _ in range(4)]
+
+        for _ in range(4):
+            ticket = TicketFactory.create(
+                requester=self.users[0], first_name='Budget',
+                status='new')
+
+            for user, other_user in zip(self.users[:2], self.users[2:]):
+                ResponderFactory.create(ticket=ticket, user=user)
+                SubscriberFactory.create(ticket=ticket, user=other_user)
+                comment = CommentFactory.create(ticket=ticket, user=user)
+                AttachmentFactory.create(ticket=ticket, user=other_user)
+
+                Action.objects.create(
+                    actor=user, target=ticket, action=comment,
+                    verb='comment:create')
+                Action.objects.create(
+                    actor=self.user, target=ticket, action=user,
+                    verb='responder:create')
+
+    def test_budgets(self):
+        self.client.force_authenticate(self.user)
+
+        for url_name, params, budget in self.BUDGETS:
+            with self.subTest(url_name=url_name, params=params):
+                response = self.client.get(reverse(url_name), params)
+
+                self.assertEqual(response.status_code, 200)
+                self.assertQueryBudget(response, budget)
+
+    @override_settings(DEBUG=True)
+    def test_server_timing(self):
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get(reverse('ticket-list'))
+
+        self.assertIn('sql;desc="', response['Server-Timing'])
+        self.assertIn('render;dur=', response['Server-Timing'])
+
+    def test_request_metrics(self):
+        registry.reset()
+        self.client.force_authenticate(self.user)
+
+        self.client.get(reverse('ticket-list'))
+        self.client.get(reverse('ticket-list'))
+        response = self.client.get(reverse('request_metrics-list'))
+
+        self.assertEqual(response.status_code, 200)
+
+        body = json.loads(response.content)
+
+        self.assertEqual(len(body['data']), 1)
+        self.assertEqual(body['data'][0]['id'], 'ticket-list')
+        self.assertEqual(body['data'][0]['attributes']['count'], 2)
+        self.assertIn('p95', body['data'][0]['attributes']['queries'])
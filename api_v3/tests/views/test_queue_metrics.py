@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta
+
+from django.db import connection
+
+from api_v3.factories import ProfileFactory
+from api_v3.models.queue_job import QueueJob
+from .support import ApiTestCase, APIClient, reverse
+
+
+class QueueMetricsEndpointTestCase(ApiTestCase):
+
+    FUNCTION = 'api_v3.views.comments.CommentsEndpoint.email_notify'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.users = [
+            ProfileFactory.create(),
+            ProfileFactory.create(is_superuser=True, is_staff=True),
+        ]
+
+        # The jobs table lives in the queue database, not the tests one
+        with connection.schema_editor() as editor:
+            editor.create_model(QueueJob)
+
+        now = datetime.utcnow()
+
+        QueueJob.objects.bulk_create([
+            # Processed, took 1, 2 and 3 seconds to be dequeued
+            self.job(now, seconds=1),
+            self.job(now, seconds=2),
+            self.job(now, seconds=3),
+            # Scheduled, dequeued right on schedule
+            self.job(now, seconds=10, schedule_at=now),
+            # Pending and scheduled
+            self.job(now),
+            self.job(now, schedule_at=now + timedelta(days=1)),
+            # Retried and failed
+            self.job(now, seconds=1, retried=1),
+            self.job(
+                now, seconds=1, q_name='default-failed', error='Exception()')
+        ])
+
+    def job(self, now, seconds=None, q_name='default', retried=0, **kwargs):
+        return QueueJob(
+            q_name=q_name,
+            enqueued_at=now - timedelta(seconds=seconds or 0),
+            dequeued_at=now if seconds is not None else None,
+            data=dict(
+                function=self.FUNCTION, args=[], kwargs={}, retried=retried,
+                **({'error': kwargs.pop('error')} if 'error' in kwargs else {})
+            ),
+            **kwargs
+        )
+
+    def test_list_non_staff(self):
+        self.client.force_authenticate(self.users[0])
+
+        response = self.client.get(reverse('queue_metrics-list'))
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_list_staff(self):
+        self.client.force_authenticate(self.users[1])
+
+        response = self.client.get(reverse('queue_metrics-list'))
+
+        self.assertEqual(response.status_code, 200)
+
+        data = response.json()['data']
+        self.assertEqual(
+            [queue['id'] for queue in data], ['default', 'default-failed'])
+
+        metrics = data[0]['attributes']
+        self.assertEqual(
+            metrics['depth'], {'pending': 1, 'scheduled': 1, 'processed': 5})
+        self.assertEqual(metrics['latency']['p50'], 1)
+        self.assertAlmostEqual(metrics['latency']['max'], 3, places=3)
+        self.assertEqual(len(metrics['functions']), 1)
+        self.assertEqual(metrics['functions'][0]['function'], self.FUNCTION)
+        self.assertEqual(metrics['functions'][0]['processed'], 5)
+        self.assertEqual(metrics['functions'][0]['pending'], 2)
+        self.assertEqual(
+            [job['retried'] for job in metrics['failed']], [1])
+
+        failed = data[1]['attributes']['failed']
+        self.assertEqual(failed[0]['error'], 'Exception()')
+
+    def test_list_staff_hours(self):
+        self.client.force_authenticate(self.users[1])
+
+        QueueJob.objects.update(dequeued_at=datetime.utcnow() - timedelta(
+            hours=QueueJob.objects.count()))
+
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                reverse('queue_metrics-list'), {'hours': 1})
+
+        metrics = response.json()['data'][0]['attributes']
+        self.assertEqual(metrics['depth']['processed'], 0)
+        self.assertEqual(metrics['latency']['p50'], None)
+
+    def test_list_staff_hours_out_of_range(self):
+        self.client.force_authenticate(self.users[1])
+
+        for hours in (10 ** 12, -5):
+            response = self.client.get(
+                reverse('queue_metrics-list'), {'hours': hours})
+
+            self.assertEqual(response.status_code, 200)
+
+        metrics = response.json()['data'][0]['attributes']
+        self.assertEqual(metrics['depth']['processed'], 5)
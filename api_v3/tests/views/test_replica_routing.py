@@ -0,0 +1,116 @@
+import json
+
+import mock
+from django.conf import settings
+from django.core.cache import cache
+
+from api_v3.factories import ProfileFactory, TicketFactory
+from api_v3.misc import router
+from api_v3.models import Ticket
+from api_v3.views.support import EstimatedCountPaginator
+from .support import ApiTestCase, APIClient, reverse
+
+
+class ReplicaRoutingTestCase(ApiTestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = ProfileFactory.create(is_superuser=True, is_staff=True)
+        self.ticket = TicketFactory.create(requester=self.user)
+        self.client.force_authenticate(self.user)
+
+    def get(self, *args, **kwargs):
+        with mock.patch.object(
+                router, 'replica_reads', wraps=router.replica_reads) as reads:
+            response = self.client.get(*args, **kwargs)
+
+        self.assertEqual(response.status_code, 200)
+
+        return reads.call_args[0][0]
+
+    def test_list_on_replica(self):
+        self.assertTrue(self.get(reverse('ticket-list')))
+        self.assertTrue(self.get(reverse('ticket_exports-list')))
+
+    def test_cached_list_on_primary(self):
+        self.assertFalse(self.get(reverse('profile-list')))
+
+    def test_stats_on_replica(self):
+        self.assertTrue(self.get(reverse('ticket_stats-list')))
+        self.assertTrue(self.get(reverse('review_stats-list')))
+
+    def test_stats_cached_from_replica(self):
+        with mock.patch.object(router, 'has_replica', return_value=True), \
+                mock.patch.object(
+                    cache, 'set', wraps=cache.set) as cache_set:
+            response = self.client.get(reverse('ticket_stats-list'))
+
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('ETag', response)
+            self.assertEqual(
+                cache_set.call_args[0][2], settings.REPLICA_PIN_SECONDS)
+
+            # Pinned reads do not use the responses read from the replica
+            self.client.cookies[router.PIN_COOKIE_NAME] = '1'
+            response = self.client.get(reverse('ticket_stats-list'))
+
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('ETag', response)
+            self.assertEqual(cache_set.call_count, 2)
+
+    def test_retrieve_on_primary(self):
+        self.assertFalse(
+            self.get(reverse('ticket-detail', args=[self.ticket.id])))
+
+    def test_pinned_after_write(self):
+        response = self.client.post(
+            reverse('comment-list'),
+            data=json.dumps(dict(data=dict(
+                type='comments',
+                attributes={'body': 'comment'},
+                relationships={'ticket': {'data': {
+                    'type': 'tickets', 'id': self.ticket.id}}}
+            ))),
+            content_type=self.JSON_API_CONTENT_TYPE
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(router.PIN_COOKIE_NAME, response.cookies)
+        self.assertFalse(self.get(reverse('ticket-list')))
+
+    def test_cached_list_after_write_unpinned(self):
+        self.assertFalse(self.get(reverse('profile-list')))
+
+        writer = APIClient()
+        writer.force_authenticate(self.user)
+        response = writer.patch(
+            reverse('profile-detail', args=[self.user.id]),
+            data=json.dumps(dict(data=dict(
+                type='profiles', id=self.user.id,
+                attributes={'bio': 'updated'}
+            ))),
+            content_type=self.JSON_API_CONTENT_TYPE
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(router.PIN_COOKIE_NAME, self.client.cookies)
+
+        with mock.patch.object(
+                router, 'replica_reads', wraps=router.replica_reads) as reads:
+            response = self.client.get(reverse('profile-list'))
+
+        self.assertFalse(reads.call_args[0][0])
+        self.assertEqual(
+            json.loads(response.content)['data'][0]['attributes']['bio'],
+            'updated'
+        )
+
+    def test_count_on_primary(self):
+        # The replica connection does not exist, the count would fail on it
+        with mock.patch.object(
+                router.ReplicaRouter, 'db_for_read',
+                return_value=router.REPLICA_DB_ALIAS):
+            queryset = Ticket.objects.all()
+
+            self.assertEqual(queryset.db, router.REPLICA_DB_ALIAS)
+            self.assertEqual(EstimatedCountPaginator(queryset, 10).count, 1)
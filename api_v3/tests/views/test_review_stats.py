@@ -67,7 +67,7 @@ class ReviewStatsEndpointTestCase(ApiTestCase):
 
         if (
             body['data'][0]['relationships']['ticket']['data']['id'] ==
-            self.reviews[0].ticket.id
+            str(self.reviews[0].ticket.id)
         ):
             ticket_1_data = body['data'][0]
             ticket_2_data = body['data'][1]
@@ -0,0 +1,199 @@
+import json
+
+from activity.models import Action
+
+from api_v3.factories import (
+    ProfileFactory, ResponderFactory, SubscriberFactory, TicketFactory)
+from api_v3.models import Notification, Responder, Ticket
+from api_v3.views.responders import RespondersEndpoint
+from api_v3.views.ticket_bulk_updates import TicketBulkUpdatesEndpoint
+from .support import ApiTestCase, APIClient, reverse, mail, queue
+
+
+class TicketBulkUpdatesEndpointTestCase(ApiTestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.users = [
+            ProfileFactory.create(),
+            ProfileFactory.create(),
+            ProfileFactory.create(is_superuser=True),
+            ProfileFactory.create(),
+        ]
+        self.tickets = [
+            TicketFactory.create(
+                requester=self.users[0], status='new', priority='default',
+                tags=['one']),
+            TicketFactory.create(
+                requester=self.users[0], status='in-progress',
+                priority='default', tags=[]),
+            TicketFactory.create(requester=self.users[1], status='new')
+        ]
+        self.responders = [
+            ResponderFactory.create(ticket=self.tickets[0], user=self.users[1]),
+            ResponderFactory.create(ticket=self.tickets[1], user=self.users[1])
+        ]
+        self.subscriber = SubscriberFactory.create(
+            ticket=self.tickets[1], user=self.users[0])
+
+    def bulk_update(self, **attributes):
+        return self.client.post(
+            reverse('ticket_bulk_updates-list'),
+            data=json.dumps(dict(data=dict(
+                type='ticket-bulk-updates', attributes=attributes))),
+            content_type=self.JSON_API_CONTENT_TYPE
+        )
+
+    def test_create_anonymous(self):
+        response = self.bulk_update(
+            tickets=[self.tickets[0].id], status='closed')
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_create_non_superuser(self):
+        self.client.force_authenticate(self.users[1])
+
+        response = self.bulk_update(
+            tickets=[self.tickets[0].id], status='closed')
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(
+            Ticket.objects.get(id=self.tickets[0].id).status, 'new')
+
+    def test_create_ticket_not_found(self):
+        self.client.force_authenticate(self.users[2])
+
+        response = self.bulk_update(
+            tickets=[self.tickets[0].id, 0], status='closed')
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(
+            json.loads(response.content)['errors'][0]['detail'],
+            'Tickets not found: 0.'
+        )
+
+    def test_create_no_changes(self):
+        self.client.force_authenticate(self.users[2])
+
+        response = self.bulk_update(tickets=[self.tickets[0].id], status='')
+
+        self.assertEqual(response.status_code, 422)
+
+        response = self.bulk_update(
+            tickets=[self.tickets[0].id], **{'add-tags': []})
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(
+            json.loads(response.content)['errors'][0]['detail'],
+            'No changes requested.'
+        )
+
+    def test_create_status_priority_tags(self):
+        self.client.force_authenticate(self.users[2])
+        ticket_ids = [ticket.id for ticket in self.tickets[:2]]
+
+        with self.assertNumQueries(10):
+            response = self.bulk_update(
+                tickets=ticket_ids,
+                status='closed',
+                priority='high',
+                **{'add-tags': ['two', 'one'], 'remove-tags': ['three']}
+            )
+
+        self.assertEqual(response.status_code, 201)
+
+        data = json.loads(response.content)['data']
+        self.assertEqual(data['type'], 'ticket-bulk-updates')
+        self.assertEqual(data['attributes']['updated-tickets'], ticket_ids)
+
+        for ticket in Ticket.objects.filter(id__in=ticket_ids):
+            self.assertEqual(ticket.status, 'closed')
+            self.assertEqual(ticket.priority, 'high')
+
+        self.assertEqual(
+            Ticket.objects.get(id=self.tickets[0].id).tags, ['one', 'two'])
+        self.assertEqual(
+            Ticket.objects.get(id=self.tickets[1].id).tags, ['two', 'one'])
+        self.assertEqual(
+            Ticket.objects.get(id=self.tickets[2].id).status, 'new')
+
+        self.assertEqual(
+            Action.objects.filter(verb='ticket:update:status_closed').count(),
+            2
+        )
+
+        # One email per recipient and ticket, the reviews are scheduled
+        queue.work(burst=True)
+
+        self.assertEqual(Notification.objects.count(), 0)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(
+            sorted(email.to[0] for email in mail.outbox),
+            sorted([
+                self.users[0].email, self.users[1].email, self.users[1].email
+            ])
+        )
+
+        emails = [e for e in mail.outbox if e.to[0] == self.users[1].email]
+        self.assertEqual(
+            sorted(email.subject for email in emails),
+            sorted(
+                TicketBulkUpdatesEndpoint.EMAIL_SUBJECT.format(ticket_id)
+                for ticket_id in ticket_ids
+            )
+        )
+
+        for ticket_id in ticket_ids:
+            email = [e for e in emails if str(ticket_id) in e.subject][0]
+            self.assertIn('/tickets/view/{}'.format(ticket_id), email.body)
+            self.assertIn('Closed', email.body)
+
+    def test_create_responders(self):
+        self.client.force_authenticate(self.users[2])
+        ticket_ids = [ticket.id for ticket in self.tickets]
+
+        response = self.bulk_update(
+            tickets=ticket_ids,
+            **{
+                'add-responders': [self.users[3].id, self.users[0].id],
+                'remove-responders': [self.users[1].id]
+            }
+        )
+
+        self.assertEqual(response.status_code, 201)
+
+        self.assertEqual(
+            sorted(
+                Responder.objects.filter(
+                    ticket_id__in=ticket_ids
+                ).values_list('ticket_id', 'user_id')
+            ),
+            sorted(
+                [(ticket_id, self.users[3].id) for ticket_id in ticket_ids] +
+                # The subscriber can not become a responder
+                [(ticket_ids[0], self.users[0].id)] +
+                [(ticket_ids[2], self.users[0].id)]
+            )
+        )
+        self.assertEqual(
+            Ticket.objects.get(id=self.tickets[2].id).status, 'in-progress')
+        self.assertEqual(
+            Action.objects.filter(verb='responder:create').count(), 5)
+        self.assertEqual(
+            Action.objects.filter(verb='responder:destroy').count(), 2)
+
+        queue.work(burst=True)
+
+        self.assertEqual(
+            sorted(email.to[0] for email in mail.outbox),
+            sorted([self.users[0].email, self.users[3].email] * 3)
+        )
+
+        emails = [e for e in mail.outbox if e.to[0] == self.users[3].email]
+        self.assertEqual(
+            sorted(email.subject for email in emails),
+            sorted(
+                RespondersEndpoint.EMAIL_SUBJECT.format(ticket_id)
+                for ticket_id in ticket_ids
+            )
+        )
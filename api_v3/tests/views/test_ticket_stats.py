@@ -245,3 +245,39 @@ class TicketStatsEndpointTestCase(ApiTestCase):
         self.assertEqual(new_data['attributes']['avg-time'], 504)
         self.assertEqual(new_data['attributes']['past-deadline'], 0)
         self.assertEqual(new_data['attributes']['country'], 'MD')
+
+    def test_list_staff_cached(self):
+        self.users[0].is_staff = True
+        self.users[0].save()
+        self.client.force_authenticate(self.users[0])
+
+        response = self.client.get(reverse('ticket_stats-list'))
+        etag = response['ETag']
+
+        self.assertEqual(response.status_code, 200)
+
+        # Only the models versions are read
+        with self.assertNumQueries(1):
+            cached = self.client.get(reverse('ticket_stats-list'))
+
+        self.assertEqual(cached.status_code, 200)
+        self.assertEqual(cached['ETag'], etag)
+        self.assertEqual(cached.content, response.content)
+
+        response = self.client.get(
+            reverse('ticket_stats-list'), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+        self.tickets[1].status = 'closed'
+        self.tickets[1].save()
+
+        response = self.client.get(
+            reverse('ticket_stats-list'), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        body = json.loads(response.content)
+
+        self.assertEqual(len(body['data']), 3)
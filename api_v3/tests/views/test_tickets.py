@@ -1,8 +1,15 @@
 # -*- coding: utf-8 -*-
 import json
 import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import mock
 
 from django.conf import settings
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.template.loader import render_to_string
 
 from api_v3.models import Ticket, Action
@@ -13,6 +20,7 @@ from api_v3.factories import (
 )
 from .support import ApiTestCase, APIClient, reverse, mail, queue
 from api_v3.serializers import TicketSerializer
+from api_v3.views import support
 from api_v3.views.tickets import TicketsEndpoint
 
 
@@ -83,6 +91,175 @@ class TicketsEndpointTestCase(ApiTestCase):
 
         self.assertContains(response, self.tickets[0].background)
 
+    def set_tags_and_countries(self):
+        values = [
+            (['fraud', 'banks'], ['MD', 'RO']),
+            (['fraud'], ['RO']),
+            (['cars'], ['UA']),
+        ]
+
+        for ticket, (tags, countries) in zip(self.tickets, values):
+            Ticket.objects.filter(id=ticket.id).update(
+                tags=tags, countries=countries, kind='other', status='new')
+
+    def test_list_filter_tags_and_countries(self):
+        self.set_tags_and_countries()
+        self.users[0].is_superuser = True
+        self.client.force_authenticate(self.users[0])
+
+        cases = (
+            ({'filter[tags]': 'fraud'}, [0, 1]),
+            ({'filter[tags__contains]': 'fraud,banks'}, [0]),
+            ({'filter[tags__overlap]': 'banks,cars'}, [0, 2]),
+            ({'filter[countries]': 'RO'}, [0, 1]),
+            ({'filter[countries__overlap]': 'MD,UA'}, [0, 2]),
+            ({'filter[tags]': 'fraud', 'filter[countries]': 'MD'}, [0]),
+        )
+
+        for params, indexes in cases:
+            response = self.client.get(reverse('ticket-list'), params)
+
+            self.assertEqual(response.status_code, 200)
+
+            body = json.loads(response.content)
+
+            self.assertEqual(
+                sorted(int(ticket['id']) for ticket in body['data']),
+                sorted(self.tickets[i].id for i in indexes),
+                params
+            )
+
+    def test_list_facets(self):
+        self.set_tags_and_countries()
+        self.users[0].is_superuser = True
+        self.client.force_authenticate(self.users[0])
+
+        response = self.client.get(
+            reverse('ticket-list'),
+            {'facets': '1', 'filter[tags__overlap]': 'fraud'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+
+        facets = json.loads(response.content)['meta']['facets']
+
+        self.assertEqual(facets['tags'], {'fraud': 2, 'banks': 1})
+        self.assertEqual(list(facets['tags']), ['fraud', 'banks'])
+        self.assertEqual(facets['countries'], {'RO': 2, 'MD': 1})
+        self.assertEqual(facets['kind'], {'other': 2})
+        self.assertEqual(facets['status'], {'new': 2})
+
+    def test_list_facets_search(self):
+        self.set_tags_and_countries()
+        self.client.force_authenticate(self.users[0])
+
+        response = self.client.get(
+            reverse('ticket-list'),
+            {'facets': '1', 'filter[search]': self.tickets[0].first_name}
+        )
+
+        self.assertEqual(response.status_code, 200)
+
+        facets = json.loads(response.content)['meta']['facets']
+
+        self.assertEqual(facets['tags'], {'fraud': 1, 'banks': 1})
+
+    def test_list_facets_one_query(self):
+        self.client.force_authenticate(self.users[0])
+
+        with self.assertNumQueries(1):
+            Ticket.facets(Ticket.filter_by_user(self.users[0]))
+
+        response = self.client.get(reverse('ticket-list'))
+
+        self.assertNotIn('facets', json.loads(response.content)['meta'])
+
+    def test_list_count(self):
+        self.client.force_authenticate(self.users[0])
+
+        response = self.client.get(reverse('ticket-list'))
+        body = json.loads(response.content)
+
+        self.assertFalse(body['meta']['count-estimated'])
+
+        # Cached until the tickets change, only the versions are read
+        with self.assertNumQueries(1):
+            support.EstimatedCountPaginator(
+                response.renderer_context['view'].get_filtered_queryset(),
+                30, models=TicketsEndpoint.cache_models
+            ).count
+
+        TicketFactory.create(requester=self.users[0])
+
+        response = self.client.get(
+            reverse('ticket-list'), {'page[size]': 1})
+        body = json.loads(response.content)
+
+        self.assertIn('page[number]=3', body['links']['last'])
+
+    @override_settings(PAGINATION_ESTIMATE_THRESHOLD=1)
+    def test_list_count_estimated(self):
+        self.client.force_authenticate(self.users[0])
+
+        response = self.client.get(reverse('ticket-list'))
+        body = json.loads(response.content)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(body['meta']['count-estimated'])
+        self.assertEqual(len(body['data']), 2)
+
+    def test_list_lean(self):
+        self.client.force_authenticate(self.users[0])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('ticket-list'))
+
+        attributes = json.loads(response.content)['data'][0]['attributes']
+
+        self.assertIn('background', attributes)
+        self.assertIn('first-name', attributes)
+        self.assertNotIn('sources', attributes)
+        self.assertNotIn('initial-information', attributes)
+
+        selects = [
+            q['sql'] for q in queries.captured_queries
+            if q['sql'].startswith('SELECT DISTINCT "api_v3_ticket"."id"')
+        ]
+
+        self.assertTrue(selects)
+        self.assertNotIn('"api_v3_ticket"."sources"', selects[0])
+
+        response = self.client.get(
+            reverse('ticket-detail', args=[self.tickets[0].id]))
+        attributes = json.loads(response.content)['data']['attributes']
+
+        self.assertIn('sources', attributes)
+
+    def test_list_sparse_fieldsets(self):
+        self.client.force_authenticate(self.users[0])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse('ticket-list'),
+                {'fields[tickets]': 'status,first-name,requester'}
+            )
+
+        self.assertEqual(response.status_code, 200)
+
+        data = json.loads(response.content)['data'][0]
+
+        self.assertEqual(
+            sorted(data['attributes']), ['first-name', 'status'])
+        self.assertEqual(list(data['relationships']), ['requester'])
+
+        selects = [
+            q['sql'] for q in queries.captured_queries
+            if q['sql'].startswith('SELECT DISTINCT "api_v3_ticket"."id"')
+        ]
+
+        self.assertTrue(selects)
+        self.assertNotIn('"api_v3_ticket"."background"', selects[0])
+
     def test_list_authenticated_with_includes(self):
         self.client.force_authenticate(self.users[0])
 
@@ -132,6 +309,39 @@ class TicketsEndpointTestCase(ApiTestCase):
         body = json.loads(response.content)
         self.assertEqual(body['meta']['filters'], {})
 
+    def test_list_filter_params_parsed_once(self):
+        user = self.users[1]
+        user.is_superuser = True
+        self.client.force_authenticate(user)
+
+        with mock.patch.object(
+            support.qs_parser, 'parse', wraps=support.qs_parser.parse
+        ) as parse, mock.patch.object(
+            TicketsEndpoint, 'filter_queryset', autospec=True,
+            side_effect=TicketsEndpoint.filter_queryset
+        ) as filter_queryset:
+            response = self.client.get(
+                reverse('ticket-list'), {
+                    'filter[requester]': self.users[0].id,
+                    'filter[search]': self.tickets[0].first_name,
+                    'filter[created_at][gte]': '2020-01-01'
+                }
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(parse.call_count, 1)
+        self.assertEqual(filter_queryset.call_count, 1)
+
+        # The nested params are copied too
+        view = response.renderer_context['view']
+        request = response.renderer_context['request']
+        view.extract_filter_params(request)['created_at']['gte'] = None
+
+        self.assertEqual(
+            view.extract_filter_params(request)['created_at'],
+            {'gte': '2020-01-01'}
+        )
+
     def test_list_search(self):
         self.client.force_authenticate(self.users[0])
         ticket = self.tickets[0]
@@ -150,6 +360,78 @@ class TicketsEndpointTestCase(ApiTestCase):
         self.assertEqual(body['data'][0]['id'], str(ticket.id))
         self.assertEqual(body['meta']['total']['all'], 1)
 
+    def test_list_fuzzy_search(self):
+        self.client.force_authenticate(self.users[0])
+        ticket = self.tickets[0]
+        ticket.company_name = 'Investigative Dashboard'
+        ticket.save()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse('ticket-list'), {
+                    'filter[search]': 'investig dash',
+                    'filter[search_mode]': 'fuzzy'
+                }
+            )
+
+        self.assertEqual(response.status_code, 200)
+
+        # The snippets are computed only for the listed tickets
+        self.assertEqual(
+            len([
+                query for query in queries.captured_queries
+                if 'ts_headline' in query['sql']
+            ]),
+            1
+        )
+
+        body = json.loads(response.content)
+        self.assertEqual(len(body['data']), 1)
+        self.assertEqual(body['data'][0]['id'], str(ticket.id))
+        self.assertIn(
+            '<mark>Investigative</mark> <mark>Dashboard</mark>',
+            body['meta']['highlights'][str(ticket.id)]
+        )
+
+    def test_list_order_by_activity(self):
+        self.users[0].is_staff = True
+        self.users[0].save()
+        self.client.force_authenticate(self.users[0])
+
+        now = datetime.utcnow()
+        Ticket.add_activity(
+            self.tickets[1].id, now, comments=2,
+            expense=('EUR', Decimal('1.5')))
+        Ticket.add_activity(
+            self.tickets[0].id, now - timedelta(days=1), attachments=1)
+
+        response = self.client.get(reverse('ticket-list'), {
+            'sort': '-last_activity_at',
+            'filter[last_activity_at__isnull]': 'false'
+        })
+
+        body = json.loads(response.content)
+        attributes = body['data'][0]['attributes']
+
+        self.assertEqual(
+            [ticket['id'] for ticket in body['data']],
+            [str(self.tickets[1].id), str(self.tickets[0].id)]
+        )
+        self.assertEqual(attributes['comments-count'], 2)
+        self.assertEqual(attributes['attachments-count'], 0)
+        self.assertEqual(attributes['expenses-total'], {'EUR': '1.5000'})
+
+    def test_list_expenses_total_staff_only(self):
+        self.client.force_authenticate(self.users[0])
+
+        response = self.client.get(reverse('ticket-list'))
+
+        body = json.loads(response.content)
+        attributes = body['data'][0]['attributes']
+
+        self.assertIn('comments-count', attributes)
+        self.assertNotIn('expenses-total', attributes)
+
     def test_get_authenticated(self):
         self.client.force_authenticate(self.users[0])
 
@@ -159,6 +441,59 @@ class TicketsEndpointTestCase(ApiTestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, self.tickets[0].background)
 
+    def test_get_authenticated_not_modified(self):
+        self.client.force_authenticate(self.users[0])
+
+        response = self.client.get(
+            reverse('ticket-detail', args=[self.tickets[0].id]))
+        etag = response['ETag']
+
+        self.assertEqual(response.status_code, 200)
+        # The meta totals do not depend on the ticket timestamp
+        self.assertNotIn('Last-Modified', response)
+
+        response = self.client.get(
+            reverse('ticket-detail', args=[self.tickets[0].id]),
+            HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(
+            reverse('ticket-detail', args=[self.tickets[1].id]),
+            HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, 200)
+
+        self.tickets[0].background = 'new-background'
+        self.tickets[0].save()
+
+        response = self.client.get(
+            reverse('ticket-detail', args=[self.tickets[0].id]),
+            HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'new-background')
+
+    def test_get_authenticated_totals_modified(self):
+        self.client.force_authenticate(self.users[0])
+
+        response = self.client.get(
+            reverse('ticket-detail', args=[self.tickets[0].id]))
+        total = response.json()['meta']['total']['all']
+
+        TicketFactory.create(requester=self.users[0])
+
+        response = self.client.get(
+            reverse('ticket-detail', args=[self.tickets[0].id]),
+            HTTP_IF_NONE_MATCH=response['ETag']
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['meta']['total']['all'], total + 1)
+
     def test_update_authenticated(self):
         ticket = self.tickets[0]
         self.client.force_authenticate(self.users[3])
@@ -257,6 +592,8 @@ class TicketsEndpointTestCase(ApiTestCase):
         self.assertEqual(comment.body, 'The reason... .')
         self.assertEqual(action.verb, 'ticket:update:reopen')
         self.assertEqual(action.action, comment)
+        self.assertEqual(ticket.comments_count, 1)
+        self.assertEqual(ticket.last_activity_at, comment.created_at)
 
     def test_update_authenticated_any_status_with_deadline_passed(self):
         ticket = self.tickets[0]
@@ -356,6 +693,8 @@ class TicketsEndpointTestCase(ApiTestCase):
         self.assertEqual(comment.body, the_reason)
         self.assertEqual(action.verb, 'ticket:update:pending')
         self.assertEqual(action.action, comment)
+        self.assertEqual(ticket.comments_count, 1)
+        self.assertEqual(ticket.last_activity_at, comment.created_at)
 
     def test_create_authenticated(self):
         ticket = self.tickets[0]
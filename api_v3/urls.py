@@ -12,6 +12,9 @@ from .views.download import DownloadEndpoint
 from .views.expenses import ExpensesEndpoint
 from .views.expense_exports import ExpenseExportsEndpoint
 from .views.profiles import ProfilesEndpoint
+from .views.pool_metrics import PoolMetricsEndpoint
+from .views.queue_metrics import QueueMetricsEndpoint
+from .views.request_metrics import RequestMetricsEndpoint
 from .views.responders import RespondersEndpoint
 from .views.reviews import ReviewsEndpoint
 from .views.review_stats import ReviewStatsEndpoint
@@ -19,6 +22,7 @@ from .views.review_exports import ReviewExportsEndpoint
 from .views.session import SessionEndpoint
 from .views.subscribers import SubscribersEndpoint
 from .views.tickets import TicketsEndpoint
+from .views.ticket_bulk_updates import TicketBulkUpdatesEndpoint
 from .views.ticket_stats import TicketStatsEndpoint
 from .views.ticket_exports import TicketExportsEndpoint
 
@@ -30,6 +34,21 @@ router.register(r'comments', CommentsEndpoint)
 router.register(r'download', DownloadEndpoint, basename='download')
 router.register(r'me', SessionEndpoint, basename='me')
 router.register(r'profiles', ProfilesEndpoint)
+router.register(
+    r'pool-metrics',
+    PoolMetricsEndpoint,
+    basename='pool_metrics'
+)
+router.register(
+    r'queue-metrics',
+    QueueMetricsEndpoint,
+    basename='queue_metrics'
+)
+router.register(
+    r'request-metrics',
+    RequestMetricsEndpoint,
+    basename='request_metrics'
+)
 router.register(r'responders', RespondersEndpoint)
 router.register(r'reviews', ReviewsEndpoint)
 router.register(r'review-stats', ReviewStatsEndpoint, basename='review_stats')
@@ -45,6 +64,10 @@ router.register(
     ExpenseExportsEndpoint,
     basename='expense_exports')
 router.register(r'tickets', TicketsEndpoint)
+router.register(
+    r'ticket-bulk-updates',
+    TicketBulkUpdatesEndpoint,
+    basename='ticket_bulk_updates')
 router.register(r'ticket-stats', TicketStatsEndpoint, basename='ticket_stats')
 router.register(
     r'ticket-exports',
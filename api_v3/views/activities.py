@@ -10,6 +10,7 @@ class ActivitiesEndpoint(JSONApiEndpoint, viewsets.ReadOnlyModelViewSet):
     serializer_class = ActionSerializer
     ordering_fields = ('timestamp',)
     ordering = ('-timestamp',)
+    last_modified_field = 'timestamp'
     filter_fields = {
         'id': ['exact', 'lt', 'gt'],
         'timestamp': ['range'],
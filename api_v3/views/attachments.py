@@ -1,3 +1,4 @@
+from django.db import transaction
 from rest_framework import viewsets, mixins, serializers, exceptions
 
 from api_v3.models import Action, Ticket, Attachment
@@ -44,14 +45,19 @@ class AttachmentsEndpoint(
                 [{'attributes/ticket': {'detail': 'Ticket not found.'}}]
             )
         else:
-            attachment = serializer.save(user=self.request.user)
+            with transaction.atomic():
+                attachment = serializer.save(user=self.request.user)
 
-            Action.objects.create(
-                action=attachment,
-                actor=self.request.user,
-                target=attachment.ticket,
-                verb=self.action_name()
-            )
+                Action.objects.create(
+                    action=attachment,
+                    actor=self.request.user,
+                    target=attachment.ticket,
+                    verb=self.action_name()
+                )
+
+                Ticket.add_activity(
+                    attachment.ticket_id, attachment.created_at,
+                    attachments=1)
 
             return attachment
 
@@ -61,10 +67,13 @@ class AttachmentsEndpoint(
                 self.request.user != instance.user):
             raise exceptions.NotFound()
 
-        activity = Action.objects.create(
-            actor=self.request.user, target=instance.ticket,
-            action=instance.user, verb=self.action_name())
+        with transaction.atomic():
+            activity = Action.objects.create(
+                actor=self.request.user, target=instance.ticket,
+                action=instance.user, verb=self.action_name())
+
+            instance.delete()
 
-        instance.delete()
+            Ticket.repair_counters([instance.ticket_id])
 
         return activity
@@ -1,10 +1,7 @@
-from django.conf import settings
-from django.core.mail import send_mass_mail
-from django.template.loader import render_to_string
+from django.db import transaction
 from rest_framework import mixins, serializers, viewsets
 
-from api_v3.models import Action, Comment, Ticket
-from api_v3.misc.queue import queue
+from api_v3.models import Action, Comment, Notification, Ticket
 from api_v3.serializers import CommentSerializer
 from .support import JSONApiEndpoint
 
@@ -16,6 +13,7 @@ class CommentsEndpoint(
 
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
+    last_modified_field = 'created_at'
     EMAIL_SUBJECT = 'A new comment for ticket ID: {}'
 
     def get_queryset(self):
@@ -31,6 +29,16 @@ class CommentsEndpoint(
 
         return Comment.filter_by_user(self.request.user, queryset)
 
+    def filter_queryset(self, queryset):
+        """Adds the full text search, served by the comments index."""
+        filters = self.extract_filter_params(self.request)
+        filtered = super(CommentsEndpoint, self).filter_queryset(queryset)
+
+        if filters.get('search'):
+            filtered = Comment.search_for(filters.get('search'), filtered)
+
+        return filtered
+
     def perform_create(self, serializer):
         """Make sure every new comment is linked to current user."""
         ticket = Ticket.filter_by_user(self.request.user).filter(
@@ -42,25 +50,28 @@ class CommentsEndpoint(
                 [{'attributes/ticket': {'detail': 'Ticket not found.'}}]
             )
         else:
-            comment = serializer.save(user=self.request.user)
+            with transaction.atomic():
+                comment = serializer.save(user=self.request.user)
 
-            Action.objects.create(
-                action=comment,
-                target=comment.ticket,
-                actor=self.request.user,
-                verb=self.action_name()
-            )
+                Action.objects.create(
+                    action=comment,
+                    target=comment.ticket,
+                    actor=self.request.user,
+                    verb=self.action_name()
+                )
+
+                Ticket.add_activity(
+                    comment.ticket_id, comment.created_at, comments=1)
 
             self.email_notify(comment.id, self.request.get_host())
 
             return comment
 
     @staticmethod
-    @queue.task()
-    def email_notify(_job_id, comment_id, request_host):
-        """Sends an email to ticket users about the new comment."""
-        emails = []
-        comment = Comment.objects.get(id=comment_id)
+    def email_notify(comment_id, request_host):
+        """Notifies the ticket users about the new comment."""
+        comment = Comment.objects.select_related(
+            'ticket__requester', 'user').get(id=comment_id)
         subject = CommentsEndpoint.EMAIL_SUBJECT.format(comment.ticket.id)
         to_notify = [comment.ticket.requester.__dict__]
         to_notify += (
@@ -74,26 +85,20 @@ class CommentsEndpoint(
             .values('email', 'first_name', 'last_name')
         )
 
-        for entry in to_notify:
-
-            if entry['email'] == comment.user.email:
-                continue
-
-            emails.append([
-                subject,
-                render_to_string(
-                    'mail/ticket_comment.txt', {
-                        'comment': comment,
-                        'name': '{} {}'.format(
-                            (entry.get('first_name', '')),
-                            (entry.get('last_name', ''))
-                        ),
-                        'request_host': request_host,
-                        'site_name': settings.SITE_NAME
-                    }
-                ),
-                settings.DEFAULT_FROM_EMAIL,
-                [entry['email']]
-            ])
-
-        return send_mass_mail(emails), emails
+        Notification.notify(
+            [
+                (
+                    entry['email'],
+                    '{} {}'.format(
+                        (entry.get('first_name', '')),
+                        (entry.get('last_name', ''))
+                    )
+                ) for entry in to_notify
+                if entry['email'] != comment.user.email
+            ],
+            comment.ticket,
+            'mail/ticket_comment.txt',
+            subject,
+            request_host,
+            comment=comment
+        )
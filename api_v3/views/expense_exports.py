@@ -15,7 +15,9 @@ class ExpenseExportsEndpoint(ExpensesEndpoint):
     permission_classes = (permissions.IsAdminUser, )
 
     def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
+        queryset = self.get_filtered_queryset()
+        # Streamed after the view returns, bind the read database now
+        queryset = queryset.using(queryset.db)
 
         ticket_url = \
             TicketExportsEndpoint.TICKET_URI.format(self.request.get_host())
@@ -45,7 +47,8 @@ class ExpenseExportsEndpoint(ExpensesEndpoint):
         writer = DictWriter(DummyBuffer(), fieldnames=cols.keys())
         header_with_rows = chain(
             [dict(zip(cols.keys(), cols.keys()))],
-            queryset.values(**cols)
+            queryset.values(**cols).iterator(
+                chunk_size=TicketExportsEndpoint.CHUNK_SIZE)
         )
 
         response = StreamingHttpResponse(
@@ -1,6 +1,7 @@
+from django.db import transaction
 from rest_framework import exceptions, mixins, serializers, viewsets
 
-from api_v3.models import Action, Expense
+from api_v3.models import Action, Expense, Ticket
 from api_v3.serializers import ExpenseSerializer
 from .support import JSONApiEndpoint
 
@@ -38,14 +39,19 @@ class ExpensesEndpoint(
                 [{'attributes/ticket': {'detail': 'Ticket not found.'}}]
             )
 
-        expense = serializer.save(user=self.request.user)
+        with transaction.atomic():
+            expense = serializer.save(user=self.request.user)
 
-        Action.objects.create(
-            action=expense,
-            target=expense.ticket,
-            actor=self.request.user,
-            verb=self.action_name()
-        )
+            Action.objects.create(
+                action=expense,
+                target=expense.ticket,
+                actor=self.request.user,
+                verb=self.action_name()
+            )
+
+            Ticket.add_activity(
+                expense.ticket_id, expense.created_at,
+                expense=self.get_amount(expense))
 
         return expense
 
@@ -54,15 +60,36 @@ class ExpensesEndpoint(
         if not (self.request.user.is_staff or self.request.user.is_superuser):
             raise exceptions.NotFound()
 
-        return serializer.save()
+        ticket_id = serializer.instance.ticket_id
+
+        with transaction.atomic():
+            expense = serializer.save()
+
+            # The amount or the ticket might change
+            Ticket.repair_counters(set([ticket_id, expense.ticket_id]))
+
+        return expense
 
     def perform_destroy(self, instance):
         """Make sure only super user or author can remove the expense."""
         if not (self.request.user.is_staff or self.request.user.is_superuser):
             raise exceptions.NotFound()
 
-        Action.objects.create(
-            actor=self.request.user, target=instance.ticket,
-            action=instance.user, verb=self.action_name())
+        with transaction.atomic():
+            Action.objects.create(
+                actor=self.request.user, target=instance.ticket,
+                action=instance.user, verb=self.action_name())
+
+            deleted = instance.delete()
+
+            Ticket.repair_counters([instance.ticket_id])
+
+        return deleted
+
+    @staticmethod
+    def get_amount(expense):
+        """Returns the expense currency and amount, for the ticket totals."""
+        if expense.amount is None:
+            return None
 
-        return instance.delete()
+        return expense.amount.currency.code, expense.amount.amount
@@ -0,0 +1,32 @@
+from rest_framework import viewsets, response, permissions
+
+from api_v3.misc.pool import pools
+from api_v3.models import Profile
+from api_v3.serializers import PoolMetricSerializer
+from .support import JSONApiEndpoint
+
+
+class PoolMetricsEndpoint(JSONApiEndpoint, viewsets.GenericViewSet):
+    """Database connections pools stats, for the current process.
+
+    The wait time is the total, in milliseconds.
+    """
+
+    class PoolMetric(dict):
+        __getattr__ = dict.__getitem__
+        __setattr__ = dict.__setitem__
+
+    permission_classes = (permissions.IsAdminUser, )
+    serializer_class = PoolMetricSerializer
+
+    def get_queryset(self):
+        return Profile.objects.none()
+
+    def list(self, request, *args, **kwargs):
+        metrics = [
+            self.PoolMetric(metric, pk=metric['database'])
+            for metric in pools.snapshot()
+        ]
+        serializer = self.serializer_class(metrics, many=True)
+
+        return response.Response(serializer.data)
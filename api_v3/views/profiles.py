@@ -1,12 +1,13 @@
 from django.db.models import Q, Func, Value, F
 from rest_framework import exceptions, mixins, viewsets
 
-from api_v3.models import Profile
+from api_v3.models import Profile, Responder, Subscriber, Ticket
 from api_v3.serializers import ProfileSerializer
-from .support import JSONApiEndpoint
+from .support import CachedListMixin, JSONApiEndpoint
 
 
 class ProfilesEndpoint(
+        CachedListMixin,
         JSONApiEndpoint,
         mixins.UpdateModelMixin,
         viewsets.ReadOnlyModelViewSet):
@@ -15,6 +16,14 @@ class ProfilesEndpoint(
 
     serializer_class = ProfileSerializer
     filter_fields = ('is_superuser', 'is_staff')
+    cache_models = (Profile, Ticket, Responder, Subscriber)
+
+    def get_cache_scope(self):
+        """Regular users get only their own profile."""
+        if self.request.user.is_superuser:
+            return None
+
+        return self.request.user.pk
 
     def perform_update(self, serializer):
         """Allow users to update only own profile.
@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+
+from rest_framework import viewsets, response, permissions
+
+from api_v3.models import Profile
+from api_v3.models.queue_job import QueueJob
+from api_v3.serializers import QueueMetricSerializer
+from .support import JSONApiEndpoint
+
+
+class QueueMetricsEndpoint(JSONApiEndpoint, viewsets.GenericViewSet):
+    """Per queue depth, latency percentiles, throughput and failed jobs.
+
+    Use the `hours` param to change the processed jobs period, up to a year.
+    """
+
+    class QueueMetric(dict):
+        __getattr__ = dict.__getitem__
+        __setattr__ = dict.__setitem__
+
+    DEFAULT_HOURS = 24
+    MAX_HOURS = 24 * 366
+
+    permission_classes = (permissions.IsAdminUser, )
+    serializer_class = QueueMetricSerializer
+
+    def get_queryset(self):
+        return Profile.objects.none()
+
+    def list(self, request, *args, **kwargs):
+        try:
+            hours = int(request.GET.get('hours') or self.DEFAULT_HOURS)
+        except ValueError:
+            hours = self.DEFAULT_HOURS
+
+        hours = min(max(hours, 1), self.MAX_HOURS)
+        since = datetime.utcnow() - timedelta(hours=hours)
+        metrics = [
+            self.QueueMetric(metric, pk=metric['id'])
+            for metric in QueueJob.metrics(since)
+        ]
+        serializer = self.serializer_class(metrics, many=True)
+
+        return response.Response(serializer.data)
@@ -0,0 +1,32 @@
+from rest_framework import viewsets, response, permissions
+
+from api_v3.misc.instrumentation import registry
+from api_v3.models import Profile
+from api_v3.serializers import RequestMetricSerializer
+from .support import JSONApiEndpoint
+
+
+class RequestMetricsEndpoint(JSONApiEndpoint, viewsets.GenericViewSet):
+    """Per route SQL queries and timings, for the current process.
+
+    Durations are in milliseconds.
+    """
+
+    class RequestMetric(dict):
+        __getattr__ = dict.__getitem__
+        __setattr__ = dict.__setitem__
+
+    permission_classes = (permissions.IsAdminUser, )
+    serializer_class = RequestMetricSerializer
+
+    def get_queryset(self):
+        return Profile.objects.none()
+
+    def list(self, request, *args, **kwargs):
+        metrics = [
+            self.RequestMetric(metric, pk=metric['route'])
+            for metric in registry.snapshot()
+        ]
+        serializer = self.serializer_class(metrics, many=True)
+
+        return response.Response(serializer.data)
@@ -1,10 +1,6 @@
-from django.core.mail import send_mass_mail
-from django.conf import settings
-from django.template.loader import render_to_string
 from rest_framework import exceptions, mixins, serializers, viewsets
 
-from api_v3.models import Action, Responder, Ticket
-from api_v3.misc.queue import queue
+from api_v3.models import Action, Notification, Responder, Ticket
 from api_v3.serializers import ResponderSerializer
 from .support import JSONApiEndpoint
 
@@ -72,25 +68,15 @@ class RespondersEndpoint(
         return activity
 
     @staticmethod
-    @queue.task()
-    def email_notify(_job_id, action_id, request_host):
-        """Sends an email to the responder about the new ticket."""
+    def email_notify(action_id, request_host):
+        """Notifies the responder about the new ticket."""
         activity = Action.objects.get(id=action_id)
         subject = RespondersEndpoint.EMAIL_SUBJECT.format(activity.target.id)
-        emails = [
-            [
-                subject,
-                render_to_string(
-                    'mail/responder_created.txt', {
-                        'ticket': activity.target,
-                        'name': activity.action.display_name,
-                        'request_host': request_host,
-                        'site_name': settings.SITE_NAME
-                    }
-                ),
-                settings.DEFAULT_FROM_EMAIL,
-                [activity.action.email]
-            ]
-        ]
-
-        return send_mass_mail(emails)
+
+        Notification.notify(
+            [(activity.action.email, activity.action.display_name)],
+            activity.target,
+            'mail/responder_created.txt',
+            subject,
+            request_host
+        )
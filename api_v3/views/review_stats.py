@@ -3,12 +3,15 @@ from datetime import datetime, timedelta
 from django.db.models import Count, F, Sum
 from rest_framework import viewsets, response, permissions
 
-from api_v3.models import Profile, Review, Ticket
+from api_v3.models import Profile, Responder, Review, Ticket
 from api_v3.serializers import ReviewStatSerializer
-from .support import JSONApiEndpoint
+from .support import CachedListMixin, JSONApiEndpoint
 
 
-class ReviewStatsEndpoint(JSONApiEndpoint, viewsets.ReadOnlyModelViewSet):
+class ReviewStatsEndpoint(
+        CachedListMixin,
+        JSONApiEndpoint,
+        viewsets.ReadOnlyModelViewSet):
 
     class Pagination(JSONApiEndpoint.pagination_class):
         page_size = None
@@ -21,6 +24,8 @@ class ReviewStatsEndpoint(JSONApiEndpoint, viewsets.ReadOnlyModelViewSet):
     queryset = Review.objects.all()
     serializer_class = ReviewStatSerializer
     pagination_class = Pagination
+    cache_models = (Review, Ticket, Responder, Profile)
+    replica_actions = ('list', )
     filter_fields = {
         'created_at': ['gte', 'lte'],
         'ticket': ['exact', 'isnull'],
@@ -41,7 +46,7 @@ class ReviewStatsEndpoint(JSONApiEndpoint, viewsets.ReadOnlyModelViewSet):
         return params
 
     def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
+        queryset = self.get_filtered_queryset()
         group_by = None
 
         annotations = dict(
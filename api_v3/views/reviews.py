@@ -48,7 +48,7 @@ class ReviewsEndpoint(
             return review
 
     @staticmethod
-    @queue.task(schedule_at='60d')
+    @queue.task(schedule_at='60d', key='review:{0}')
     def email_notify(_job_id, ticket_id, request_host):
         """Sends an email to ticket users to leave a review."""
         if settings.REVIEWS_DISABLED:
@@ -67,18 +67,21 @@ class ReviewsEndpoint(
             .values('email')
         )[:]
 
+        # Same email for everyone, render it only once
+        body = render_to_string(
+            'mail/review_request.txt', {
+                'ticket': ticket,
+                'token': Review.ticket_to_token(ticket),
+                'days_to_respond': Review.MAX_DAYS_TO_RESPOND,
+                'request_host': request_host,
+                'site_name': settings.SITE_NAME
+            }
+        )
+
         for entry in to_notify:
             emails.append([
                 ReviewsEndpoint.EMAIL_SUBJECT,
-                render_to_string(
-                    'mail/review_request.txt', {
-                        'ticket': ticket,
-                        'token': Review.ticket_to_token(ticket),
-                        'days_to_respond': Review.MAX_DAYS_TO_RESPOND,
-                        'request_host': request_host,
-                        'site_name': settings.SITE_NAME
-                    }
-                ),
+                body,
                 settings.DEFAULT_FROM_EMAIL,
                 [entry['email']]
             ])
@@ -1,10 +1,6 @@
-from django.core.mail import send_mass_mail
-from django.conf import settings
-from django.template.loader import render_to_string
 from rest_framework import exceptions, mixins, serializers, viewsets
 
-from api_v3.models import Action, Subscriber, Profile
-from api_v3.misc.queue import queue
+from api_v3.models import Action, Notification, Subscriber, Profile
 from api_v3.serializers import SubscriberSerializer
 from .support import JSONApiEndpoint
 
@@ -93,29 +89,22 @@ class SubscribersEndpoint(
         return activity
 
     @staticmethod
-    @queue.task()
-    def email_notify(_job_id, activity_id, subscriber_id, request_host):
-        """Sends an email to the subscriber about the new ticket."""
+    def email_notify(activity_id, subscriber_id, request_host):
+        """Notifies the subscriber about the new ticket."""
         activity = Action.objects.get(id=activity_id)
-        subscriber = Subscriber.objects.get(id=subscriber_id)
+        subscriber = Subscriber.objects.select_related('user').get(
+            id=subscriber_id)
         subject = SubscribersEndpoint.EMAIL_SUBJECT.format(activity.target.id)
 
-        emails = [
+        Notification.notify(
             [
-                subject,
-                render_to_string(
-                    'mail/subscriber_added.txt', {
-                        'ticket': activity.target,
-                        'request_host': request_host,
-                        'site_name': settings.SITE_NAME,
-                        'name': (
-                            subscriber.email or subscriber.user.display_name
-                        )
-                    }
-                ),
-                settings.DEFAULT_FROM_EMAIL,
-                [subscriber.email or subscriber.user.email]
-            ]
-        ]
-
-        return send_mass_mail(emails), emails
+                (
+                    subscriber.email or subscriber.user.email,
+                    subscriber.email or subscriber.user.display_name
+                )
+            ],
+            activity.target,
+            'mail/subscriber_added.txt',
+            subject,
+            request_host
+        )
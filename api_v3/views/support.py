@@ -1,12 +1,17 @@
+import calendar
+import copy
+import hashlib
+import json
+
 import rest_framework.exceptions
 import rest_framework.parsers
 import rest_framework.renderers
 import rest_framework.response
 import rest_framework.authentication
 import rest_framework.filters
+import rest_framework.mixins
 import rest_framework_json_api.metadata
 import rest_framework_json_api.parsers
-import rest_framework_json_api.renderers
 import rest_framework_json_api.utils
 import rest_framework_json_api.exceptions
 import django_filters.rest_framework
@@ -15,8 +20,20 @@ from rest_framework.status import HTTP_422_UNPROCESSABLE_ENTITY
 from querystring_parser import parser as qs_parser
 from urllib.parse import unquote as url_unquote
 from django.utils.encoding import force_str
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 
 from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.paginator import Paginator
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils.functional import cached_property
+
+from api_v3.misc import renderers, router
+from api_v3.misc.cache import get_versions
 
 
 class DjangoFilterBackend(django_filters.rest_framework.DjangoFilterBackend):
@@ -55,6 +72,100 @@ class Pagination(JsonApiPageNumberPagination):
         return response
 
 
+class EstimatedCountPaginator(Paginator):
+    """Paginator which trusts the planner estimate for the large lists.
+
+    The exact count stops at the threshold, larger lists get the planner
+    estimate. The counts are cached per query and models versions, for a
+    short while. These are counted on the primary database, a lagging replica
+    would cache a stale count under the new models versions.
+    """
+    CACHE_KEY = 'api_v3:count:{}'
+
+    count_estimated = False
+
+    def __init__(self, *args, **kwargs):
+        self.models = kwargs.pop('models', ())
+        super(EstimatedCountPaginator, self).__init__(*args, **kwargs)
+
+    def estimate(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+            plan = cursor.fetchone()[0]
+
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    def get_cache_key(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        digest = hashlib.sha256(
+            json.dumps(
+                [
+                    queryset.db, sql, params, get_versions(self.models),
+                    settings.PAGINATION_ESTIMATE_THRESHOLD
+                ],
+                default=str
+            ).encode('utf-8')
+        ).hexdigest()
+
+        return self.CACHE_KEY.format(digest)
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list.using(DEFAULT_DB_ALIAS)
+
+        if queryset.query.is_empty():
+            return 0
+
+        key = self.get_cache_key(queryset)
+        cached = cache.get(key)
+
+        if cached is None:
+            threshold = settings.PAGINATION_ESTIMATE_THRESHOLD
+            count = queryset.order_by()[:threshold + 1].count()
+            estimated = count > threshold
+
+            if estimated:
+                count = max(self.estimate(queryset), count)
+
+            cached = (count, estimated)
+            cache.set(key, cached, settings.PAGINATION_COUNT_TTL)
+
+        count, self.count_estimated = cached
+
+        return count
+
+
+class EstimatedCountPagination(Pagination):
+    """Pagination with the estimated counts, see the `count-estimated` meta.
+
+    The counts cache is invalidated by the view `cache_models` changes, or
+    the listed model changes.
+    """
+    models = ()
+
+    def django_paginator_class(self, queryset, page_size):
+        return EstimatedCountPaginator(queryset, page_size, models=self.models)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.models = getattr(view, 'cache_models', None) or (
+            queryset.model, )
+
+        return super(EstimatedCountPagination, self).paginate_queryset(
+            queryset, request, view)
+
+    def get_paginated_response(self, data):
+        response = super(
+            EstimatedCountPagination, self).get_paginated_response(data)
+        response.data['meta']['count_estimated'] = (
+            self.page.paginator.count_estimated)
+        return response
+
+
 class SessionAuthenticationSansCSRF(
         rest_framework.authentication.SessionAuthentication):
 
@@ -73,7 +184,7 @@ class JSONApiEndpoint(object):
         rest_framework.parsers.MultiPartParser,
     ]
     renderer_classes = set([
-        rest_framework_json_api.renderers.JSONRenderer,
+        renderers.JSONRenderer,
         rest_framework.renderers.BrowsableAPIRenderer
     ])
 
@@ -91,15 +202,176 @@ class JSONApiEndpoint(object):
     metadata_class = rest_framework_json_api.metadata.JSONAPIMetadata
     filter_fields = ('id', )
 
+    # Enables the conditional requests, the field tracks the changes.
+    last_modified_field = None
+    conditional_actions = ('list', 'retrieve')
+    # The responses depend on these too, their versions are part of the ETag
+    conditional_models = ()
+    conditional_etag = None
+    conditional_last_modified = None
+    filtered_queryset = None
+
+    # Read-only actions which read from the replica database.
+    replica_actions = ('list', )
+    on_replica = False
+
     def extract_filter_params(self, request):
-        params = qs_parser.parse(request.META['QUERY_STRING'])
-        params = params.get('filter') or {}
+        """Returns the filter params, the query string is parsed once.
+
+        A deep copy is returned, so callers can update it.
+        """
+        params = getattr(request, 'parsed_filter_params', None)
+
+        if params is None:
+            params = qs_parser.parse(request.META['QUERY_STRING'])
+            params = params.get('filter') or {}
+
+            for k, v in list(params.items()):
+                if not v:
+                    params.pop(k)
+
+            request.parsed_filter_params = params
+
+        return copy.deepcopy(params)
+
+    def get_filtered_queryset(self):
+        """Returns the filtered queryset, built once per request.
+
+        Do not alter the returned queryset, use a clone (`.all()`).
+        """
+        if self.filtered_queryset is None:
+            self.filtered_queryset = self.filter_queryset(self.get_queryset())
+
+        return self.filtered_queryset
+
+    def list(self, request, *args, **kwargs):
+        """Lists the filtered queryset, the filters run once per request."""
+        if not isinstance(self, rest_framework.mixins.ListModelMixin):
+            raise rest_framework.exceptions.MethodNotAllowed(request.method)
+
+        queryset = self.get_filtered_queryset()
+        page = self.paginate_queryset(queryset)
+
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer(queryset, many=True)
+        return rest_framework.response.Response(serializer.data)
+
+    def get_conditional_validators(self, request):
+        """Returns the ETag and the last modified timestamp.
+
+        The values are computed with an aggregate query, before any objects
+        are loaded. Lists have no last modified timestamp, since removing an
+        object does not change it. Neither do the responses depending on the
+        ``conditional_models``, only the ETag covers their changes.
+        """
+        queryset = self.get_filtered_queryset()
+        last_modified = None
 
-        for k, v in list(params.items()):
-            if not v:
-                params.pop(k)
+        if self.action == 'retrieve':
+            lookup = self.lookup_url_kwarg or self.lookup_field
+            validators = queryset.filter(
+                **{self.lookup_field: self.kwargs[lookup]}
+            ).aggregate(
+                last_modified=Max(self.last_modified_field),
+                count=Count('pk')
+            )
+            last_modified = validators['last_modified']
+        else:
+            validators = queryset.order_by().aggregate(
+                last_modified=Max(self.last_modified_field),
+                count=Count('pk')
+            )
 
-        return params
+        if not validators['count']:
+            return None, None
+
+        params = dict(
+            validators=validators,
+            query=sorted(request.GET.lists()),
+            media_type=request.accepted_media_type,
+            user=request.user.pk
+        )
+
+        if self.conditional_models:
+            params['versions'] = get_versions(self.conditional_models)
+            last_modified = None
+
+        digest = hashlib.sha256(
+            json.dumps(params, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+
+        if last_modified:
+            last_modified = calendar.timegm(last_modified.utctimetuple())
+
+        return quote_etag(digest), last_modified
+
+    def dispatch(self, request, *args, **kwargs):
+        """Runs the read-only actions on the replica database.
+
+        After a write, the user reads from the primary database for a while.
+        """
+        action = getattr(self, 'action_map', {}).get(request.method.lower())
+        self.on_replica = on_replica = (
+            action in self.replica_actions and not router.is_pinned(request))
+
+        with router.replica_reads(on_replica):
+            response = super(JSONApiEndpoint, self).dispatch(
+                request, *args, **kwargs)
+
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and (
+                response.status_code < 400):
+            router.pin(response)
+
+        return response
+
+    def initial(self, request, *args, **kwargs):
+        """Answers conditional requests before running the action."""
+        super(JSONApiEndpoint, self).initial(request, *args, **kwargs)
+
+        is_safe = request.method in ('GET', 'HEAD')
+
+        if not is_safe or not self.last_modified_field or (
+                self.action not in self.conditional_actions):
+            return
+
+        self.conditional_etag, self.conditional_last_modified = (
+            self.get_conditional_validators(request))
+
+        if not self.conditional_etag:
+            return
+
+        response = get_conditional_response(
+            request,
+            etag=self.conditional_etag,
+            last_modified=self.conditional_last_modified
+        )
+
+        if response is not None:
+            self.skip_handler(request, response)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super(JSONApiEndpoint, self).finalize_response(
+            request, response, *args, **kwargs)
+
+        if self.conditional_etag and response.status_code in (200, 304):
+            response['ETag'] = self.conditional_etag
+
+            if self.conditional_last_modified:
+                response['Last-Modified'] = http_date(
+                    self.conditional_last_modified)
+
+        return response
+
+    def skip_handler(self, request, response):
+        """Replaces the action handler, the response is ready."""
+        setattr(
+            self,
+            request.method.lower(),
+            lambda *args, **kwargs: response
+        )
 
     def action_name(self):
         """Simple helper to generate the current action name."""
@@ -120,3 +392,93 @@ class JSONApiEndpoint(object):
             response.status_code = HTTP_422_UNPROCESSABLE_ENTITY
 
         return response
+
+
+class CachedListMixin(object):
+    """Caches the rendered list responses, answers with 304 if not changed.
+
+    Entries are keyed by the endpoint, the request params and the version
+    counters of the ``cache_models``. Any change to these models invalidates
+    the cached responses.
+
+    The lists read from the primary database, unless listed in the
+    ``replica_actions``. A lagging replica could return the stale rows under
+    the new models versions, so the responses read from the replica are
+    cached separately, only for the replication lag, and without an ETag.
+    """
+    CACHE_KEY = 'api_v3:response:{}:{}'
+
+    cache_models = ()
+    cache_digest = None
+    replica_actions = ()
+
+    def reads_replica(self):
+        return self.on_replica and router.has_replica()
+
+    def get_cache_scope(self):
+        """Cached responses are shared between the users, unless scoped."""
+        return None
+
+    def get_cache_digest(self, request):
+        """Returns a hash of the normalized request and models versions."""
+        params = dict(
+            filters=self.extract_filter_params(request),
+            query=sorted(
+                (name, values) for name, values in request.GET.lists()
+                if not name.startswith('filter[')
+            ),
+            media_type=request.accepted_media_type,
+            scope=self.get_cache_scope(),
+            replica=self.reads_replica(),
+            versions=get_versions(self.cache_models)
+        )
+
+        return hashlib.sha256(
+            json.dumps(params, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+
+    def initial(self, request, *args, **kwargs):
+        """Skips the list handler if there's a cached response."""
+        super(CachedListMixin, self).initial(request, *args, **kwargs)
+
+        if self.action != 'list':
+            return
+
+        self.cache_digest = self.get_cache_digest(request)
+        response = get_conditional_response(
+            request, etag=quote_etag(self.cache_digest))
+
+        if response is None:
+            cached = cache.get(
+                self.CACHE_KEY.format(self.basename, self.cache_digest))
+
+            if cached:
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+
+        if response is not None:
+            self.skip_handler(request, response)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super(CachedListMixin, self).finalize_response(
+            request, response, *args, **kwargs)
+
+        if not self.cache_digest or response.status_code not in (200, 304):
+            return response
+
+        timeout = DEFAULT_TIMEOUT
+
+        if self.reads_replica():
+            timeout = settings.REPLICA_PIN_SECONDS
+        else:
+            response['ETag'] = quote_etag(self.cache_digest)
+
+        if isinstance(response, rest_framework.response.Response):
+            response.render()
+            cache.set(
+                self.CACHE_KEY.format(self.basename, self.cache_digest),
+                (response.content, response['Content-Type']),
+                timeout
+            )
+
+        return response
@@ -0,0 +1,239 @@
+import uuid
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import exceptions, response, viewsets
+
+from api_v3.misc.cache import bump_version
+from api_v3.misc.queue import queue
+from api_v3.models import (
+    Action, Notification, Profile, Responder, Subscriber, Ticket)
+from api_v3.serializers import TicketBulkUpdateSerializer
+from .responders import RespondersEndpoint
+from .reviews import ReviewsEndpoint
+from .support import JSONApiEndpoint
+
+
+class TicketBulkUpdatesEndpoint(JSONApiEndpoint, viewsets.GenericViewSet):
+    """Applies the same changes to many tickets at once.
+
+    Status, priority, tags and responders changes run in one transaction.
+    The recipients are notified through the notifications outbox, thus the
+    updates are combined with the rest of the ticket events.
+    """
+
+    class TicketBulkUpdate(dict):
+        __getattr__ = dict.__getitem__
+        __setattr__ = dict.__setitem__
+
+    queryset = Ticket.objects.all()
+    serializer_class = TicketBulkUpdateSerializer
+
+    EMAIL_SUBJECT = 'The ticket ID: {} was updated'
+
+    def get_queryset(self):
+        return super(TicketBulkUpdatesEndpoint, self).get_queryset().none()
+
+    def create(self, request, *args, **kwargs):
+        """Only super users can update the tickets in bulk."""
+        if not request.user.is_superuser:
+            raise exceptions.PermissionDenied()
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            updated, closed, notifications = self.perform_create(serializer)
+
+        # Queue the emails only once the changes are committed
+        for ticket_id in closed:
+            # If closed, send an email next day to file a review...
+            ReviewsEndpoint.email_notify(ticket_id, request.get_host())
+
+        for ticket_id, recipients in notifications.items():
+            self.email_notify(
+                ticket_id, recipients['added'], recipients['updated'],
+                request.get_host()
+            )
+
+        serializer = self.get_serializer(self.TicketBulkUpdate(
+            serializer.validated_data,
+            pk=uuid.uuid4().hex,
+            updated_tickets=updated
+        ))
+
+        return response.Response(serializer.data, status=201)
+
+    def perform_create(self, serializer):
+        """Applies the changes.
+
+        Returns the updated and the closed tickets IDs, and the notifications.
+
+        Tickets are updated with set-based queries and the activities are
+        inserted in bulk, thus no model signals are sent.
+        """
+        data = serializer.validated_data
+        user = self.request.user
+        now = timezone.now()
+        add_tags = data.get('add_tags') or []
+        remove_tags = set(data.get('remove_tags') or [])
+        add_responders = data.get('add_responders') or []
+        remove_responders = data.get('remove_responders') or []
+
+        tickets = list(
+            Ticket.objects.filter(id__in=data['tickets'])
+            .only('id', 'status', 'priority', 'tags')
+            .order_by('id').select_for_update()
+        )
+
+        existing = set(
+            Responder.objects.filter(
+                ticket_id__in=data['tickets'],
+                user_id__in=add_responders + remove_responders
+            ).values_list('ticket_id', 'user_id')
+        )
+        # A subscriber can not be a responder too
+        subscribed = set(
+            Subscriber.objects.filter(
+                ticket_id__in=data['tickets'], user_id__in=add_responders
+            ).values_list('ticket_id', 'user_id')
+        )
+
+        updated = []
+        closed = []
+        actions = []
+        responders = []
+        removed = False
+        added = defaultdict(list)
+
+        for ticket in tickets:
+            changed = False
+            status = data.get('status')
+
+            for user_id in add_responders:
+                pair = (ticket.id, user_id)
+
+                if pair in existing or pair in subscribed:
+                    continue
+
+                responders.append(Responder(ticket=ticket, user_id=user_id))
+                actions.append(Action(
+                    actor=user, target=ticket, timestamp=now,
+                    action=Profile(pk=user_id), verb='responder:create'))
+                added[user_id].append(ticket.id)
+                changed = True
+
+                # Set the next-in-workflow ticket status
+                if not data.get('status'):
+                    ticket.status = Ticket.STATUSES[1][0]
+
+            for user_id in remove_responders:
+                if (ticket.id, user_id) not in existing:
+                    continue
+
+                removed = True
+                actions.append(Action(
+                    actor=user, target=ticket, timestamp=now,
+                    action=Profile(pk=user_id), verb='responder:destroy'))
+                changed = True
+
+            tags = [tag for tag in ticket.tags if tag not in remove_tags]
+            tags += [tag for tag in add_tags if tag not in tags]
+
+            verb = 'ticket:update'
+            fields_changed = (
+                tags != ticket.tags or
+                (status and status != ticket.status) or
+                (data.get('priority') and data['priority'] != ticket.priority)
+            )
+
+            if status and status != ticket.status:
+                verb = 'ticket:update:status_{}'.format(status)
+
+                if status == Ticket.STATUSES[3][0]:
+                    closed.append(ticket.id)
+
+            if fields_changed:
+                actions.append(Action(
+                    actor=user, target=ticket, timestamp=now, verb=verb))
+                ticket.status = status or ticket.status
+                ticket.priority = data.get('priority') or ticket.priority
+                ticket.tags = tags
+                changed = True
+
+            if changed:
+                ticket.updated_at = now
+                updated.append(ticket)
+
+        if removed:
+            Responder.objects.filter(
+                ticket_id__in=data['tickets'], user_id__in=remove_responders
+            ).delete()
+
+        Responder.objects.bulk_create(responders)
+        Action.objects.bulk_create(actions)
+        Ticket.objects.bulk_update(
+            updated, ['status', 'priority', 'tags', 'updated_at'])
+
+        # Bulk queries do not send the model signals.
+        bump_version(Responder)
+        bump_version(Ticket)
+
+        updated = [ticket.id for ticket in updated]
+
+        return (
+            updated, closed, self.get_notifications(updated, added, user))
+
+    def get_notifications(self, ticket_ids, added, actor):
+        """Groups the users to notify by the updated tickets.
+
+        The new responders are told they were added, the rest of the
+        responders and subscribers are told about the update.
+        """
+        notifications = defaultdict(lambda: dict(added=[], updated=[]))
+        users = list(
+            Responder.objects.filter(ticket_id__in=ticket_ids)
+            .values_list('user_id', 'ticket_id')
+        ) + list(
+            Subscriber.objects.filter(
+                ticket_id__in=ticket_ids, user_id__isnull=False
+            ).values_list('user_id', 'ticket_id')
+        )
+
+        for user_id, ticket_id in users:
+            if user_id == actor.id:
+                continue
+
+            if ticket_id in added.get(user_id, []):
+                notifications[ticket_id]['added'].append(user_id)
+            else:
+                notifications[ticket_id]['updated'].append(user_id)
+
+        return dict(notifications)
+
+    @staticmethod
+    @queue.task()
+    def email_notify(_job_id, ticket_id, added, updated, request_host):
+        """Appends the ticket update emails to the notifications outbox."""
+        ticket = Ticket.objects.get(pk=ticket_id)
+        users = Profile.objects.in_bulk(added + updated)
+        emails = (
+            (added, 'mail/responder_created.txt', RespondersEndpoint),
+            (updated, 'mail/ticket_updated.txt', TicketBulkUpdatesEndpoint)
+        )
+
+        for user_ids, template, endpoint in emails:
+            recipients = [
+                (users[pk].email, users[pk].display_name)
+                for pk in user_ids if pk in users
+            ]
+
+            if recipients:
+                Notification.notify(
+                    recipients,
+                    ticket,
+                    template,
+                    endpoint.EMAIL_SUBJECT.format(ticket.id),
+                    request_host
+                )
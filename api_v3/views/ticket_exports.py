@@ -18,11 +18,15 @@ class DummyBuffer:
 
 class TicketExportsEndpoint(TicketsEndpoint):
     TICKET_URI = 'https://{}/tickets/view/'
+    # Rows are fetched with a server side cursor, in chunks
+    CHUNK_SIZE = 2000
 
     permission_classes = (permissions.IsAdminUser, )
 
     def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
+        queryset = self.get_filtered_queryset()
+        # Streamed after the view returns, bind the read database now
+        queryset = queryset.using(queryset.db)
         ticket_url = self.TICKET_URI.format(self.request.get_host())
 
         cols = dict(
@@ -58,7 +62,7 @@ class TicketExportsEndpoint(TicketsEndpoint):
         writer = DictWriter(DummyBuffer(), fieldnames=cols.keys())
         header_with_rows = chain(
             [dict(zip(cols.keys(), cols.keys()))],
-            queryset.values(**cols)
+            queryset.values(**cols).iterator(chunk_size=self.CHUNK_SIZE)
         )
 
         response = StreamingHttpResponse(
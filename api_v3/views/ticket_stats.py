@@ -6,12 +6,15 @@ from django.db.models import (
 from django.db.models.functions import Trunc, Extract
 from rest_framework import viewsets, response, permissions
 
-from api_v3.models import Profile, Ticket
+from api_v3.models import Profile, Responder, Ticket
 from api_v3.serializers import TicketStatSerializer
-from .support import JSONApiEndpoint
+from .support import CachedListMixin, JSONApiEndpoint
 
 
-class TicketStatsEndpoint(JSONApiEndpoint, viewsets.ReadOnlyModelViewSet):
+class TicketStatsEndpoint(
+        CachedListMixin,
+        JSONApiEndpoint,
+        viewsets.ReadOnlyModelViewSet):
 
     class Pagination(JSONApiEndpoint.pagination_class):
         page_size = None
@@ -24,6 +27,8 @@ class TicketStatsEndpoint(JSONApiEndpoint, viewsets.ReadOnlyModelViewSet):
     queryset = Ticket.objects.all()
     serializer_class = TicketStatSerializer
     pagination_class = Pagination
+    cache_models = (Ticket, Responder, Profile)
+    replica_actions = ('list', )
     filter_fields = {
         'created_at': ['gte', 'lte'],
         'country': ['exact'],
@@ -46,7 +51,7 @@ class TicketStatsEndpoint(JSONApiEndpoint, viewsets.ReadOnlyModelViewSet):
         return params
 
     def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
+        queryset = self.get_filtered_queryset()
         group_by = None
 
         annotations = dict(
@@ -1,13 +1,13 @@
-from django.core.mail import send_mass_mail
 from django.conf import settings
-from django.template.loader import render_to_string
+from django.core.exceptions import FieldDoesNotExist
+from django.db import transaction
 from rest_framework import exceptions, mixins, viewsets
 
-from api_v3.models import Action, Comment, Profile, Ticket
-from api_v3.misc.queue import queue
+from api_v3.models import (
+    Action, Comment, Notification, Profile, Responder, Subscriber, Ticket)
 from api_v3.serializers import TicketSerializer
 from .reviews import ReviewsEndpoint
-from .support import JSONApiEndpoint
+from .support import EstimatedCountPagination, JSONApiEndpoint
 
 
 class TicketsEndpoint(
@@ -18,22 +18,42 @@ class TicketsEndpoint(
 
     queryset = Ticket.objects.all()
     serializer_class = TicketSerializer
-    ordering_fields = ('created_at', 'deadline_at')
+    pagination_class = EstimatedCountPagination
+    # The paginated counts are cached until these change.
+    cache_models = (Ticket, Responder, Subscriber)
+    # Lists skip the long texts, see `TicketSerializer.get_fieldset()`.
+    lean_list = True
+    ordering_fields = (
+        'created_at', 'deadline_at', 'last_activity_at', 'comments_count')
     filter_fields = {
         'created_at': ['range', 'gte', 'lte'],
         'deadline_at': ['range', 'gte', 'lte'],
+        'last_activity_at': ['range', 'gte', 'lte', 'isnull'],
         'status': ['in'],
         'kind': ['exact'],
         'country': ['exact'],
         'requester': ['exact'],
         'responders__user': ['exact', 'isnull']
     }
+    # Comma separated values, the bare field name filters by containment
+    array_filter_fields = {
+        'tags': ['contains', 'overlap'],
+        'countries': ['contains', 'overlap']
+    }
+    # The list meta totals are not limited to the listed tickets.
+    last_modified_field = 'updated_at'
+    conditional_actions = ('retrieve',)
+    # Neither is the detail meta total, it changes with any visible ticket.
+    conditional_models = cache_models
 
     EMAIL_SUBJECT = 'A new ticket was requested, ID: {}'
 
     def get_queryset(self):
         queryset = super(TicketsEndpoint, self).get_queryset()
 
+        if self.action == 'list':
+            queryset = self.select_fieldset(queryset)
+
         if self.request.user.is_superuser:
             return queryset
 
@@ -44,16 +64,59 @@ class TicketsEndpoint(
 
         return Ticket.filter_by_user(self.request.user, queryset)
 
+    def select_fieldset(self, queryset):
+        """Loads only the columns of the rendered fields."""
+        fieldset = TicketSerializer.get_fieldset(
+            self.get_serializer_context())
+
+        if fieldset is None:
+            return queryset
+
+        columns = ['id']
+
+        for name in fieldset:
+            try:
+                field = Ticket._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+
+            if field.concrete and not field.many_to_many:
+                columns.append(name)
+
+        return queryset.only(*columns)
+
     def filter_queryset(self, queryset):
         """Patch filtering method to use the search implementation."""
         filters = self.extract_filter_params(self.request)
         filtered = super(TicketsEndpoint, self).filter_queryset(queryset)
 
-        if filters.get('search'):
+        filtered = self.filter_arrays(filters, filtered)
+
+        if filters.get('search') and filters.get('search_mode') == 'fuzzy':
+            filtered = Ticket.fuzzy_search_for(filters['search'], filtered)
+        elif filters.get('search'):
             filtered = Ticket.search_for(filters.get('search'), filtered)
 
         return filtered
 
+    def filter_arrays(self, filters, queryset):
+        """Filters the array fields, the lookups are served by GIN indexes."""
+        for field, lookups in self.array_filter_fields.items():
+            for lookup in lookups:
+                name = '{}__{}'.format(field, lookup)
+                value = filters.get(name)
+
+                if lookup == lookups[0]:
+                    value = value or filters.get(field)
+
+                values = [v.strip() for v in str(value or '').split(',')]
+                values = [v for v in values if v]
+
+                if values:
+                    queryset = queryset.filter(**{name: values})
+
+        return queryset
+
     def perform_create(self, serializer):
         """Make sure every new ticket is linked to current user."""
         # Add by default any country to the countries list
@@ -123,25 +186,32 @@ class TicketsEndpoint(
         elif init_data.get('pending_reason'):
             verb = '{}:pending'.format(self.action_name())
 
-        if init_data.get('reopen_reason') or init_data.get('pending_reason'):
-            comment = Comment.objects.create(
-                ticket=ticket,
-                user=self.request.user,
-                body=(
-                    init_data.get('reopen_reason') or
-                    init_data.get('pending_reason')
+        with transaction.atomic():
+            if init_data.get('reopen_reason') or (
+                    init_data.get('pending_reason')):
+                comment = Comment.objects.create(
+                    ticket=ticket,
+                    user=self.request.user,
+                    body=(
+                        init_data.get('reopen_reason') or
+                        init_data.get('pending_reason')
+                    )
                 )
-            )
 
-        return Action.objects.create(
-            actor=self.request.user, target=ticket, verb=verb, action=comment)
+                Ticket.add_activity(
+                    ticket.id, comment.created_at, comments=1)
+
+            return Action.objects.create(
+                actor=self.request.user,
+                target=ticket,
+                verb=verb,
+                action=comment
+            )
 
     @staticmethod
-    @queue.task()
-    def email_notify(_job_id, ticket_id, request_host, template=None):
-        """Sends an email to editors about the new ticket."""
+    def email_notify(ticket_id, request_host, template=None):
+        """Notifies the editors about the new ticket."""
         ticket = Ticket.objects.get(pk=ticket_id)
-        emails = []
         template = template or 'mail/ticket_created.txt'
         subject = TicketsEndpoint.EMAIL_SUBJECT.format(ticket.id)
 
@@ -152,17 +222,10 @@ class TicketsEndpoint(
         else:
             users = ticket.users
 
-        for user in users:
-            emails.append([
-                subject,
-                render_to_string(template, {
-                    'ticket': ticket,
-                    'name': user.display_name,
-                    'request_host': request_host,
-                    'site_name': settings.SITE_NAME
-                }),
-                settings.DEFAULT_FROM_EMAIL,
-                [user.email]
-            ])
-
-        send_mass_mail(emails)
+        Notification.notify(
+            [(user.email, user.display_name) for user in users],
+            ticket,
+            template,
+            subject,
+            request_host
+        )
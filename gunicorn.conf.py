@@ -0,0 +1,33 @@
+"""
+Gunicorn config, the values are set in the `api_v3/config/production.py`.
+For more information on this file, see
+https://docs.gunicorn.org/en/stable/settings.html
+"""
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_v3.config')
+os.environ.setdefault('DJANGO_CONFIGURATION', 'Production')
+
+from configurations import importer  # noqa
+importer.install()
+
+from django.conf import settings  # noqa
+
+bind = '0.0.0.0:8080'
+errorlog = '-'
+
+workers = settings.WEB_CONCURRENCY
+worker_class = settings.WEB_WORKER_CLASS
+threads = settings.WEB_THREADS
+preload_app = settings.WEB_PRELOAD
+max_requests = settings.WEB_MAX_REQUESTS
+max_requests_jitter = settings.WEB_MAX_REQUESTS // 10
+
+
+def when_ready(server):
+    """Closes the connections opened while preloading, before forking."""
+    from django.db import connections
+    from api_v3.misc.pool import pools
+
+    connections.close_all()
+    pools.closeall()